@@ -1,13 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+from collections import deque
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
 from fastapi.responses import StreamingResponse, JSONResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from src import config
 from src.core.security import get_current_user  # Protección de rutas
-from src.plate_detection.ANPR import generate_frames, get_last_plate, activate_camera
+from src.plate_detection.batch import summarize
+from src.plate_detection.client import WorkerUnavailableError
+from src.plate_detection.registry import CameraNotFoundError
+
+# Modelos en este proceso o en el worker ANPR dedicado (socket Unix), según configuración
+if config.ANPR_WORKER_SOCKET:
+    from src.plate_detection.client import generate_frames, get_last_plate, activate_camera, models_status, get_events, list_cameras
+    from src.plate_detection.client import recognize_file
+else:
+    from src.plate_detection.ANPR import generate_frames, get_last_plate, activate_camera, models_status, get_events, list_cameras
+    from src.plate_detection.batch import recognize_file
 
 router = APIRouter()
 
+def _check_camera(camera):
+    """404 si la cámara pedida no está en el registro"""
+    if camera is not None and camera not in list_cameras():
+        raise HTTPException(status_code=404, detail="Cámara no encontrada")
+
+# 🔹 Cámaras registradas
+@router.get("/cameras")
+def cameras(current_user: str = Depends(get_current_user)):
+    """Ids de las cámaras (carriles) configuradas en ANPR_CAMERAS"""
+    try:
+        return {"cameras": list_cameras()}
+    except WorkerUnavailableError:
+        raise HTTPException(status_code=503, detail="Servicio ANPR no disponible")
+
 # 🔹 Streaming de video con detección de placas
 @router.get("/video")
-def video_feed(token: str = Query('token', description="Token OAuth2 para autenticación")):
+def video_feed(
+    token: str = Query('token', description="Token OAuth2 para autenticación"),
+    camera: str | None = Query(None, description="Id de la cámara (por defecto la primera registrada)"),
+    quality: int | None = Query(None, ge=10, le=100, description="Calidad JPEG fija (por defecto se adapta al cliente)"),
+    width: int | None = Query(None, ge=160, description="Ancho máximo de los cuadros (por defecto se adapta al cliente)")
+):
     """Devuelve el streaming de video con detección de placas (requiere token OAuth2 como query param o header)"""
     # Obtener token de query param o header
     if token:
@@ -21,18 +59,201 @@ def video_feed(token: str = Query('token', description="Token OAuth2 para autent
             raise HTTPException(status_code=401, detail="Token requerido")
 
     try:
-        return StreamingResponse(generate_frames(), media_type="multipart/x-mixed-replace; boundary=frame")
+        _check_camera(camera)
+        return StreamingResponse(generate_frames(camera, quality, width), media_type="multipart/x-mixed-replace; boundary=frame")
+    except CameraNotFoundError:
+        raise HTTPException(status_code=404, detail="Cámara no encontrada")
+    except WorkerUnavailableError:
+        raise HTTPException(status_code=503, detail="Servicio ANPR no disponible")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al iniciar el video: {str(e)}")
 
 # 🔹 Última placa detectada
 @router.get("/last_plate")
-def last_plate(current_user: str = Depends(get_current_user)):
+def last_plate(
+    camera: str | None = Query(None, description="Id de la cámara (por defecto, la última placa de cualquiera)"),
+    current_user: str = Depends(get_current_user)
+):
     """Devuelve la última placa detectada"""
     try:
-        plate = get_last_plate()
+        _check_camera(camera)
+        plate = get_last_plate(camera)
         if plate:
             return JSONResponse({"plate": plate})
         return JSONResponse({"plate": None})
+    except CameraNotFoundError:
+        raise HTTPException(status_code=404, detail="Cámara no encontrada")
+    except WorkerUnavailableError:
+        raise HTTPException(status_code=503, detail="Servicio ANPR no disponible")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener la placa: {str(e)}")
+
+# 🔹 Estado de los modelos ANPR
+@router.get("/ready")
+def anpr_ready():
+    """Indica si YOLO y EasyOCR ya están cargados (503 mientras no lo estén)"""
+    try:
+        state = models_status()
+    except WorkerUnavailableError as e:
+        return JSONResponse({"ready": False, "loading": False, "error": str(e)}, status_code=503)
+    return JSONResponse(state, status_code=200 if state["ready"] else 503)
+
+# 🔹 Eventos de placa confirmada (Server-Sent Events)
+SSE_KEEPALIVE_SECONDS = 15
+
+class _WorkerEvents:
+    """Un único sondeo al worker por proceso de la API, compartido por todos los clientes SSE.
+
+    Mientras haya suscriptores, una tarea trae los eventos nuevos por el socket y los guarda
+    en una copia local del historial; cada cliente lee esa copia sin abrir conexiones.
+    """
+
+    def __init__(self):
+        self._events = deque(maxlen=config.ANPR_EVENT_HISTORY)
+        self._last_id = 0
+        self._subscribers = 0
+        self._task = None
+
+    def subscribe(self):
+        self._subscribers += 1
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._poll())
+
+    def unsubscribe(self):
+        self._subscribers -= 1
+
+    def since(self, last_id: int):
+        return [event for event in self._events if event["id"] > last_id]
+
+    async def _poll(self):
+        try:
+            while self._subscribers > 0:
+                try:
+                    # La consulta va por socket: fuera del event loop
+                    events = await run_in_threadpool(get_events, self._last_id)
+                except WorkerUnavailableError:
+                    events = []
+                if events:
+                    self._events.extend(events)
+                    self._last_id = events[-1]["id"]
+                await asyncio.sleep(config.ANPR_EVENT_POLL_INTERVAL)
+        finally:
+            self._task = None
+
+_worker_events = _WorkerEvents()
+
+async def _event_stream(request: Request, last_id: int):
+    shared = _worker_events if config.ANPR_WORKER_SOCKET else None
+    if shared is not None:
+        shared.subscribe()
+    idle = 0.0
+    try:
+        while not await request.is_disconnected():
+            events = shared.since(last_id) if shared is not None else get_events(last_id)
+            for event in events:
+                last_id = event["id"]
+                yield f"id: {event['id']}\nevent: plate\ndata: {json.dumps(event)}\n\n"
+
+            idle = 0.0 if events else idle + config.ANPR_EVENT_POLL_INTERVAL
+            if idle >= SSE_KEEPALIVE_SECONDS:
+                yield ": keepalive\n\n"
+                idle = 0.0
+            await asyncio.sleep(config.ANPR_EVENT_POLL_INTERVAL)
+    finally:
+        if shared is not None:
+            shared.unsubscribe()
+
+@router.get("/events")
+async def plate_events(
+    request: Request,
+    token: str = Query(..., description="Token OAuth2 (EventSource no permite enviar cabeceras)"),
+    after: int = Query(0, ge=0, description="Id del último evento recibido")
+):
+    """Stream SSE con un evento por placa confirmada (placa, confianza, timestamp, cámara)"""
+    get_current_user(token)
+    # Al reconectar, EventSource envía el último id recibido en la cabecera Last-Event-ID
+    last_event_id = request.headers.get("last-event-id", "")
+    last_id = int(last_event_id) if last_event_id.isdigit() else after
+    return StreamingResponse(
+        _event_stream(request, last_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# 🔹 Historial de placas confirmadas
+@router.get("/events/history")
+def plate_events_history(limit: int = Query(50, ge=1, le=1000), current_user: str = Depends(get_current_user)):
+    """Últimos eventos de placa guardados en memoria, del más antiguo al más reciente"""
+    try:
+        return {"events": get_events(0, limit)}
+    except WorkerUnavailableError:
+        raise HTTPException(status_code=503, detail="Servicio ANPR no disponible")
+
+# 🔹 Reconocimiento sobre imágenes o videos grabados
+def _save_upload(upload: UploadFile) -> str:
+    """Copia el archivo subido a un temporal (OpenCV lee videos solo desde una ruta)"""
+    suffix = os.path.splitext(upload.filename or "")[1].lower()
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        try:
+            shutil.copyfileobj(upload.file, tmp)
+        except BaseException:
+            _remove([tmp.name])  # Copia incompleta (disco lleno, cliente desconectado)
+            raise
+        return tmp.name
+
+def _remove(paths):
+    for path in paths:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+def _recognition_lines(uploads, every):
+    """Una línea JSON por cuadro; un archivo ilegible genera una línea con "error" y se sigue"""
+    for name, path in uploads:
+        try:
+            for frame in recognize_file(path, every):
+                yield json.dumps({"file": name, **frame}) + "\n"
+        except ValueError as e:
+            yield json.dumps({"file": name, "error": str(e)}) + "\n"
+
+@router.post("/recognize")
+def recognize(
+    files: list[UploadFile] = File(..., description="Imágenes o videos"),
+    every: int | None = Query(None, ge=1, description="Procesar uno de cada N cuadros del video (por defecto ANPR_BATCH_SAMPLE_EVERY)"),
+    stream: bool = Query(False, description="Devolver una línea JSON por cuadro a medida que se procesa (NDJSON)"),
+    current_user: str = Depends(get_current_user)
+):
+    """Detecta y lee placas en archivos grabados, sin cámara: resultados por cuadro y placas distintas por archivo"""
+    uploads = []  # (nombre, temporal) ya guardados: se borran pase lo que pase
+    try:
+        for upload in files:
+            uploads.append((upload.filename, _save_upload(upload)))
+        if stream:
+            # Los temporales se borran al terminar la respuesta, aunque el cliente se vaya
+            # antes del primer cuadro (el generador podría no llegar a ejecutarse)
+            response = StreamingResponse(_recognition_lines(uploads, every), media_type="application/x-ndjson",
+                                         background=BackgroundTask(_remove, [path for _, path in uploads]))
+            uploads = []
+            return response
+
+        results = []
+        for name, path in uploads:
+            try:
+                frames = list(recognize_file(path, every))
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=f"{name}: {e}")
+            results.append({"file": name, "frames": frames, "plates": summarize(frames)})
+        return {"results": results}
+    except HTTPException:
+        raise
+    except WorkerUnavailableError:
+        raise HTTPException(status_code=503, detail="Servicio ANPR no disponible")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al procesar los archivos: {str(e)}")
+    finally:
+        _remove(path for _, path in uploads)
@@ -1,17 +1,33 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from src.core.security import verify_password, create_access_token, hash_password
-from src.db.database import get_db_connection
+from starlette.concurrency import run_in_threadpool
+from src.core.counting import invalidate_counts
+from src.core.security import verify_and_update_password_async, create_access_token, revoke_token, get_current_claims, hash_password
+from src.db.database import get_db, db_connection, PoolTimeoutError
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
+# Each helper takes its own pooled connection and returns it right away, so logins queued
+# in the bcrypt pool do not hold database connections
+def _get_user(email):
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM USERS WHERE email = %s", (email,))
+        user = cursor.fetchone()
+        cursor.close()
+    return user
+
+def _update_password(user_id, hashed_password):
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE USERS SET password = %s WHERE user_id = %s", (hashed_password, user_id))
+        conn.commit()
+        cursor.close()
+
 @router.post("/login")
 async def login(request: Request):
     """User authentication (accepts JSON and form-data)"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
     content_type = request.headers.get("content-type", "")
     if "application/json" in content_type:
         data = await request.json()
@@ -22,26 +38,38 @@ async def login(request: Request):
         username = form.get("username")
         password = form.get("password")
 
-    cursor.execute("SELECT * FROM USERS WHERE email = %s", (username,))
-    user = cursor.fetchone()
+    # pymysql is blocking: query off the event loop
+    try:
+        user = await run_in_threadpool(_get_user, username)
+    except PoolTimeoutError:
+        raise HTTPException(status_code=503, detail="Database busy, try again")
 
-    cursor.close()
-    conn.close()
-
-    if not user or not verify_password(password, user["password"]):
+    # bcrypt is CPU bound: verify in the bounded hashing pool
+    valid, new_hash = await verify_and_update_password_async(password, user["password"]) if user else (False, None)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    access_token = create_access_token({"sub": user["email"]})
+
+    # Stored hash uses an outdated bcrypt cost: replace it transparently
+    if new_hash:
+        try:
+            await run_in_threadpool(_update_password, user["user_id"], new_hash)
+        except PoolTimeoutError:
+            pass  # Database pool exhausted: the hash is replaced on a later login
+
+    access_token = create_access_token({
+        "sub": user["email"],
+        "user_id": user["user_id"],
+        "is_superuser": bool(user["is_superuser"]),
+    })
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/create_user")
-def create_user(email: str, password: str, token: str = Depends(oauth2_scheme)):
+def create_user(email: str, password: str, claims: dict = Depends(get_current_claims), conn = Depends(get_db)):
     """Create a new user only if superuser"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     cursor.execute("SELECT * FROM USERS WHERE email = %s", (email,))
@@ -49,24 +77,25 @@ def create_user(email: str, password: str, token: str = Depends(oauth2_scheme)):
 
     if existing_user:
         cursor.close()
-        conn.close()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User already exists")
 
-    # Verify that the creator is a superuser
-    cursor.execute("SELECT is_superuser FROM USERS WHERE email = %s", (token,))
-    user = cursor.fetchone()
-
-    if not user or not user["is_superuser"]:
+    # Verify that the creator is a superuser (claim of the validated token)
+    if not claims.get("is_superuser"):
         cursor.close()
-        conn.close()
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to create users")
 
     hashed_password = hash_password(password)
     cursor.execute("INSERT INTO USERS (email, password, is_superuser) VALUES (%s, %s, %s)",
                    (email, hashed_password, False))  # Creating a regular user, not a superuser
     conn.commit()
+    invalidate_counts("USERS")
 
     cursor.close()
-    conn.close()
 
     return {"message": "User created successfully"}
+
+@router.post("/logout")
+def logout(token: str = Depends(oauth2_scheme)):
+    """Revoke the current access token"""
+    revoke_token(token)
+    return {"message": "Logged out"}
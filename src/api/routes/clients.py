@@ -1,26 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from src.db.database import get_db_connection
+from src.db.database import get_db
 from src.models.client import Cliente
-from src.models.paginate import PaginatedResponse
+from src.models.paginate import PaginatedResponse, CursorPaginatedResponse, EstrategiaConteo
+from src.core.pagination import resolve_after, keyset_page
+from src.core.counting import count_rows, invalidate_counts
 from src.core.security import get_current_user  # Protección de rutas
 
 router = APIRouter()
 
 # 🔹 Crear Cliente
 @router.post("/", response_model=Cliente)
-def create_client(cliente: Cliente, current_user: str = Depends(get_current_user)):
+def create_client(cliente: Cliente, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Registra un nuevo cliente"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     try:
         sql = """INSERT INTO CLIENTS (name, email, phone) VALUES (%s, %s, %s)"""
         cursor.execute(sql, (cliente.name, cliente.email, cliente.phone))
         conn.commit()
+        invalidate_counts("CLIENTS")
 
         cliente.client_id = cursor.lastrowid
         cursor.close()
-        conn.close()
 
         return cliente
     except Exception:
@@ -28,17 +29,40 @@ def create_client(cliente: Cliente, current_user: str = Depends(get_current_user
         raise HTTPException(status_code=400, detail="Error al crear cliente")
 
 # 🔹 Obtener todos los Clientes con busqueda y paginación
-@router.get("/", response_model=PaginatedResponse[Cliente])
+@router.get("/", response_model=PaginatedResponse[Cliente] | CursorPaginatedResponse[Cliente])
 def get_clients(
     search: str | None = Query(None, description="Buscar por nombre o email"),
     page: int = Query(1, ge=1, description="Número de página"),
     limit: int = Query(10, ge=1, le=100, description="Número de resultados por página"),
-    current_user: str = Depends(get_current_user)
+    after: int | None = Query(None, ge=0, description="Paginación por cursor: id desde el cual continuar (0 = primera página)"),
+    page_cursor: str | None = Query(None, alias="cursor", description="Cursor opaco devuelto en `next_cursor`"),
+    count: EstrategiaConteo = Query(EstrategiaConteo.exact, description="Cálculo del total: exact, cached, approximate o none"),
+    current_user: str = Depends(get_current_user),
+    conn = Depends(get_db)
 ):
     """Devuelve la lista de todos los clientes con paginación y búsqueda"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
+    # --- Paginación por cursor (keyset): seek por índice, sin COUNT ni OFFSET ---
+    after_id = resolve_after(after, page_cursor)
+    if after_id is not None:
+        query = "SELECT client_id, name, email, phone, created_at FROM CLIENTS WHERE client_id > %s"
+        params = [after_id]
+        if search:
+            query += " AND (name LIKE %s OR email LIKE %s)"
+            params.extend([f"%{search}%", f"%{search}%"])
+        query += " ORDER BY client_id LIMIT %s"
+
+        cursor.execute(query, tuple(params + [limit + 1]))
+        rows, next_cursor = keyset_page(cursor.fetchall(), limit, "client_id")
+        cursor.close()
+
+        return CursorPaginatedResponse[Cliente](
+            limit=limit,
+            next_cursor=next_cursor,
+            data=[Cliente(**row) for row in rows]
+        )
+
     # --- 1. Calcular total ---
     count_query = "SELECT COUNT(*) as total FROM CLIENTS"
     params = []
@@ -46,8 +70,7 @@ def get_clients(
         count_query += " WHERE name LIKE %s OR email LIKE %s"
         params.extend([f"%{search}%", f"%{search}%"])
 
-    cursor.execute(count_query, tuple(params))
-    total = cursor.fetchone()["total"]
+    total, estimated = count_rows(cursor, "CLIENTS", count_query, params, search, count)
 
     # --- 2. Obtener página de resultados ---
     query = "SELECT client_id, name, email, phone, created_at FROM CLIENTS"
@@ -64,28 +87,26 @@ def get_clients(
     clientes = [Cliente(**row) for row in rows]
 
     cursor.close()
-    conn.close()
 
     return PaginatedResponse[Cliente](
         total=total,
         page=page,
         limit=limit,
-        total_pages=(total + limit - 1) // limit,
+        total_pages=(total + limit - 1) // limit if total is not None else None,
+        total_estimated=estimated,
         data=clientes
     )
 
 # 🔹 Obtener Cliente por ID
 @router.get("/{client_id}", response_model=Cliente)
-def get_client(client_id: int, current_user: str = Depends(get_current_user)):
+def get_client(client_id: int, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Devuelve un cliente por ID"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     cursor.execute("SELECT client_id, name, email, phone, created_at FROM CLIENTS WHERE client_id = %s", (client_id,))
     cliente = cursor.fetchone()
 
     cursor.close()
-    conn.close()
 
     if not cliente:
         raise HTTPException(status_code=404, detail="Cliente no encontrado")
@@ -97,31 +118,29 @@ def get_client(client_id: int, current_user: str = Depends(get_current_user)):
 
 # 🔹 Actualizar Cliente
 @router.put("/{client_id}", response_model=Cliente)
-def update_client(client_id: int, cliente: Cliente, current_user: str = Depends(get_current_user)):
+def update_client(client_id: int, cliente: Cliente, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Actualiza los datos de un cliente"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     sql = """UPDATE CLIENTS SET name=%s, email=%s, phone=%s WHERE client_id=%s"""
     cursor.execute(sql, (cliente.name, cliente.email, cliente.phone, client_id))
     conn.commit()
+    invalidate_counts("CLIENTS")
 
     cursor.close()
-    conn.close()
 
     return cliente
 
 # 🔹 Eliminar Cliente
 @router.delete("/{client_id}")
-def delete_client(client_id: int, current_user: str = Depends(get_current_user)):
+def delete_client(client_id: int, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Elimina un cliente por ID"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     cursor.execute("DELETE FROM CLIENTS WHERE client_id = %s", (client_id,))
     conn.commit()
+    invalidate_counts("CLIENTS")
 
     cursor.close()
-    conn.close()
 
     return {"message": "Cliente eliminado correctamente"}
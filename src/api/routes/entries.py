@@ -1,66 +1,123 @@
-from fastapi import APIRouter, Depends, HTTPException
-from src.db.database import get_db_connection
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from src.db.database import get_db
 from src.models.entry import RegistroIngreso, EstadoRegistro
+from src.models.paginate import PaginatedResponse, EstrategiaConteo
+from src.core.counting import count_rows, invalidate_counts
+from src.core.filters import entry_filters, filters_key
+from src.core.export import stream_rows, export_response
+from src.models.export import FormatoExportacion
+from src.core.history_export import history_month_bytes, MEDIA_TYPES
+from src.core.rate_cache import get_hourly_rate, calculate_fee
 from src.core.security import get_current_user  # Protección de rutas
 
 router = APIRouter()
 
 # 🔹 Crear Registro de Ingreso
 @router.post("/", response_model=RegistroIngreso)
-def create_entry(registro: RegistroIngreso, current_user: str = Depends(get_current_user)):
+def create_entry(registro: RegistroIngreso, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Registra un nuevo ingreso de vehículo"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     try:
         sql = """INSERT INTO ENTRIES 
-                 (vehicle_id, user_id, rate_id, entry_date, status)
-                 VALUES (%s, %s, %s, %s, %s)"""
-        cursor.execute(sql, (registro.vehicle_id, registro.user_id, registro.rate_id, registro.entry_date, registro.status.value))
+                 (vehicle_id, user_id, parking_id, rate_id, entry_date, status)
+                 VALUES (%s, %s, %s, %s, %s, %s)"""
+        cursor.execute(sql, (registro.vehicle_id, registro.user_id, registro.parking_id, registro.rate_id, registro.entry_date, registro.status.value))
         conn.commit()
+        invalidate_counts("ENTRIES")
 
         registro.entry_id = cursor.lastrowid
         cursor.close()
-        conn.close()
 
         return registro
     except Exception:
         conn.rollback()
         raise HTTPException(status_code=400, detail="Error al registrar el ingreso")
 
-# 🔹 Obtener todos los Registros de Ingreso
-@router.get("/", response_model=list[RegistroIngreso])
-def get_entries(current_user: str = Depends(get_current_user)):
-    """Devuelve la lista de todos los registros de ingreso"""
-    conn = get_db_connection()
+# 🔹 Obtener Registros de Ingreso con filtros y paginación
+@router.get("/", response_model=PaginatedResponse[RegistroIngreso])
+def get_entries(
+    status: EstadoRegistro | None = Query(None, description="Filtrar por estado"),
+    date_from: datetime | None = Query(None, description="Fecha de ingreso desde (inclusive)"),
+    date_to: datetime | None = Query(None, description="Fecha de ingreso hasta (exclusive)"),
+    vehicle_id: int | None = Query(None, description="Filtrar por vehículo"),
+    parking_id: int | None = Query(None, description="Filtrar por parqueadero"),
+    user_id: int | None = Query(None, description="Filtrar por usuario que registró"),
+    page: int = Query(1, ge=1, description="Número de página"),
+    limit: int = Query(10, ge=1, le=100, description="Número de resultados por página"),
+    count: EstrategiaConteo = Query(EstrategiaConteo.exact, description="Cálculo del total: exact, cached, approximate o none"),
+    current_user: str = Depends(get_current_user),
+    conn = Depends(get_db)
+):
+    """Devuelve los registros de ingreso más recientes primero, con filtros y paginación"""
+    where, params = entry_filters(status.value if status else None, date_from, date_to, vehicle_id, parking_id, user_id)
+
     cursor = conn.cursor()
 
-    cursor.execute("SELECT * FROM ENTRIES")
+    # --- 1. Calcular total ---
+    count_query = "SELECT COUNT(*) as total FROM ENTRIES" + where
+    total, estimated = count_rows(cursor, "ENTRIES", count_query, params, filters_key(where, params), count)
+
+    # --- 2. Obtener página de resultados ---
+    query = "SELECT * FROM ENTRIES" + where + " ORDER BY entry_date DESC, entry_id DESC LIMIT %s OFFSET %s"
+    offset = (page - 1) * limit
+    cursor.execute(query, tuple(params + [limit, offset]))
     registros = cursor.fetchall()
 
     cursor.close()
-    conn.close()
-
-    # 🔹 Convertimos fechas a string para evitar errores
-    for registro in registros:
-        registro["entry_date"] = registro["entry_date"].strftime("%Y-%m-%d %H:%M:%S")
-        if registro.get("exit_date"):
-            registro["exit_date"] = registro["exit_date"].strftime("%Y-%m-%d %H:%M:%S")
 
-    return registros
+    return PaginatedResponse[RegistroIngreso](
+        total=total,
+        page=page,
+        limit=limit,
+        total_pages=(total + limit - 1) // limit if total is not None else None,
+        total_estimated=estimated,
+        data=[RegistroIngreso(**registro) for registro in registros]
+    )
+
+# 🔹 Exportar Registros de Ingreso (streaming NDJSON/CSV)
+@router.get("/export")
+def export_entries(
+    fmt: FormatoExportacion = Query(FormatoExportacion.ndjson, alias="format", description="Formato: ndjson o csv"),
+    status: EstadoRegistro | None = Query(None, description="Filtrar por estado"),
+    date_from: datetime | None = Query(None, description="Fecha de ingreso desde (inclusive)"),
+    date_to: datetime | None = Query(None, description="Fecha de ingreso hasta (exclusive)"),
+    vehicle_id: int | None = Query(None, description="Filtrar por vehículo"),
+    parking_id: int | None = Query(None, description="Filtrar por parqueadero"),
+    user_id: int | None = Query(None, description="Filtrar por usuario que registró"),
+    current_user: str = Depends(get_current_user)
+):
+    """Exporta los registros de ingreso filtrados por streaming, sin cargarlos en memoria"""
+    where, params = entry_filters(status.value if status else None, date_from, date_to, vehicle_id, parking_id, user_id)
+    query = "SELECT * FROM ENTRIES" + where + " ORDER BY entry_date, entry_id"
+    return export_response(stream_rows(query, params, fmt), fmt, "entries")
+
+# 🔹 Historial de parqueo de un mes en formato columnar (Parquet / Arrow IPC)
+@router.get("/history")
+def export_history(
+    month: str = Query(..., pattern=r"^\d{4}-(0[1-9]|1[0-2])$", description="Mes a exportar (YYYY-MM)"),
+    fmt: str = Query("parquet", alias="format", pattern="^(parquet|ipc)$", description="Formato: parquet o ipc"),
+    current_user: str = Depends(get_current_user)
+):
+    """Devuelve los ingresos del mes unidos con vehículo, tarifa y pago, como archivo columnar"""
+    data = history_month_bytes(month, fmt)
+    return Response(
+        content=data,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="history-{month}.{fmt}"'}
+    )
 
 # 🔹 Obtener Registro por ID
 @router.get("/{entry_id}", response_model=RegistroIngreso)
-def get_entry(entry_id: int, current_user: str = Depends(get_current_user)):
+def get_entry(entry_id: int, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Devuelve un registro de ingreso por ID"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     cursor.execute("SELECT * FROM ENTRIES WHERE entry_id = %s", (entry_id,))
     registro = cursor.fetchone()
 
     cursor.close()
-    conn.close()
 
     if not registro:
         raise HTTPException(status_code=404, detail="Registro no encontrado")
@@ -74,31 +131,29 @@ def get_entry(entry_id: int, current_user: str = Depends(get_current_user)):
 
 # 🔹 Actualizar Registro de Ingreso
 @router.put("/{entry_id}", response_model=RegistroIngreso)
-def update_entry(entry_id: int, registro: RegistroIngreso, current_user: str = Depends(get_current_user)):
+def update_entry(entry_id: int, registro: RegistroIngreso, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Actualiza los datos de un registro de ingreso"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     sql = """UPDATE ENTRIES 
-             SET vehicle_id=%s, user_id=%s, rate_id=%s, entry_date=%s, exit_date=%s, 
+             SET vehicle_id=%s, user_id=%s, parking_id=%s, rate_id=%s, entry_date=%s, exit_date=%s, 
                  total_time=%s, total_amount=%s, status=%s
              WHERE entry_id=%s"""
     cursor.execute(sql, (
-        registro.vehicle_id, registro.user_id, registro.rate_id, registro.entry_date, 
+        registro.vehicle_id, registro.user_id, registro.parking_id, registro.rate_id, registro.entry_date, 
         registro.exit_date, registro.total_time, registro.total_amount, registro.status.value, entry_id
     ))
     conn.commit()
+    invalidate_counts("ENTRIES")
 
     cursor.close()
-    conn.close()
 
     return registro
 
 # 🔹 Finalizar Registro de Ingreso
 @router.put("/{entry_id}/finalizar")
-def finalizar_entry(entry_id: int, current_user: str = Depends(get_current_user)):
+def finalizar_entry(entry_id: int, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Marca un registro de ingreso como finalizado, calcula tiempo y monto total"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     cursor.execute("SELECT * FROM ENTRIES WHERE entry_id = %s", (entry_id,))
@@ -111,21 +166,19 @@ def finalizar_entry(entry_id: int, current_user: str = Depends(get_current_user)
         raise HTTPException(status_code=400, detail="El registro ya está finalizado")
 
     # 🔹 Calcular tiempo total en minutos y monto total
-    from datetime import datetime
     exit_date = datetime.now()
     entry_date = registro["entry_date"]
     if isinstance(entry_date, str):
         entry_date = datetime.strptime(entry_date, "%Y-%m-%d %H:%M:%S")
     total_time = int((exit_date - entry_date).total_seconds() / 60)
 
-    # 🔹 Obtener el valor de la tarifa
-    cursor.execute("SELECT hourly_rate FROM RATES WHERE rate_id = %s", (registro["rate_id"],))
-    rate = cursor.fetchone()
+    # 🔹 Obtener el valor de la tarifa (cache en memoria)
+    rate = get_hourly_rate(cursor, registro["rate_id"])
 
-    if not rate:
+    if rate is None:
         raise HTTPException(status_code=404, detail="Tarifa no encontrada")
 
-    total_amount = (total_time / 60) * float(rate["hourly_rate"])
+    total_amount = calculate_fee(total_time, rate)
 
     # 🔹 Actualizar el registro
     sql = """UPDATE ENTRIES 
@@ -133,23 +186,22 @@ def finalizar_entry(entry_id: int, current_user: str = Depends(get_current_user)
              WHERE entry_id=%s"""
     cursor.execute(sql, (exit_date, total_time, total_amount, "finished", entry_id))
     conn.commit()
+    invalidate_counts("ENTRIES")
 
     cursor.close()
-    conn.close()
 
     return {"message": "Registro finalizado", "total_time": total_time, "total_amount": total_amount}
 
 # 🔹 Eliminar Registro de Ingreso
 @router.delete("/{entry_id}")
-def delete_entry(entry_id: int, current_user: str = Depends(get_current_user)):
+def delete_entry(entry_id: int, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Elimina un registro de ingreso por ID"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     cursor.execute("DELETE FROM ENTRIES WHERE entry_id = %s", (entry_id,))
     conn.commit()
+    invalidate_counts("ENTRIES")
 
     cursor.close()
-    conn.close()
 
     return {"message": "Registro eliminado correctamente"}
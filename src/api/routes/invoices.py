@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
-from src.db.database import get_db_connection
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from src.db.database import get_db
 from src.models.invoice import Factura
+from src.models.export import FormatoExportacion
+from src.core.filters import date_range
+from src.core.export import stream_rows, export_response
 from src.core.security import get_current_user
 
 router = APIRouter()
 
 # 🔹 Crear factura
 @router.post("/", response_model=Factura)
-def create_invoice(factura: Factura, current_user: str = Depends(get_current_user)):
+def create_invoice(factura: Factura, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Registra una nueva factura"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     try:
@@ -20,7 +23,6 @@ def create_invoice(factura: Factura, current_user: str = Depends(get_current_use
 
         factura.invoice_id = cursor.lastrowid
         cursor.close()
-        conn.close()
 
         return factura
     except Exception as e:
@@ -29,31 +31,40 @@ def create_invoice(factura: Factura, current_user: str = Depends(get_current_use
 
 # 🔹 Obtener todas las facturas
 @router.get("/", response_model=list[Factura])
-def get_invoices(current_user: str = Depends(get_current_user)):
+def get_invoices(current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Devuelve todas las facturas registradas"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     cursor.execute("SELECT invoice_id, payment_id, client_id, details, issue_date FROM INVOICES")
     facturas = cursor.fetchall()
 
     cursor.close()
-    conn.close()
 
     return facturas
 
+# 🔹 Exportar facturas (streaming NDJSON/CSV)
+@router.get("/export")
+def export_invoices(
+    fmt: FormatoExportacion = Query(FormatoExportacion.ndjson, alias="format", description="Formato: ndjson o csv"),
+    date_from: datetime | None = Query(None, description="Fecha de emisión desde (inclusive)"),
+    date_to: datetime | None = Query(None, description="Fecha de emisión hasta (exclusive)"),
+    current_user: str = Depends(get_current_user)
+):
+    """Exporta las facturas por rango de fecha de emisión, por streaming y sin cargarlas en memoria"""
+    where, params = date_range("issue_date", date_from, date_to)
+    query = "SELECT invoice_id, payment_id, client_id, details, issue_date FROM INVOICES" + where + " ORDER BY issue_date, invoice_id"
+    return export_response(stream_rows(query, params, fmt), fmt, "invoices")
+
 # 🔹 Obtener una factura por ID
 @router.get("/{invoice_id}", response_model=Factura)
-def get_invoice(invoice_id: int, current_user: str = Depends(get_current_user)):
+def get_invoice(invoice_id: int, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Devuelve una factura específica"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     cursor.execute("SELECT invoice_id, payment_id, client_id, details, issue_date FROM INVOICES WHERE invoice_id = %s", (invoice_id,))
     factura = cursor.fetchone()
 
     cursor.close()
-    conn.close()
 
     if not factura:
         raise HTTPException(status_code=404, detail="Factura no encontrada")
@@ -62,9 +73,8 @@ def get_invoice(invoice_id: int, current_user: str = Depends(get_current_user)):
 
 # 🔹 Actualizar factura
 @router.put("/{invoice_id}", response_model=Factura)
-def update_invoice(invoice_id: int, factura: Factura, current_user: str = Depends(get_current_user)):
+def update_invoice(invoice_id: int, factura: Factura, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Actualiza una factura"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     sql = """UPDATE INVOICES SET payment_id=%s, client_id=%s, details=%s WHERE invoice_id=%s"""
@@ -72,21 +82,18 @@ def update_invoice(invoice_id: int, factura: Factura, current_user: str = Depend
     conn.commit()
 
     cursor.close()
-    conn.close()
 
     return factura
 
 # 🔹 Eliminar factura
 @router.delete("/{invoice_id}")
-def delete_invoice(invoice_id: int, current_user: str = Depends(get_current_user)):
+def delete_invoice(invoice_id: int, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Elimina una factura por ID"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     cursor.execute("DELETE FROM INVOICES WHERE invoice_id = %s", (invoice_id,))
     conn.commit()
 
     cursor.close()
-    conn.close()
 
     return {"message": "Factura eliminada correctamente"}
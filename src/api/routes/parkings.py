@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
-from src.db.database import get_db_connection
+from src.db.database import get_db
 from src.models.parqueadero import Parqueadero
 from src.core.security import get_current_user  # Protección de rutas
 
@@ -7,9 +7,8 @@ router = APIRouter()
 
 # 🔹 Crear Parqueadero
 @router.post("/", response_model=Parqueadero)
-def create_parking(parqueadero: Parqueadero, current_user: str = Depends(get_current_user)):
+def create_parking(parqueadero: Parqueadero, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Registra un nuevo parqueadero"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     try:
@@ -19,7 +18,6 @@ def create_parking(parqueadero: Parqueadero, current_user: str = Depends(get_cur
 
         parqueadero.parking_id = cursor.lastrowid
         cursor.close()
-        conn.close()
 
         return parqueadero
     except Exception:
@@ -28,16 +26,14 @@ def create_parking(parqueadero: Parqueadero, current_user: str = Depends(get_cur
 
 # 🔹 Obtener todos los Parqueaderos
 @router.get("/", response_model=list[Parqueadero])
-def get_parkings(current_user: str = Depends(get_current_user)):
+def get_parkings(current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Devuelve la lista de todos los parqueaderos"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     cursor.execute("SELECT parking_id, total_spaces, available_spaces, created_at FROM PARKINGS")
     parqueaderos = cursor.fetchall()
 
     cursor.close()
-    conn.close()
 
     # 🔹 Convertimos `created_at` a string
     for parqueadero in parqueaderos:
@@ -47,16 +43,14 @@ def get_parkings(current_user: str = Depends(get_current_user)):
 
 # 🔹 Obtener Parqueadero por ID
 @router.get("/{parking_id}", response_model=Parqueadero)
-def get_parking(parking_id: int, current_user: str = Depends(get_current_user)):
+def get_parking(parking_id: int, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Devuelve un parqueadero por ID"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     cursor.execute("SELECT parking_id, total_spaces, available_spaces, created_at FROM PARKINGS WHERE parking_id = %s", (parking_id,))
     parqueadero = cursor.fetchone()
 
     cursor.close()
-    conn.close()
 
     if not parqueadero:
         raise HTTPException(status_code=404, detail="Parqueadero no encontrado")
@@ -68,9 +62,8 @@ def get_parking(parking_id: int, current_user: str = Depends(get_current_user)):
 
 # 🔹 Actualizar Parqueadero
 @router.put("/{parking_id}", response_model=Parqueadero)
-def update_parking(parking_id: int, parqueadero: Parqueadero, current_user: str = Depends(get_current_user)):
+def update_parking(parking_id: int, parqueadero: Parqueadero, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Actualiza los datos de un parqueadero"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     sql = """UPDATE PARKINGS SET total_spaces=%s, available_spaces=%s WHERE parking_id=%s"""
@@ -78,21 +71,18 @@ def update_parking(parking_id: int, parqueadero: Parqueadero, current_user: str
     conn.commit()
 
     cursor.close()
-    conn.close()
 
     return parqueadero
 
 # 🔹 Eliminar Parqueadero
 @router.delete("/{parking_id}")
-def delete_parking(parking_id: int, current_user: str = Depends(get_current_user)):
+def delete_parking(parking_id: int, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Elimina un parqueadero por ID"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     cursor.execute("DELETE FROM PARKINGS WHERE parking_id = %s", (parking_id,))
     conn.commit()
 
     cursor.close()
-    conn.close()
 
     return {"message": "Parqueadero eliminado correctamente"}
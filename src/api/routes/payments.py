@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
-from src.db.database import get_db_connection
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from src.db.database import get_db
 from src.models.payment import Pago
+from src.models.export import FormatoExportacion
+from src.core.filters import date_range
+from src.core.export import stream_rows, export_response
 from src.core.security import get_current_user
 
 router = APIRouter()
 
 # 🔹 Crear un pago
 @router.post("/", response_model=Pago)
-def create_payment(pago: Pago, current_user: str = Depends(get_current_user)):
+def create_payment(pago: Pago, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Registra un nuevo pago"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     try:
@@ -20,7 +23,6 @@ def create_payment(pago: Pago, current_user: str = Depends(get_current_user)):
 
         pago.payment_id = cursor.lastrowid
         cursor.close()
-        conn.close()
 
         return pago
     except Exception:
@@ -29,31 +31,40 @@ def create_payment(pago: Pago, current_user: str = Depends(get_current_user)):
 
 # 🔹 Obtener todos los pagos
 @router.get("/", response_model=list[Pago])
-def get_payments(current_user: str = Depends(get_current_user)):
+def get_payments(current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Devuelve la lista de todos los pagos"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     cursor.execute("SELECT payment_id, entry_id, payment_method, qr_code, payment_status, payment_date, created_at FROM PAYMENTS")
     pagos = cursor.fetchall()
 
     cursor.close()
-    conn.close()
 
     return pagos
 
+# 🔹 Exportar pagos (streaming NDJSON/CSV)
+@router.get("/export")
+def export_payments(
+    fmt: FormatoExportacion = Query(FormatoExportacion.ndjson, alias="format", description="Formato: ndjson o csv"),
+    date_from: datetime | None = Query(None, description="Fecha de pago desde (inclusive)"),
+    date_to: datetime | None = Query(None, description="Fecha de pago hasta (exclusive)"),
+    current_user: str = Depends(get_current_user)
+):
+    """Exporta los pagos por rango de fecha de pago, por streaming y sin cargarlos en memoria"""
+    where, params = date_range("payment_date", date_from, date_to)
+    query = "SELECT payment_id, entry_id, payment_method, qr_code, payment_status, payment_date, created_at FROM PAYMENTS" + where + " ORDER BY payment_date, payment_id"
+    return export_response(stream_rows(query, params, fmt), fmt, "payments")
+
 # 🔹 Obtener un pago por ID
 @router.get("/{payment_id}", response_model=Pago)
-def get_payment(payment_id: int, current_user: str = Depends(get_current_user)):
+def get_payment(payment_id: int, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Devuelve un pago por su ID"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     cursor.execute("SELECT payment_id, entry_id, payment_method, qr_code, payment_status, payment_date, created_at FROM PAYMENTS WHERE payment_id = %s", (payment_id,))
     pago = cursor.fetchone()
 
     cursor.close()
-    conn.close()
 
     if not pago:
         raise HTTPException(status_code=404, detail="Pago no encontrado")
@@ -62,9 +73,8 @@ def get_payment(payment_id: int, current_user: str = Depends(get_current_user)):
 
 # 🔹 Actualizar estado del pago
 @router.put("/{payment_id}", response_model=Pago)
-def update_payment(payment_id: int, pago: Pago, current_user: str = Depends(get_current_user)):
+def update_payment(payment_id: int, pago: Pago, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Actualiza el estado del pago"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     sql = """UPDATE PAYMENTS SET payment_method=%s, qr_code=%s, payment_status=%s, payment_date=%s WHERE payment_id=%s"""
@@ -72,21 +82,18 @@ def update_payment(payment_id: int, pago: Pago, current_user: str = Depends(get_
     conn.commit()
 
     cursor.close()
-    conn.close()
 
     return pago
 
 # 🔹 Eliminar un pago
 @router.delete("/{payment_id}")
-def delete_payment(payment_id: int, current_user: str = Depends(get_current_user)):
+def delete_payment(payment_id: int, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Elimina un pago por ID"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     cursor.execute("DELETE FROM PAYMENTS WHERE payment_id = %s", (payment_id,))
     conn.commit()
 
     cursor.close()
-    conn.close()
 
     return {"message": "Pago eliminado correctamente"}
@@ -1,26 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from src.db.database import get_db_connection
+from src.db.database import get_db
 from src.models.rate import Tarifa
-from src.models.paginate import PaginatedResponse
+from src.models.paginate import PaginatedResponse, CursorPaginatedResponse, EstrategiaConteo
+from src.core.pagination import resolve_after, keyset_page
+from src.core.counting import count_rows, invalidate_counts
+from src.core.rate_cache import invalidate_rates
 from src.core.security import get_current_user  # Protección de rutas
 
 router = APIRouter()
 
 # 🔹 Crear Tarifa
 @router.post("/", response_model=Tarifa)
-def create_rate(tarifa: Tarifa, current_user: str = Depends(get_current_user)):
+def create_rate(tarifa: Tarifa, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Registra una nueva tarifa"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     try:
         sql = """INSERT INTO RATES (type, hourly_rate) VALUES (%s, %s)"""
         cursor.execute(sql, (tarifa.type.value, tarifa.hourly_rate))
         conn.commit()
+        invalidate_counts("RATES")
+        invalidate_rates()
 
         tarifa.rate_id = cursor.lastrowid
         cursor.close()
-        conn.close()
 
         return tarifa
     except Exception:
@@ -28,17 +31,46 @@ def create_rate(tarifa: Tarifa, current_user: str = Depends(get_current_user)):
         raise HTTPException(status_code=400, detail="Error al registrar la tarifa")
 
 # 🔹 Obtener todas las Tarifas con busqueda y paginación
-@router.get("/", response_model=PaginatedResponse[Tarifa])
+@router.get("/", response_model=PaginatedResponse[Tarifa] | CursorPaginatedResponse[Tarifa])
 def get_rates(
     search: str | None = Query(None, description="Buscar por tipo"),
     page: int = Query(1, ge=1, description="Número de página"),
     limit: int = Query(10, ge=1, le=100, description="Número de resultados por página"),
-    current_user: str = Depends(get_current_user)
+    after: int | None = Query(None, ge=0, description="Paginación por cursor: id desde el cual continuar (0 = primera página)"),
+    page_cursor: str | None = Query(None, alias="cursor", description="Cursor opaco devuelto en `next_cursor`"),
+    count: EstrategiaConteo = Query(EstrategiaConteo.exact, description="Cálculo del total: exact, cached, approximate o none"),
+    current_user: str = Depends(get_current_user),
+    conn = Depends(get_db)
 ):
     """Devuelve la lista de todas las tarifas con paginación y búsqueda"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
+    # --- Paginación por cursor (keyset): seek por índice, sin COUNT ni OFFSET ---
+    after_id = resolve_after(after, page_cursor)
+    if after_id is not None:
+        query = "SELECT rate_id, type, hourly_rate, created_at FROM RATES WHERE rate_id > %s"
+        params = [after_id]
+        if search:
+            query += " AND (type LIKE %s)"
+            params.append(f"%{search}%")
+        query += " ORDER BY rate_id LIMIT %s"
+
+        cursor.execute(query, tuple(params + [limit + 1]))
+        rows, next_cursor = keyset_page(cursor.fetchall(), limit, "rate_id")
+
+        # Convertimos created_at a string si es datetime
+        for row in rows:
+            if row["created_at"] and hasattr(row["created_at"], "strftime"):
+                row["created_at"] = row["created_at"].strftime("%Y-%m-%d %H:%M:%S")
+
+        cursor.close()
+
+        return CursorPaginatedResponse[Tarifa](
+            limit=limit,
+            next_cursor=next_cursor,
+            data=[Tarifa(**row) for row in rows]
+        )
+
     # --- 1. Calcular total ---
     count_query = "SELECT COUNT(*) as total FROM RATES"
     params = []
@@ -46,8 +78,7 @@ def get_rates(
         count_query += " WHERE type LIKE %s"
         params.append(f"%{search}%")
 
-    cursor.execute(count_query, tuple(params))
-    total = cursor.fetchone()["total"]
+    total, estimated = count_rows(cursor, "RATES", count_query, params, search, count)
 
     # --- 2. Obtener página de resultados ---
     query = "SELECT rate_id, type, hourly_rate, created_at FROM RATES"
@@ -69,28 +100,26 @@ def get_rates(
     tarifas = [Tarifa(**row) for row in rows]
 
     cursor.close()
-    conn.close()
 
     return PaginatedResponse[Tarifa](
         total=total,
         page=page,
         limit=limit,
-        total_pages=(total + limit - 1) // limit,
+        total_pages=(total + limit - 1) // limit if total is not None else None,
+        total_estimated=estimated,
         data=tarifas
     )
 
 # 🔹 Obtener Tarifa por ID
 @router.get("/{rate_id}", response_model=Tarifa)
-def get_rate(rate_id: int, current_user: str = Depends(get_current_user)):
+def get_rate(rate_id: int, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Devuelve una tarifa por ID"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     cursor.execute("SELECT rate_id, type, hourly_rate, created_at FROM RATES WHERE rate_id = %s", (rate_id,))
     tarifa = cursor.fetchone()
 
     cursor.close()
-    conn.close()
 
     if not tarifa:
         raise HTTPException(status_code=404, detail="Tarifa no encontrada")
@@ -102,31 +131,31 @@ def get_rate(rate_id: int, current_user: str = Depends(get_current_user)):
 
 # 🔹 Actualizar Tarifa
 @router.put("/{rate_id}", response_model=Tarifa)
-def update_rate(rate_id: int, tarifa: Tarifa, current_user: str = Depends(get_current_user)):
+def update_rate(rate_id: int, tarifa: Tarifa, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Actualiza los datos de una tarifa"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     sql = """UPDATE RATES SET type=%s, hourly_rate=%s WHERE rate_id=%s"""
     cursor.execute(sql, (tarifa.type.value, tarifa.hourly_rate, rate_id))
     conn.commit()
+    invalidate_counts("RATES")
+    invalidate_rates()
 
     cursor.close()
-    conn.close()
 
     return tarifa
 
 # 🔹 Eliminar Tarifa
 @router.delete("/{rate_id}")
-def delete_rate(rate_id: int, current_user: str = Depends(get_current_user)):
+def delete_rate(rate_id: int, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Elimina una tarifa por ID"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     cursor.execute("DELETE FROM RATES WHERE rate_id = %s", (rate_id,))
     conn.commit()
+    invalidate_counts("RATES")
+    invalidate_rates()
 
     cursor.close()
-    conn.close()
 
     return {"message": "Tarifa eliminada correctamente"}
\ No newline at end of file
@@ -1,17 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from src.core.security import hash_password, get_current_user
-from src.db.database import get_db_connection
+from src.db.database import get_db
 from src.models.user import Usuario
-from src.models.paginate import PaginatedResponse
+from src.models.paginate import PaginatedResponse, CursorPaginatedResponse, EstrategiaConteo
+from src.core.pagination import resolve_after, keyset_page
+from src.core.counting import count_rows, invalidate_counts
 
 
 router = APIRouter()
 
 # 🔹 Crear usuario (Registro)
 @router.post("/", response_model=Usuario)
-def create_user(usuario: Usuario, current_user: str = Depends(get_current_user)):  # 🔒 Validación agregada
+def create_user(usuario: Usuario, current_user: str = Depends(get_current_user), conn = Depends(get_db)):  # 🔒 Validación agregada
     """Registra un nuevo usuario con contraseña encriptada"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     hashed_password = hash_password(usuario.password)
@@ -21,11 +22,11 @@ def create_user(usuario: Usuario, current_user: str = Depends(get_current_user))
                  VALUES (%s, %s, %s, %s, %s)"""
         cursor.execute(sql, (usuario.name, usuario.email, usuario.phone, hashed_password, usuario.is_superuser))
         conn.commit()
+        invalidate_counts("USERS")
 
         usuario.user_id = cursor.lastrowid
         usuario.password = None  # No devolver la contraseña
         cursor.close()
-        conn.close()
 
         return usuario
     except Exception:
@@ -33,17 +34,40 @@ def create_user(usuario: Usuario, current_user: str = Depends(get_current_user))
         raise HTTPException(status_code=400, detail="Error al crear usuario")
 
 # 🔹 Obtener todos los usuarios con busqueda y paginación
-@router.get("/", response_model=PaginatedResponse[Usuario])
+@router.get("/", response_model=PaginatedResponse[Usuario] | CursorPaginatedResponse[Usuario])
 def get_users(
     search: str | None = Query(None, description="Buscar por nombre o email"),
     page: int = Query(1, ge=1, description="Número de página"),
     limit: int = Query(10, ge=1, le=100, description="Número de resultados por página"),
-    current_user: str = Depends(get_current_user)
+    after: int | None = Query(None, ge=0, description="Paginación por cursor: id desde el cual continuar (0 = primera página)"),
+    page_cursor: str | None = Query(None, alias="cursor", description="Cursor opaco devuelto en `next_cursor`"),
+    count: EstrategiaConteo = Query(EstrategiaConteo.exact, description="Cálculo del total: exact, cached, approximate o none"),
+    current_user: str = Depends(get_current_user),
+    conn = Depends(get_db)
 ):
     """Devuelve la lista de todos los usuarios con paginación y búsqueda"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
+    # --- Paginación por cursor (keyset): seek por índice, sin COUNT ni OFFSET ---
+    after_id = resolve_after(after, page_cursor)
+    if after_id is not None:
+        query = "SELECT user_id, name, email, phone, is_superuser FROM USERS WHERE user_id > %s"
+        params = [after_id]
+        if search:
+            query += " AND (name LIKE %s OR email LIKE %s)"
+            params.extend([f"%{search}%", f"%{search}%"])
+        query += " ORDER BY user_id LIMIT %s"
+
+        cursor.execute(query, tuple(params + [limit + 1]))
+        rows, next_cursor = keyset_page(cursor.fetchall(), limit, "user_id")
+        cursor.close()
+
+        return CursorPaginatedResponse[Usuario](
+            limit=limit,
+            next_cursor=next_cursor,
+            data=[Usuario(**row) for row in rows]
+        )
+
     # --- 1. Calcular total ---
     count_query = "SELECT COUNT(*) as total FROM USERS"
     params = []
@@ -51,8 +75,7 @@ def get_users(
         count_query += " WHERE name LIKE %s OR email LIKE %s"
         params.extend([f"%{search}%", f"%{search}%"])
 
-    cursor.execute(count_query, tuple(params))
-    total = cursor.fetchone()["total"]
+    total, estimated = count_rows(cursor, "USERS", count_query, params, search, count)
 
      # --- 2. Obtener página de resultados ---
     query = "SELECT user_id, name, email, phone, is_superuser FROM USERS"
@@ -70,28 +93,26 @@ def get_users(
     usuarios = [Usuario(**row) for row in rows]
 
     cursor.close()
-    conn.close()
 
     return PaginatedResponse[Usuario](
         total=total,
         page=page,
         limit=limit,
-        total_pages=(total + limit - 1) // limit,
+        total_pages=(total + limit - 1) // limit if total is not None else None,
+        total_estimated=estimated,
         data=usuarios
     )
 
 # 🔹 Obtener usuario por ID
 @router.get("/{user_id}", response_model=Usuario)
-def get_user(user_id: int, current_user: str = Depends(get_current_user)):
+def get_user(user_id: int, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Devuelve un usuario por ID"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     cursor.execute("SELECT user_id, name, email, phone, is_superuser FROM USERS WHERE user_id = %s", (user_id,))
     usuario = cursor.fetchone()
 
     cursor.close()
-    conn.close()
 
     if not usuario:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
@@ -100,9 +121,8 @@ def get_user(user_id: int, current_user: str = Depends(get_current_user)):
 
 # 🔹 Actualizar usuario
 @router.put("/{user_id}", response_model=Usuario)
-def update_user(user_id: int, usuario: Usuario, current_user: str = Depends(get_current_user)):
+def update_user(user_id: int, usuario: Usuario, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Actualiza los datos de un usuario"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     # Si no se envía nueva contraseña, no la actualices
@@ -116,9 +136,9 @@ def update_user(user_id: int, usuario: Usuario, current_user: str = Depends(get_
 
     cursor.execute(sql, params)
     conn.commit()
+    invalidate_counts("USERS")
 
     cursor.close()
-    conn.close()
 
     usuario.user_id = user_id
     usuario.password = None  # No devolver la contraseña
@@ -126,15 +146,14 @@ def update_user(user_id: int, usuario: Usuario, current_user: str = Depends(get_
 
 # 🔹 Eliminar usuario
 @router.delete("/{user_id}")
-def delete_user(user_id: int, current_user: str = Depends(get_current_user)):
+def delete_user(user_id: int, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Elimina un usuario por ID"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     cursor.execute("DELETE FROM USERS WHERE user_id = %s", (user_id,))
     conn.commit()
+    invalidate_counts("USERS")
 
     cursor.close()
-    conn.close()
 
     return {"message": "Usuario eliminado correctamente"}
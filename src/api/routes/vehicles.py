@@ -1,26 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from src.db.database import get_db_connection
-from src.models.vehicle import Vehiculo
-from src.models.paginate import PaginatedResponse
+from src import config
+from src.db.database import get_db, PoolTimeoutError
+from src.models.vehicle import Vehiculo, BusquedaPlaca
+from src.models.paginate import PaginatedResponse, CursorPaginatedResponse, EstrategiaConteo
+from src.core.pagination import resolve_after, keyset_page
+from src.core.counting import count_rows, invalidate_counts
+from src.core.plate_index import search_plates, add_vehicle, update_vehicle as update_plate, remove_vehicle
 from src.core.security import get_current_user  # Protección de rutas
 
 router = APIRouter()
 
 # 🔹 Crear Vehículo
 @router.post("/", response_model=Vehiculo)
-def create_vehicle(vehiculo: Vehiculo, current_user: str = Depends(get_current_user)):
+def create_vehicle(vehiculo: Vehiculo, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Registra un nuevo vehículo"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     try:
         sql = """INSERT INTO VEHICLES (client_id, plate, brand, model) VALUES (%s, %s, %s, %s)"""
         cursor.execute(sql, (vehiculo.client_id, vehiculo.plate, vehiculo.brand, vehiculo.model))
         conn.commit()
+        invalidate_counts("VEHICLES")
 
         vehiculo.vehicle_id = cursor.lastrowid
+        add_vehicle(vehiculo.vehicle_id, vehiculo.plate)
         cursor.close()
-        conn.close()
 
         return vehiculo
     except Exception:
@@ -28,17 +32,46 @@ def create_vehicle(vehiculo: Vehiculo, current_user: str = Depends(get_current_u
         raise HTTPException(status_code=400, detail="Error al registrar el vehículo")
 
 # 🔹 Obtener todos los Vehículos con busqueda y paginación
-@router.get("/", response_model=PaginatedResponse[Vehiculo])
+@router.get("/", response_model=PaginatedResponse[Vehiculo] | CursorPaginatedResponse[Vehiculo])
 def get_vehicles(
     search: str | None = Query(None, description="Buscar por placa, marca o modelo"),
     page: int = Query(1, ge=1, description="Número de página"),
     limit: int = Query(10, ge=1, le=100, description="Número de resultados por página"),
-    current_user: str = Depends(get_current_user)
+    after: int | None = Query(None, ge=0, description="Paginación por cursor: id desde el cual continuar (0 = primera página)"),
+    page_cursor: str | None = Query(None, alias="cursor", description="Cursor opaco devuelto en `next_cursor`"),
+    count: EstrategiaConteo = Query(EstrategiaConteo.exact, description="Cálculo del total: exact, cached, approximate o none"),
+    current_user: str = Depends(get_current_user),
+    conn = Depends(get_db)
 ):
     """Devuelve la lista de todos los vehículos con paginación y búsqueda"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
+    # --- Paginación por cursor (keyset): seek por índice, sin COUNT ni OFFSET ---
+    after_id = resolve_after(after, page_cursor)
+    if after_id is not None:
+        query = "SELECT vehicle_id, client_id, plate, brand, model, created_at FROM VEHICLES WHERE vehicle_id > %s"
+        params = [after_id]
+        if search:
+            query += " AND (plate LIKE %s OR brand LIKE %s OR model LIKE %s)"
+            params.extend([f"%{search}%", f"%{search}%", f"%{search}%"])
+        query += " ORDER BY vehicle_id LIMIT %s"
+
+        cursor.execute(query, tuple(params + [limit + 1]))
+        rows, next_cursor = keyset_page(cursor.fetchall(), limit, "vehicle_id")
+
+        # Convertimos created_at a string si es datetime
+        for row in rows:
+            if row["created_at"] and hasattr(row["created_at"], "strftime"):
+                row["created_at"] = row["created_at"].strftime("%Y-%m-%d %H:%M:%S")
+
+        cursor.close()
+
+        return CursorPaginatedResponse[Vehiculo](
+            limit=limit,
+            next_cursor=next_cursor,
+            data=[Vehiculo(**row) for row in rows]
+        )
+
     # --- 1. Calcular total ---
     count_query = "SELECT COUNT(*) as total FROM VEHICLES"
     params = []
@@ -46,8 +79,7 @@ def get_vehicles(
         count_query += " WHERE plate LIKE %s OR brand LIKE %s OR model LIKE %s"
         params.extend([f"%{search}%", f"%{search}%", f"%{search}%"])
 
-    cursor.execute(count_query, tuple(params))
-    total = cursor.fetchone()["total"]
+    total, estimated = count_rows(cursor, "VEHICLES", count_query, params, search, count)
 
     # --- 2. Obtener página de resultados ---
     query = "SELECT vehicle_id, client_id, plate, brand, model, created_at FROM VEHICLES"
@@ -69,28 +101,40 @@ def get_vehicles(
     vehiculos = [Vehiculo(**row) for row in rows]
 
     cursor.close()
-    conn.close()
 
     return PaginatedResponse[Vehiculo](
         total=total,
         page=page,
         limit=limit,
-        total_pages=(total + limit - 1) // limit,
+        total_pages=(total + limit - 1) // limit if total is not None else None,
+        total_estimated=estimated,
         data=vehiculos
     )
 
+# 🔹 Buscar placas registradas parecidas (lecturas ANPR con errores de OCR)
+@router.get("/match", response_model=BusquedaPlaca)
+def match_plate(
+    plate: str = Query(..., min_length=1, description="Placa leída, puede tener errores"),
+    max_distance: int = Query(min(2, config.PLATE_INDEX_MAX_DISTANCE), ge=0, le=config.PLATE_INDEX_MAX_DISTANCE, description="Distancia de edición máxima"),
+    limit: int = Query(5, ge=1, le=50, description="Número máximo de coincidencias"),
+    current_user: str = Depends(get_current_user)
+):
+    """Devuelve las placas registradas más cercanas y su distancia de edición (índice en memoria, sin BD)"""
+    try:
+        return search_plates(plate, max_distance, limit)
+    except PoolTimeoutError:
+        raise HTTPException(status_code=503, detail="Base de datos ocupada, intente de nuevo")
+
 # 🔹 Obtener Vehículo por ID
 @router.get("/{vehicle_id}", response_model=Vehiculo)
-def get_vehicle(vehicle_id: int, current_user: str = Depends(get_current_user)):
+def get_vehicle(vehicle_id: int, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Devuelve un vehículo por ID"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     cursor.execute("SELECT vehicle_id, client_id, plate, brand, model, created_at FROM VEHICLES WHERE vehicle_id = %s", (vehicle_id,))
     vehiculo = cursor.fetchone()
 
     cursor.close()
-    conn.close()
 
     if not vehiculo:
         raise HTTPException(status_code=404, detail="Vehículo no encontrado")
@@ -102,31 +146,31 @@ def get_vehicle(vehicle_id: int, current_user: str = Depends(get_current_user)):
 
 # 🔹 Actualizar Vehículo
 @router.put("/{vehicle_id}", response_model=Vehiculo)
-def update_vehicle(vehicle_id: int, vehiculo: Vehiculo, current_user: str = Depends(get_current_user)):
+def update_vehicle(vehicle_id: int, vehiculo: Vehiculo, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Actualiza los datos de un vehículo"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     sql = """UPDATE VEHICLES SET client_id=%s, plate=%s, brand=%s, model=%s WHERE vehicle_id=%s"""
     cursor.execute(sql, (vehiculo.client_id, vehiculo.plate, vehiculo.brand, vehiculo.model, vehicle_id))
     conn.commit()
+    invalidate_counts("VEHICLES")
+    update_plate(vehicle_id, vehiculo.plate)
 
     cursor.close()
-    conn.close()
 
     return vehiculo
 
 # 🔹 Eliminar Vehículo
 @router.delete("/{vehicle_id}")
-def delete_vehicle(vehicle_id: int, current_user: str = Depends(get_current_user)):
+def delete_vehicle(vehicle_id: int, current_user: str = Depends(get_current_user), conn = Depends(get_db)):
     """Elimina un vehículo por ID"""
-    conn = get_db_connection()
     cursor = conn.cursor()
 
     cursor.execute("DELETE FROM VEHICLES WHERE vehicle_id = %s", (vehicle_id,))
     conn.commit()
+    invalidate_counts("VEHICLES")
+    remove_vehicle(vehicle_id)
 
     cursor.close()
-    conn.close()
 
     return {"message": "Vehículo eliminado correctamente"}
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.security import OAuth2PasswordBearer
+from src.core.counting import invalidate_counts
+from src.core.security import verify_and_update_password_async, create_access_token, revoke_token, get_current_claims_async, hash_password_async
+from src.db.async_database import get_async_db, async_db_connection, fetch_one, execute
+
+router = APIRouter()
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+
+@router.post("/login")
+async def login(request: Request):
+    """User authentication (accepts JSON and form-data)"""
+    content_type = request.headers.get("content-type", "")
+    if "application/json" in content_type:
+        data = await request.json()
+        username = data.get("username")
+        password = data.get("password")
+    else:
+        form = await request.form()
+        username = form.get("username")
+        password = form.get("password")
+
+    # The connection goes back to the pool before waiting for bcrypt, so a burst of
+    # logins queued in the hashing pool does not hold the database pool
+    async with async_db_connection() as conn:
+        user = await fetch_one(conn, "SELECT * FROM USERS WHERE email = %s", (username,))
+
+    # bcrypt is CPU bound: verify in the bounded hashing pool
+    valid, new_hash = await verify_and_update_password_async(password, user["password"]) if user else (False, None)
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # Stored hash uses an outdated bcrypt cost: replace it transparently
+    if new_hash:
+        try:
+            async with async_db_connection() as conn:
+                await execute(conn, "UPDATE USERS SET password = %s WHERE user_id = %s", (new_hash, user["user_id"]))
+        except HTTPException:
+            pass  # Database pool exhausted: the hash is replaced on a later login
+
+    access_token = create_access_token({
+        "sub": user["email"],
+        "user_id": user["user_id"],
+        "is_superuser": bool(user["is_superuser"]),
+    })
+    return {"access_token": access_token, "token_type": "bearer"}
+
+@router.post("/create_user")
+async def create_user(email: str, password: str, claims: dict = Depends(get_current_claims_async), conn = Depends(get_async_db)):
+    """Create a new user only if superuser"""
+    existing_user = await fetch_one(conn, "SELECT * FROM USERS WHERE email = %s", (email,))
+
+    if existing_user:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User already exists")
+
+    # Verify that the creator is a superuser (claim of the validated token)
+    if not claims.get("is_superuser"):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission to create users")
+
+    hashed_password = await hash_password_async(password)
+    await execute(conn, "INSERT INTO USERS (email, password, is_superuser) VALUES (%s, %s, %s)",
+                  (email, hashed_password, False))  # Creating a regular user, not a superuser
+    invalidate_counts("USERS")
+
+    return {"message": "User created successfully"}
+
+@router.post("/logout")
+async def logout(token: str = Depends(oauth2_scheme)):
+    """Revoke the current access token"""
+    revoke_token(token)
+    return {"message": "Logged out"}
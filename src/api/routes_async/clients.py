@@ -0,0 +1,117 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from src.db.async_database import get_async_db, fetch_one, fetch_all, execute
+from src.models.client import Cliente
+from src.models.paginate import PaginatedResponse, CursorPaginatedResponse, EstrategiaConteo
+from src.core.pagination import resolve_after, keyset_page
+from src.core.counting import count_rows_async, invalidate_counts
+from src.core.security import get_current_user_async  # Protección de rutas
+
+router = APIRouter()
+
+# 🔹 Crear Cliente
+@router.post("/", response_model=Cliente)
+async def create_client(cliente: Cliente, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Registra un nuevo cliente"""
+    try:
+        sql = """INSERT INTO CLIENTS (name, email, phone) VALUES (%s, %s, %s)"""
+        cliente.client_id = await execute(conn, sql, (cliente.name, cliente.email, cliente.phone))
+        invalidate_counts("CLIENTS")
+        return cliente
+    except Exception:
+        await conn.rollback()
+        raise HTTPException(status_code=400, detail="Error al crear cliente")
+
+# 🔹 Obtener todos los Clientes con busqueda y paginación
+@router.get("/", response_model=PaginatedResponse[Cliente] | CursorPaginatedResponse[Cliente])
+async def get_clients(
+    search: str | None = Query(None, description="Buscar por nombre o email"),
+    page: int = Query(1, ge=1, description="Número de página"),
+    limit: int = Query(10, ge=1, le=100, description="Número de resultados por página"),
+    after: int | None = Query(None, ge=0, description="Paginación por cursor: id desde el cual continuar (0 = primera página)"),
+    page_cursor: str | None = Query(None, alias="cursor", description="Cursor opaco devuelto en `next_cursor`"),
+    count: EstrategiaConteo = Query(EstrategiaConteo.exact, description="Cálculo del total: exact, cached, approximate o none"),
+    current_user: str = Depends(get_current_user_async),
+    conn = Depends(get_async_db)
+):
+    """Devuelve la lista de todos los clientes con paginación y búsqueda"""
+    # --- Paginación por cursor (keyset): seek por índice, sin COUNT ni OFFSET ---
+    after_id = resolve_after(after, page_cursor)
+    if after_id is not None:
+        query = "SELECT client_id, name, email, phone, created_at FROM CLIENTS WHERE client_id > %s"
+        params = [after_id]
+        if search:
+            query += " AND (name LIKE %s OR email LIKE %s)"
+            params.extend([f"%{search}%", f"%{search}%"])
+        query += " ORDER BY client_id LIMIT %s"
+
+        rows, next_cursor = keyset_page(await fetch_all(conn, query, tuple(params + [limit + 1])), limit, "client_id")
+
+        return CursorPaginatedResponse[Cliente](
+            limit=limit,
+            next_cursor=next_cursor,
+            data=[Cliente(**row) for row in rows]
+        )
+
+    # --- 1. Calcular total ---
+    count_query = "SELECT COUNT(*) as total FROM CLIENTS"
+    params = []
+    if search:
+        count_query += " WHERE name LIKE %s OR email LIKE %s"
+        params.extend([f"%{search}%", f"%{search}%"])
+
+    total, estimated = await count_rows_async(conn, "CLIENTS", count_query, params, search, count)
+
+    # --- 2. Obtener página de resultados ---
+    query = "SELECT client_id, name, email, phone, created_at FROM CLIENTS"
+    if search:
+        query += " WHERE name LIKE %s OR email LIKE %s"
+    query += " ORDER BY client_id LIMIT %s OFFSET %s"
+
+    offset = (page - 1) * limit
+    params_page = params + [limit, offset]
+
+    rows = await fetch_all(conn, query, tuple(params_page))
+
+    clientes = [Cliente(**row) for row in rows]
+
+    return PaginatedResponse[Cliente](
+        total=total,
+        page=page,
+        limit=limit,
+        total_pages=(total + limit - 1) // limit if total is not None else None,
+        total_estimated=estimated,
+        data=clientes
+    )
+
+# 🔹 Obtener Cliente por ID
+@router.get("/{client_id}", response_model=Cliente)
+async def get_client(client_id: int, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Devuelve un cliente por ID"""
+    cliente = await fetch_one(conn, "SELECT client_id, name, email, phone, created_at FROM CLIENTS WHERE client_id = %s", (client_id,))
+
+    if not cliente:
+        raise HTTPException(status_code=404, detail="Cliente no encontrado")
+
+    # 🔹 Convertimos `created_at` a string
+    cliente["created_at"] = cliente["created_at"].strftime("%Y-%m-%d %H:%M:%S")
+
+    return cliente
+
+# 🔹 Actualizar Cliente
+@router.put("/{client_id}", response_model=Cliente)
+async def update_client(client_id: int, cliente: Cliente, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Actualiza los datos de un cliente"""
+    sql = """UPDATE CLIENTS SET name=%s, email=%s, phone=%s WHERE client_id=%s"""
+    await execute(conn, sql, (cliente.name, cliente.email, cliente.phone, client_id))
+    invalidate_counts("CLIENTS")
+
+    return cliente
+
+# 🔹 Eliminar Cliente
+@router.delete("/{client_id}")
+async def delete_client(client_id: int, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Elimina un cliente por ID"""
+    await execute(conn, "DELETE FROM CLIENTS WHERE client_id = %s", (client_id,))
+    invalidate_counts("CLIENTS")
+
+    return {"message": "Cliente eliminado correctamente"}
@@ -0,0 +1,175 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from starlette.concurrency import run_in_threadpool
+from src.db.async_database import get_async_db, fetch_one, fetch_all, execute
+from src.models.entry import RegistroIngreso, EstadoRegistro
+from src.models.paginate import PaginatedResponse, EstrategiaConteo
+from src.core.counting import count_rows_async, invalidate_counts
+from src.core.filters import entry_filters, filters_key
+from src.core.export import stream_rows_async, export_response
+from src.models.export import FormatoExportacion
+from src.core.history_export import history_month_bytes, MEDIA_TYPES
+from src.core.rate_cache import get_hourly_rate_async, calculate_fee
+from src.core.security import get_current_user_async  # Protección de rutas
+
+router = APIRouter()
+
+# 🔹 Crear Registro de Ingreso
+@router.post("/", response_model=RegistroIngreso)
+async def create_entry(registro: RegistroIngreso, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Registra un nuevo ingreso de vehículo"""
+    try:
+        sql = """INSERT INTO ENTRIES
+                 (vehicle_id, user_id, parking_id, rate_id, entry_date, status)
+                 VALUES (%s, %s, %s, %s, %s, %s)"""
+        registro.entry_id = await execute(conn, sql, (registro.vehicle_id, registro.user_id, registro.parking_id, registro.rate_id, registro.entry_date, registro.status.value))
+        invalidate_counts("ENTRIES")
+        return registro
+    except Exception:
+        await conn.rollback()
+        raise HTTPException(status_code=400, detail="Error al registrar el ingreso")
+
+# 🔹 Obtener Registros de Ingreso con filtros y paginación
+@router.get("/", response_model=PaginatedResponse[RegistroIngreso])
+async def get_entries(
+    status: EstadoRegistro | None = Query(None, description="Filtrar por estado"),
+    date_from: datetime | None = Query(None, description="Fecha de ingreso desde (inclusive)"),
+    date_to: datetime | None = Query(None, description="Fecha de ingreso hasta (exclusive)"),
+    vehicle_id: int | None = Query(None, description="Filtrar por vehículo"),
+    parking_id: int | None = Query(None, description="Filtrar por parqueadero"),
+    user_id: int | None = Query(None, description="Filtrar por usuario que registró"),
+    page: int = Query(1, ge=1, description="Número de página"),
+    limit: int = Query(10, ge=1, le=100, description="Número de resultados por página"),
+    count: EstrategiaConteo = Query(EstrategiaConteo.exact, description="Cálculo del total: exact, cached, approximate o none"),
+    current_user: str = Depends(get_current_user_async),
+    conn = Depends(get_async_db)
+):
+    """Devuelve los registros de ingreso más recientes primero, con filtros y paginación"""
+    where, params = entry_filters(status.value if status else None, date_from, date_to, vehicle_id, parking_id, user_id)
+
+    # --- 1. Calcular total ---
+    count_query = "SELECT COUNT(*) as total FROM ENTRIES" + where
+    total, estimated = await count_rows_async(conn, "ENTRIES", count_query, params, filters_key(where, params), count)
+
+    # --- 2. Obtener página de resultados ---
+    query = "SELECT * FROM ENTRIES" + where + " ORDER BY entry_date DESC, entry_id DESC LIMIT %s OFFSET %s"
+    offset = (page - 1) * limit
+    registros = await fetch_all(conn, query, tuple(params + [limit, offset]))
+
+    return PaginatedResponse[RegistroIngreso](
+        total=total,
+        page=page,
+        limit=limit,
+        total_pages=(total + limit - 1) // limit if total is not None else None,
+        total_estimated=estimated,
+        data=[RegistroIngreso(**registro) for registro in registros]
+    )
+
+# 🔹 Exportar Registros de Ingreso (streaming NDJSON/CSV)
+@router.get("/export")
+async def export_entries(
+    fmt: FormatoExportacion = Query(FormatoExportacion.ndjson, alias="format", description="Formato: ndjson o csv"),
+    status: EstadoRegistro | None = Query(None, description="Filtrar por estado"),
+    date_from: datetime | None = Query(None, description="Fecha de ingreso desde (inclusive)"),
+    date_to: datetime | None = Query(None, description="Fecha de ingreso hasta (exclusive)"),
+    vehicle_id: int | None = Query(None, description="Filtrar por vehículo"),
+    parking_id: int | None = Query(None, description="Filtrar por parqueadero"),
+    user_id: int | None = Query(None, description="Filtrar por usuario que registró"),
+    current_user: str = Depends(get_current_user_async)
+):
+    """Exporta los registros de ingreso filtrados por streaming, sin cargarlos en memoria"""
+    where, params = entry_filters(status.value if status else None, date_from, date_to, vehicle_id, parking_id, user_id)
+    query = "SELECT * FROM ENTRIES" + where + " ORDER BY entry_date, entry_id"
+    return export_response(stream_rows_async(query, params, fmt), fmt, "entries")
+
+# 🔹 Historial de parqueo de un mes en formato columnar (Parquet / Arrow IPC)
+@router.get("/history")
+async def export_history(
+    month: str = Query(..., pattern=r"^\d{4}-(0[1-9]|1[0-2])$", description="Mes a exportar (YYYY-MM)"),
+    fmt: str = Query("parquet", alias="format", pattern="^(parquet|ipc)$", description="Formato: parquet o ipc"),
+    current_user: str = Depends(get_current_user_async)
+):
+    """Devuelve los ingresos del mes unidos con vehículo, tarifa y pago, como archivo columnar"""
+    data = await run_in_threadpool(history_month_bytes, month, fmt)
+    return Response(
+        content=data,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="history-{month}.{fmt}"'}
+    )
+
+# 🔹 Obtener Registro por ID
+@router.get("/{entry_id}", response_model=RegistroIngreso)
+async def get_entry(entry_id: int, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Devuelve un registro de ingreso por ID"""
+    registro = await fetch_one(conn, "SELECT * FROM ENTRIES WHERE entry_id = %s", (entry_id,))
+
+    if not registro:
+        raise HTTPException(status_code=404, detail="Registro no encontrado")
+
+    # 🔹 Convertimos fechas a string
+    registro["entry_date"] = registro["entry_date"].strftime("%Y-%m-%d %H:%M:%S")
+    if registro.get("exit_date"):
+        registro["exit_date"] = registro["exit_date"].strftime("%Y-%m-%d %H:%M:%S")
+
+    return registro
+
+# 🔹 Actualizar Registro de Ingreso
+@router.put("/{entry_id}", response_model=RegistroIngreso)
+async def update_entry(entry_id: int, registro: RegistroIngreso, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Actualiza los datos de un registro de ingreso"""
+    sql = """UPDATE ENTRIES
+             SET vehicle_id=%s, user_id=%s, parking_id=%s, rate_id=%s, entry_date=%s, exit_date=%s,
+                 total_time=%s, total_amount=%s, status=%s
+             WHERE entry_id=%s"""
+    await execute(conn, sql, (
+        registro.vehicle_id, registro.user_id, registro.parking_id, registro.rate_id, registro.entry_date,
+        registro.exit_date, registro.total_time, registro.total_amount, registro.status.value, entry_id
+    ))
+    invalidate_counts("ENTRIES")
+
+    return registro
+
+# 🔹 Finalizar Registro de Ingreso
+@router.put("/{entry_id}/finalizar")
+async def finalizar_entry(entry_id: int, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Marca un registro de ingreso como finalizado, calcula tiempo y monto total"""
+    registro = await fetch_one(conn, "SELECT * FROM ENTRIES WHERE entry_id = %s", (entry_id,))
+
+    if not registro:
+        raise HTTPException(status_code=404, detail="Registro no encontrado")
+
+    if registro["status"] == "finished":
+        raise HTTPException(status_code=400, detail="El registro ya está finalizado")
+
+    # 🔹 Calcular tiempo total en minutos y monto total
+    exit_date = datetime.now()
+    entry_date = registro["entry_date"]
+    if isinstance(entry_date, str):
+        entry_date = datetime.strptime(entry_date, "%Y-%m-%d %H:%M:%S")
+    total_time = int((exit_date - entry_date).total_seconds() / 60)
+
+    # 🔹 Obtener el valor de la tarifa (cache en memoria)
+    rate = await get_hourly_rate_async(conn, registro["rate_id"])
+
+    if rate is None:
+        raise HTTPException(status_code=404, detail="Tarifa no encontrada")
+
+    total_amount = calculate_fee(total_time, rate)
+
+    # 🔹 Actualizar el registro
+    sql = """UPDATE ENTRIES
+             SET exit_date=%s, total_time=%s, total_amount=%s, status=%s
+             WHERE entry_id=%s"""
+    await execute(conn, sql, (exit_date, total_time, total_amount, "finished", entry_id))
+    invalidate_counts("ENTRIES")
+
+    return {"message": "Registro finalizado", "total_time": total_time, "total_amount": total_amount}
+
+# 🔹 Eliminar Registro de Ingreso
+@router.delete("/{entry_id}")
+async def delete_entry(entry_id: int, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Elimina un registro de ingreso por ID"""
+    await execute(conn, "DELETE FROM ENTRIES WHERE entry_id = %s", (entry_id,))
+    invalidate_counts("ENTRIES")
+
+    return {"message": "Registro eliminado correctamente"}
@@ -0,0 +1,70 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from src.db.async_database import get_async_db, fetch_one, fetch_all, execute
+from src.models.invoice import Factura
+from src.models.export import FormatoExportacion
+from src.core.filters import date_range
+from src.core.export import stream_rows_async, export_response
+from src.core.security import get_current_user_async
+
+router = APIRouter()
+
+# 🔹 Crear factura
+@router.post("/", response_model=Factura)
+async def create_invoice(factura: Factura, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Registra una nueva factura"""
+    try:
+        sql = """INSERT INTO INVOICES (payment_id, client_id, details)
+                 VALUES (%s, %s, %s)"""
+        factura.invoice_id = await execute(conn, sql, (factura.payment_id, factura.client_id, factura.details))
+        return factura
+    except Exception as e:
+        await conn.rollback()
+        raise HTTPException(status_code=400, detail=f"Error al crear factura: {str(e)}")
+
+# 🔹 Obtener todas las facturas
+@router.get("/", response_model=list[Factura])
+async def get_invoices(current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Devuelve todas las facturas registradas"""
+    return await fetch_all(conn, "SELECT invoice_id, payment_id, client_id, details, issue_date FROM INVOICES")
+
+# 🔹 Exportar facturas (streaming NDJSON/CSV)
+@router.get("/export")
+async def export_invoices(
+    fmt: FormatoExportacion = Query(FormatoExportacion.ndjson, alias="format", description="Formato: ndjson o csv"),
+    date_from: datetime | None = Query(None, description="Fecha de emisión desde (inclusive)"),
+    date_to: datetime | None = Query(None, description="Fecha de emisión hasta (exclusive)"),
+    current_user: str = Depends(get_current_user_async)
+):
+    """Exporta las facturas por rango de fecha de emisión, por streaming y sin cargarlas en memoria"""
+    where, params = date_range("issue_date", date_from, date_to)
+    query = "SELECT invoice_id, payment_id, client_id, details, issue_date FROM INVOICES" + where + " ORDER BY issue_date, invoice_id"
+    return export_response(stream_rows_async(query, params, fmt), fmt, "invoices")
+
+# 🔹 Obtener una factura por ID
+@router.get("/{invoice_id}", response_model=Factura)
+async def get_invoice(invoice_id: int, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Devuelve una factura específica"""
+    factura = await fetch_one(conn, "SELECT invoice_id, payment_id, client_id, details, issue_date FROM INVOICES WHERE invoice_id = %s", (invoice_id,))
+
+    if not factura:
+        raise HTTPException(status_code=404, detail="Factura no encontrada")
+
+    return factura
+
+# 🔹 Actualizar factura
+@router.put("/{invoice_id}", response_model=Factura)
+async def update_invoice(invoice_id: int, factura: Factura, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Actualiza una factura"""
+    sql = """UPDATE INVOICES SET payment_id=%s, client_id=%s, details=%s WHERE invoice_id=%s"""
+    await execute(conn, sql, (factura.payment_id, factura.client_id, factura.details, invoice_id))
+
+    return factura
+
+# 🔹 Eliminar factura
+@router.delete("/{invoice_id}")
+async def delete_invoice(invoice_id: int, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Elimina una factura por ID"""
+    await execute(conn, "DELETE FROM INVOICES WHERE invoice_id = %s", (invoice_id,))
+
+    return {"message": "Factura eliminada correctamente"}
@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, HTTPException
+from src.db.async_database import get_async_db, fetch_one, fetch_all, execute
+from src.models.parqueadero import Parqueadero
+from src.core.security import get_current_user_async  # Protección de rutas
+
+router = APIRouter()
+
+# 🔹 Crear Parqueadero
+@router.post("/", response_model=Parqueadero)
+async def create_parking(parqueadero: Parqueadero, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Registra un nuevo parqueadero"""
+    try:
+        sql = """INSERT INTO PARKINGS (total_spaces, available_spaces) VALUES (%s, %s)"""
+        parqueadero.parking_id = await execute(conn, sql, (parqueadero.total_spaces, parqueadero.available_spaces))
+        return parqueadero
+    except Exception:
+        await conn.rollback()
+        raise HTTPException(status_code=400, detail="Error al registrar el parqueadero")
+
+# 🔹 Obtener todos los Parqueaderos
+@router.get("/", response_model=list[Parqueadero])
+async def get_parkings(current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Devuelve la lista de todos los parqueaderos"""
+    parqueaderos = await fetch_all(conn, "SELECT parking_id, total_spaces, available_spaces, created_at FROM PARKINGS")
+
+    # 🔹 Convertimos `created_at` a string
+    for parqueadero in parqueaderos:
+        parqueadero["created_at"] = parqueadero["created_at"].strftime("%Y-%m-%d %H:%M:%S")
+
+    return parqueaderos
+
+# 🔹 Obtener Parqueadero por ID
+@router.get("/{parking_id}", response_model=Parqueadero)
+async def get_parking(parking_id: int, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Devuelve un parqueadero por ID"""
+    parqueadero = await fetch_one(conn, "SELECT parking_id, total_spaces, available_spaces, created_at FROM PARKINGS WHERE parking_id = %s", (parking_id,))
+
+    if not parqueadero:
+        raise HTTPException(status_code=404, detail="Parqueadero no encontrado")
+
+    # 🔹 Convertimos `created_at` a string
+    parqueadero["created_at"] = parqueadero["created_at"].strftime("%Y-%m-%d %H:%M:%S")
+
+    return parqueadero
+
+# 🔹 Actualizar Parqueadero
+@router.put("/{parking_id}", response_model=Parqueadero)
+async def update_parking(parking_id: int, parqueadero: Parqueadero, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Actualiza los datos de un parqueadero"""
+    sql = """UPDATE PARKINGS SET total_spaces=%s, available_spaces=%s WHERE parking_id=%s"""
+    await execute(conn, sql, (parqueadero.total_spaces, parqueadero.available_spaces, parking_id))
+
+    return parqueadero
+
+# 🔹 Eliminar Parqueadero
+@router.delete("/{parking_id}")
+async def delete_parking(parking_id: int, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Elimina un parqueadero por ID"""
+    await execute(conn, "DELETE FROM PARKINGS WHERE parking_id = %s", (parking_id,))
+
+    return {"message": "Parqueadero eliminado correctamente"}
@@ -0,0 +1,70 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from src.db.async_database import get_async_db, fetch_one, fetch_all, execute
+from src.models.payment import Pago
+from src.models.export import FormatoExportacion
+from src.core.filters import date_range
+from src.core.export import stream_rows_async, export_response
+from src.core.security import get_current_user_async
+
+router = APIRouter()
+
+# 🔹 Crear un pago
+@router.post("/", response_model=Pago)
+async def create_payment(pago: Pago, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Registra un nuevo pago"""
+    try:
+        sql = """INSERT INTO PAYMENTS (entry_id, payment_method, qr_code, payment_status, payment_date)
+                 VALUES (%s, %s, %s, %s, %s)"""
+        pago.payment_id = await execute(conn, sql, (pago.entry_id, pago.payment_method, pago.qr_code, pago.payment_status, pago.payment_date))
+        return pago
+    except Exception:
+        await conn.rollback()
+        raise HTTPException(status_code=400, detail="Error al registrar pago")
+
+# 🔹 Obtener todos los pagos
+@router.get("/", response_model=list[Pago])
+async def get_payments(current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Devuelve la lista de todos los pagos"""
+    return await fetch_all(conn, "SELECT payment_id, entry_id, payment_method, qr_code, payment_status, payment_date, created_at FROM PAYMENTS")
+
+# 🔹 Exportar pagos (streaming NDJSON/CSV)
+@router.get("/export")
+async def export_payments(
+    fmt: FormatoExportacion = Query(FormatoExportacion.ndjson, alias="format", description="Formato: ndjson o csv"),
+    date_from: datetime | None = Query(None, description="Fecha de pago desde (inclusive)"),
+    date_to: datetime | None = Query(None, description="Fecha de pago hasta (exclusive)"),
+    current_user: str = Depends(get_current_user_async)
+):
+    """Exporta los pagos por rango de fecha de pago, por streaming y sin cargarlos en memoria"""
+    where, params = date_range("payment_date", date_from, date_to)
+    query = "SELECT payment_id, entry_id, payment_method, qr_code, payment_status, payment_date, created_at FROM PAYMENTS" + where + " ORDER BY payment_date, payment_id"
+    return export_response(stream_rows_async(query, params, fmt), fmt, "payments")
+
+# 🔹 Obtener un pago por ID
+@router.get("/{payment_id}", response_model=Pago)
+async def get_payment(payment_id: int, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Devuelve un pago por su ID"""
+    pago = await fetch_one(conn, "SELECT payment_id, entry_id, payment_method, qr_code, payment_status, payment_date, created_at FROM PAYMENTS WHERE payment_id = %s", (payment_id,))
+
+    if not pago:
+        raise HTTPException(status_code=404, detail="Pago no encontrado")
+
+    return pago
+
+# 🔹 Actualizar estado del pago
+@router.put("/{payment_id}", response_model=Pago)
+async def update_payment(payment_id: int, pago: Pago, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Actualiza el estado del pago"""
+    sql = """UPDATE PAYMENTS SET payment_method=%s, qr_code=%s, payment_status=%s, payment_date=%s WHERE payment_id=%s"""
+    await execute(conn, sql, (pago.payment_method, pago.qr_code, pago.payment_status, pago.payment_date, payment_id))
+
+    return pago
+
+# 🔹 Eliminar un pago
+@router.delete("/{payment_id}")
+async def delete_payment(payment_id: int, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Elimina un pago por ID"""
+    await execute(conn, "DELETE FROM PAYMENTS WHERE payment_id = %s", (payment_id,))
+
+    return {"message": "Pago eliminado correctamente"}
@@ -0,0 +1,131 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from src.db.async_database import get_async_db, fetch_one, fetch_all, execute
+from src.models.rate import Tarifa
+from src.models.paginate import PaginatedResponse, CursorPaginatedResponse, EstrategiaConteo
+from src.core.pagination import resolve_after, keyset_page
+from src.core.counting import count_rows_async, invalidate_counts
+from src.core.rate_cache import invalidate_rates
+from src.core.security import get_current_user_async  # Protección de rutas
+
+router = APIRouter()
+
+# 🔹 Crear Tarifa
+@router.post("/", response_model=Tarifa)
+async def create_rate(tarifa: Tarifa, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Registra una nueva tarifa"""
+    try:
+        sql = """INSERT INTO RATES (type, hourly_rate) VALUES (%s, %s)"""
+        tarifa.rate_id = await execute(conn, sql, (tarifa.type.value, tarifa.hourly_rate))
+        invalidate_counts("RATES")
+        invalidate_rates()
+        return tarifa
+    except Exception:
+        await conn.rollback()
+        raise HTTPException(status_code=400, detail="Error al registrar la tarifa")
+
+# 🔹 Obtener todas las Tarifas con busqueda y paginación
+@router.get("/", response_model=PaginatedResponse[Tarifa] | CursorPaginatedResponse[Tarifa])
+async def get_rates(
+    search: str | None = Query(None, description="Buscar por tipo"),
+    page: int = Query(1, ge=1, description="Número de página"),
+    limit: int = Query(10, ge=1, le=100, description="Número de resultados por página"),
+    after: int | None = Query(None, ge=0, description="Paginación por cursor: id desde el cual continuar (0 = primera página)"),
+    page_cursor: str | None = Query(None, alias="cursor", description="Cursor opaco devuelto en `next_cursor`"),
+    count: EstrategiaConteo = Query(EstrategiaConteo.exact, description="Cálculo del total: exact, cached, approximate o none"),
+    current_user: str = Depends(get_current_user_async),
+    conn = Depends(get_async_db)
+):
+    """Devuelve la lista de todas las tarifas con paginación y búsqueda"""
+    # --- Paginación por cursor (keyset): seek por índice, sin COUNT ni OFFSET ---
+    after_id = resolve_after(after, page_cursor)
+    if after_id is not None:
+        query = "SELECT rate_id, type, hourly_rate, created_at FROM RATES WHERE rate_id > %s"
+        params = [after_id]
+        if search:
+            query += " AND (type LIKE %s)"
+            params.append(f"%{search}%")
+        query += " ORDER BY rate_id LIMIT %s"
+
+        rows, next_cursor = keyset_page(await fetch_all(conn, query, tuple(params + [limit + 1])), limit, "rate_id")
+
+        # Convertimos created_at a string si es datetime
+        for row in rows:
+            if row["created_at"] and hasattr(row["created_at"], "strftime"):
+                row["created_at"] = row["created_at"].strftime("%Y-%m-%d %H:%M:%S")
+
+        return CursorPaginatedResponse[Tarifa](
+            limit=limit,
+            next_cursor=next_cursor,
+            data=[Tarifa(**row) for row in rows]
+        )
+
+    # --- 1. Calcular total ---
+    count_query = "SELECT COUNT(*) as total FROM RATES"
+    params = []
+    if search:
+        count_query += " WHERE type LIKE %s"
+        params.append(f"%{search}%")
+
+    total, estimated = await count_rows_async(conn, "RATES", count_query, params, search, count)
+
+    # --- 2. Obtener página de resultados ---
+    query = "SELECT rate_id, type, hourly_rate, created_at FROM RATES"
+    if search:
+        query += " WHERE type LIKE %s"
+    query += " ORDER BY rate_id LIMIT %s OFFSET %s"
+
+    offset = (page - 1) * limit
+    params_page = params + [limit, offset]
+
+    rows = await fetch_all(conn, query, tuple(params_page))
+
+    # Convertimos created_at a string si es datetime
+    for row in rows:
+        if row["created_at"] and hasattr(row["created_at"], "strftime"):
+            row["created_at"] = row["created_at"].strftime("%Y-%m-%d %H:%M:%S")
+
+    tarifas = [Tarifa(**row) for row in rows]
+
+    return PaginatedResponse[Tarifa](
+        total=total,
+        page=page,
+        limit=limit,
+        total_pages=(total + limit - 1) // limit if total is not None else None,
+        total_estimated=estimated,
+        data=tarifas
+    )
+
+# 🔹 Obtener Tarifa por ID
+@router.get("/{rate_id}", response_model=Tarifa)
+async def get_rate(rate_id: int, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Devuelve una tarifa por ID"""
+    tarifa = await fetch_one(conn, "SELECT rate_id, type, hourly_rate, created_at FROM RATES WHERE rate_id = %s", (rate_id,))
+
+    if not tarifa:
+        raise HTTPException(status_code=404, detail="Tarifa no encontrada")
+
+    # 🔹 Convertimos `created_at` a string
+    tarifa["created_at"] = tarifa["created_at"].strftime("%Y-%m-%d %H:%M:%S")
+
+    return tarifa
+
+# 🔹 Actualizar Tarifa
+@router.put("/{rate_id}", response_model=Tarifa)
+async def update_rate(rate_id: int, tarifa: Tarifa, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Actualiza los datos de una tarifa"""
+    sql = """UPDATE RATES SET type=%s, hourly_rate=%s WHERE rate_id=%s"""
+    await execute(conn, sql, (tarifa.type.value, tarifa.hourly_rate, rate_id))
+    invalidate_counts("RATES")
+    invalidate_rates()
+
+    return tarifa
+
+# 🔹 Eliminar Tarifa
+@router.delete("/{rate_id}")
+async def delete_rate(rate_id: int, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Elimina una tarifa por ID"""
+    await execute(conn, "DELETE FROM RATES WHERE rate_id = %s", (rate_id,))
+    invalidate_counts("RATES")
+    invalidate_rates()
+
+    return {"message": "Tarifa eliminada correctamente"}
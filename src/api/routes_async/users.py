@@ -0,0 +1,131 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from src.core.security import hash_password_async, get_current_user_async
+from src.db.async_database import get_async_db, fetch_one, fetch_all, execute
+from src.models.user import Usuario
+from src.models.paginate import PaginatedResponse, CursorPaginatedResponse, EstrategiaConteo
+from src.core.pagination import resolve_after, keyset_page
+from src.core.counting import count_rows_async, invalidate_counts
+
+
+router = APIRouter()
+
+# 🔹 Crear usuario (Registro)
+@router.post("/", response_model=Usuario)
+async def create_user(usuario: Usuario, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):  # 🔒 Validación agregada
+    """Registra un nuevo usuario con contraseña encriptada"""
+    # bcrypt consume CPU: se ejecuta fuera del event loop
+    hashed_password = await hash_password_async(usuario.password)
+
+    try:
+        sql = """INSERT INTO USERS (name, email, phone, password, is_superuser)
+                 VALUES (%s, %s, %s, %s, %s)"""
+        usuario.user_id = await execute(conn, sql, (usuario.name, usuario.email, usuario.phone, hashed_password, usuario.is_superuser))
+        invalidate_counts("USERS")
+        usuario.password = None  # No devolver la contraseña
+        return usuario
+    except Exception:
+        await conn.rollback()
+        raise HTTPException(status_code=400, detail="Error al crear usuario")
+
+# 🔹 Obtener todos los usuarios con busqueda y paginación
+@router.get("/", response_model=PaginatedResponse[Usuario] | CursorPaginatedResponse[Usuario])
+async def get_users(
+    search: str | None = Query(None, description="Buscar por nombre o email"),
+    page: int = Query(1, ge=1, description="Número de página"),
+    limit: int = Query(10, ge=1, le=100, description="Número de resultados por página"),
+    after: int | None = Query(None, ge=0, description="Paginación por cursor: id desde el cual continuar (0 = primera página)"),
+    page_cursor: str | None = Query(None, alias="cursor", description="Cursor opaco devuelto en `next_cursor`"),
+    count: EstrategiaConteo = Query(EstrategiaConteo.exact, description="Cálculo del total: exact, cached, approximate o none"),
+    current_user: str = Depends(get_current_user_async),
+    conn = Depends(get_async_db)
+):
+    """Devuelve la lista de todos los usuarios con paginación y búsqueda"""
+    # --- Paginación por cursor (keyset): seek por índice, sin COUNT ni OFFSET ---
+    after_id = resolve_after(after, page_cursor)
+    if after_id is not None:
+        query = "SELECT user_id, name, email, phone, is_superuser FROM USERS WHERE user_id > %s"
+        params = [after_id]
+        if search:
+            query += " AND (name LIKE %s OR email LIKE %s)"
+            params.extend([f"%{search}%", f"%{search}%"])
+        query += " ORDER BY user_id LIMIT %s"
+
+        rows, next_cursor = keyset_page(await fetch_all(conn, query, tuple(params + [limit + 1])), limit, "user_id")
+
+        return CursorPaginatedResponse[Usuario](
+            limit=limit,
+            next_cursor=next_cursor,
+            data=[Usuario(**row) for row in rows]
+        )
+
+    # --- 1. Calcular total ---
+    count_query = "SELECT COUNT(*) as total FROM USERS"
+    params = []
+    if search:
+        count_query += " WHERE name LIKE %s OR email LIKE %s"
+        params.extend([f"%{search}%", f"%{search}%"])
+
+    total, estimated = await count_rows_async(conn, "USERS", count_query, params, search, count)
+
+    # --- 2. Obtener página de resultados ---
+    query = "SELECT user_id, name, email, phone, is_superuser FROM USERS"
+    if search:
+        query += " WHERE name LIKE %s OR email LIKE %s"
+    query += " ORDER BY user_id LIMIT %s OFFSET %s"
+
+    offset = (page - 1) * limit
+    params_page = params + [limit, offset]
+
+    rows = await fetch_all(conn, query, tuple(params_page))
+
+    # Convertir cada fila (dict) en un objeto Usuario
+    usuarios = [Usuario(**row) for row in rows]
+
+    return PaginatedResponse[Usuario](
+        total=total,
+        page=page,
+        limit=limit,
+        total_pages=(total + limit - 1) // limit if total is not None else None,
+        total_estimated=estimated,
+        data=usuarios
+    )
+
+# 🔹 Obtener usuario por ID
+@router.get("/{user_id}", response_model=Usuario)
+async def get_user(user_id: int, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Devuelve un usuario por ID"""
+    usuario = await fetch_one(conn, "SELECT user_id, name, email, phone, is_superuser FROM USERS WHERE user_id = %s", (user_id,))
+
+    if not usuario:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+
+    return usuario
+
+# 🔹 Actualizar usuario
+@router.put("/{user_id}", response_model=Usuario)
+async def update_user(user_id: int, usuario: Usuario, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Actualiza los datos de un usuario"""
+    # Si no se envía nueva contraseña, no la actualices
+    if usuario.password:
+        hashed_password = await hash_password_async(usuario.password)
+        sql = "UPDATE USERS SET name=%s, email=%s, phone=%s, password=%s, is_superuser=%s WHERE user_id=%s"
+        params = (usuario.name, usuario.email, usuario.phone, hashed_password, usuario.is_superuser, user_id)
+    else:
+        sql = "UPDATE USERS SET name=%s, email=%s, phone=%s, is_superuser=%s WHERE user_id=%s"
+        params = (usuario.name, usuario.email, usuario.phone, usuario.is_superuser, user_id)
+
+    await execute(conn, sql, params)
+    invalidate_counts("USERS")
+
+    usuario.user_id = user_id
+    usuario.password = None  # No devolver la contraseña
+    return usuario
+
+# 🔹 Eliminar usuario
+@router.delete("/{user_id}")
+async def delete_user(user_id: int, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Elimina un usuario por ID"""
+    await execute(conn, "DELETE FROM USERS WHERE user_id = %s", (user_id,))
+    invalidate_counts("USERS")
+
+    return {"message": "Usuario eliminado correctamente"}
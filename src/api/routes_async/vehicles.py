@@ -0,0 +1,143 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from src import config
+from src.db.async_database import get_async_db, fetch_one, fetch_all, execute
+from src.models.vehicle import Vehiculo, BusquedaPlaca
+from src.models.paginate import PaginatedResponse, CursorPaginatedResponse, EstrategiaConteo
+from src.core.pagination import resolve_after, keyset_page
+from src.core.counting import count_rows_async, invalidate_counts
+from src.core.plate_index import search_plates_async, add_vehicle, update_vehicle as update_plate, remove_vehicle
+from src.core.security import get_current_user_async  # Protección de rutas
+
+router = APIRouter()
+
+# 🔹 Crear Vehículo
+@router.post("/", response_model=Vehiculo)
+async def create_vehicle(vehiculo: Vehiculo, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Registra un nuevo vehículo"""
+    try:
+        sql = """INSERT INTO VEHICLES (client_id, plate, brand, model) VALUES (%s, %s, %s, %s)"""
+        vehiculo.vehicle_id = await execute(conn, sql, (vehiculo.client_id, vehiculo.plate, vehiculo.brand, vehiculo.model))
+        invalidate_counts("VEHICLES")
+        add_vehicle(vehiculo.vehicle_id, vehiculo.plate)
+        return vehiculo
+    except Exception:
+        await conn.rollback()
+        raise HTTPException(status_code=400, detail="Error al registrar el vehículo")
+
+# 🔹 Obtener todos los Vehículos con busqueda y paginación
+@router.get("/", response_model=PaginatedResponse[Vehiculo] | CursorPaginatedResponse[Vehiculo])
+async def get_vehicles(
+    search: str | None = Query(None, description="Buscar por placa, marca o modelo"),
+    page: int = Query(1, ge=1, description="Número de página"),
+    limit: int = Query(10, ge=1, le=100, description="Número de resultados por página"),
+    after: int | None = Query(None, ge=0, description="Paginación por cursor: id desde el cual continuar (0 = primera página)"),
+    page_cursor: str | None = Query(None, alias="cursor", description="Cursor opaco devuelto en `next_cursor`"),
+    count: EstrategiaConteo = Query(EstrategiaConteo.exact, description="Cálculo del total: exact, cached, approximate o none"),
+    current_user: str = Depends(get_current_user_async),
+    conn = Depends(get_async_db)
+):
+    """Devuelve la lista de todos los vehículos con paginación y búsqueda"""
+    # --- Paginación por cursor (keyset): seek por índice, sin COUNT ni OFFSET ---
+    after_id = resolve_after(after, page_cursor)
+    if after_id is not None:
+        query = "SELECT vehicle_id, client_id, plate, brand, model, created_at FROM VEHICLES WHERE vehicle_id > %s"
+        params = [after_id]
+        if search:
+            query += " AND (plate LIKE %s OR brand LIKE %s OR model LIKE %s)"
+            params.extend([f"%{search}%", f"%{search}%", f"%{search}%"])
+        query += " ORDER BY vehicle_id LIMIT %s"
+
+        rows, next_cursor = keyset_page(await fetch_all(conn, query, tuple(params + [limit + 1])), limit, "vehicle_id")
+
+        # Convertimos created_at a string si es datetime
+        for row in rows:
+            if row["created_at"] and hasattr(row["created_at"], "strftime"):
+                row["created_at"] = row["created_at"].strftime("%Y-%m-%d %H:%M:%S")
+
+        return CursorPaginatedResponse[Vehiculo](
+            limit=limit,
+            next_cursor=next_cursor,
+            data=[Vehiculo(**row) for row in rows]
+        )
+
+    # --- 1. Calcular total ---
+    count_query = "SELECT COUNT(*) as total FROM VEHICLES"
+    params = []
+    if search:
+        count_query += " WHERE plate LIKE %s OR brand LIKE %s OR model LIKE %s"
+        params.extend([f"%{search}%", f"%{search}%", f"%{search}%"])
+
+    total, estimated = await count_rows_async(conn, "VEHICLES", count_query, params, search, count)
+
+    # --- 2. Obtener página de resultados ---
+    query = "SELECT vehicle_id, client_id, plate, brand, model, created_at FROM VEHICLES"
+    if search:
+        query += " WHERE plate LIKE %s OR brand LIKE %s OR model LIKE %s"
+    query += " ORDER BY vehicle_id LIMIT %s OFFSET %s"
+
+    offset = (page - 1) * limit
+    params_page = params + [limit, offset]
+
+    rows = await fetch_all(conn, query, tuple(params_page))
+
+    # Convertimos created_at a string si es datetime
+    for row in rows:
+        if row["created_at"] and hasattr(row["created_at"], "strftime"):
+            row["created_at"] = row["created_at"].strftime("%Y-%m-%d %H:%M:%S")
+
+    vehiculos = [Vehiculo(**row) for row in rows]
+
+    return PaginatedResponse[Vehiculo](
+        total=total,
+        page=page,
+        limit=limit,
+        total_pages=(total + limit - 1) // limit if total is not None else None,
+        total_estimated=estimated,
+        data=vehiculos
+    )
+
+# 🔹 Buscar placas registradas parecidas (lecturas ANPR con errores de OCR)
+@router.get("/match", response_model=BusquedaPlaca)
+async def match_plate(
+    plate: str = Query(..., min_length=1, description="Placa leída, puede tener errores"),
+    max_distance: int = Query(min(2, config.PLATE_INDEX_MAX_DISTANCE), ge=0, le=config.PLATE_INDEX_MAX_DISTANCE, description="Distancia de edición máxima"),
+    limit: int = Query(5, ge=1, le=50, description="Número máximo de coincidencias"),
+    current_user: str = Depends(get_current_user_async)
+):
+    """Devuelve las placas registradas más cercanas y su distancia de edición (índice en memoria, sin BD)"""
+    return await search_plates_async(plate, max_distance, limit)
+
+# 🔹 Obtener Vehículo por ID
+@router.get("/{vehicle_id}", response_model=Vehiculo)
+async def get_vehicle(vehicle_id: int, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Devuelve un vehículo por ID"""
+    vehiculo = await fetch_one(conn, "SELECT vehicle_id, client_id, plate, brand, model, created_at FROM VEHICLES WHERE vehicle_id = %s", (vehicle_id,))
+
+    if not vehiculo:
+        raise HTTPException(status_code=404, detail="Vehículo no encontrado")
+
+    # 🔹 Convertimos `created_at` a string
+    vehiculo["created_at"] = vehiculo["created_at"].strftime("%Y-%m-%d %H:%M:%S")
+
+    return vehiculo
+
+# 🔹 Actualizar Vehículo
+@router.put("/{vehicle_id}", response_model=Vehiculo)
+async def update_vehicle(vehicle_id: int, vehiculo: Vehiculo, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Actualiza los datos de un vehículo"""
+    sql = """UPDATE VEHICLES SET client_id=%s, plate=%s, brand=%s, model=%s WHERE vehicle_id=%s"""
+    await execute(conn, sql, (vehiculo.client_id, vehiculo.plate, vehiculo.brand, vehiculo.model, vehicle_id))
+    invalidate_counts("VEHICLES")
+    update_plate(vehicle_id, vehiculo.plate)
+
+    return vehiculo
+
+# 🔹 Eliminar Vehículo
+@router.delete("/{vehicle_id}")
+async def delete_vehicle(vehicle_id: int, current_user: str = Depends(get_current_user_async), conn = Depends(get_async_db)):
+    """Elimina un vehículo por ID"""
+    await execute(conn, "DELETE FROM VEHICLES WHERE vehicle_id = %s", (vehicle_id,))
+    invalidate_counts("VEHICLES")
+    remove_vehicle(vehicle_id)
+
+    return {"message": "Vehículo eliminado correctamente"}
@@ -0,0 +1,180 @@
+import argparse
+import json
+import subprocess
+import time
+from collections import defaultdict
+
+import cv2
+
+from src import config
+from src.benchmarks.stats import latency_summary
+from src.plate_detection import ANPR
+
+
+class _StageTimer:
+    """Acumula la latencia de cada etapa del pipeline (en segundos)"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.recording = True  # Falso durante el calentamiento
+
+    def add(self, stage, elapsed):
+        if self.recording:
+            self.latencies[stage].append(elapsed)
+
+    def wrap(self, stage, fn):
+        """`fn` cronometrada como `stage` (para etapas internas del tracker)"""
+        def timed(*args):
+            start = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self.add(stage, time.perf_counter() - start)
+        return timed
+
+
+def _direct_step(timer, frame):
+    """Los pasos de `detectar_placa`, cronometrados uno a uno"""
+    start = time.perf_counter()
+    boxes = ANPR.detect_boxes(frame)
+    timer.add("detect", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    rois = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in boxes]
+    timer.add("crop", time.perf_counter() - start)
+
+    reads = []
+    if rois:
+        start = time.perf_counter()
+        reads = ANPR.read_plates(rois)
+        timer.add("ocr", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for (x1, y1, x2, y2), read in zip(boxes, reads):
+        if read:
+            cv2.putText(frame, read[0], (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 0, 255), 2)
+    timer.add("annotate", time.perf_counter() - start)
+    return frame
+
+
+def _stream_processor(timer):
+    """El procesador de `generate_frames` (compuerta + tracker) con detección y OCR cronometrados"""
+    detect, read = ANPR.detect_boxes, ANPR._read_uncached
+    ANPR.detect_boxes, ANPR._read_uncached = timer.wrap("detect", detect), timer.wrap("ocr", read)
+    try:
+        process = ANPR._frame_processor("benchmark", publish=lambda *args: None)
+    finally:
+        ANPR.detect_boxes, ANPR._read_uncached = detect, read
+    return timer.wrap("process", process)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(video: str, mode: str = "direct", max_frames: int = 0, warmup: int = 5):
+    """Recorre un video grabado con el pipeline ANPR y mide cada etapa por cuadro.
+
+    `direct` mide los pasos de `detectar_placa` (detección, recorte, OCR, anotación);
+    `stream` mide el procesador de `generate_frames` (compuerta de movimiento, tracker,
+    votación) con la detección y el OCR que ejecuta dentro. En ambos se mide además la
+    captura y la codificación JPEG.
+    """
+    start = time.perf_counter()
+    ANPR.load_models()
+    load_s = time.perf_counter() - start
+
+    timer = _StageTimer()
+    step = _stream_processor(timer) if mode == "stream" else (lambda frame: _direct_step(timer, frame))
+
+    cap = cv2.VideoCapture(video)
+    if not cap.isOpened():
+        raise ValueError(f"No se pudo abrir el video: {video}")
+    resolution = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+
+    frames, elapsed = 0, 0.0
+    try:
+        index = 0
+        while not max_frames or frames < max_frames:
+            # Las primeras inferencias de torch incluyen inicializaciones: no se cuentan
+            timer.recording = index >= warmup
+            frame_start = time.perf_counter()
+
+            ret, frame = cap.read()
+            timer.add("capture", time.perf_counter() - frame_start)
+            if not ret:
+                break
+
+            frame = step(frame)
+
+            start = time.perf_counter()
+            cv2.imencode('.jpg', frame)
+            timer.add("encode", time.perf_counter() - start)
+
+            total = time.perf_counter() - frame_start
+            timer.add("total", total)
+            if timer.recording:
+                frames += 1
+                elapsed += total
+            index += 1
+    finally:
+        cap.release()
+
+    return {
+        "video": video,
+        "mode": mode,
+        "commit": _git_commit(),
+        "resolution": resolution,
+        "frames": frames,
+        "warmup_frames": warmup,
+        "model_load_s": round(load_s, 2),
+        "fps": round(frames / elapsed, 2) if elapsed else 0.0,
+        "settings": {
+            "model": ANPR.MODEL_PATH,
+            "detector_backend": config.ANPR_DETECTOR_BACKEND,
+            "detector_int8": config.ANPR_DETECTOR_INT8,
+            "detector_imgsz": config.ANPR_DETECTOR_IMGSZ,
+            "zone": config.ANPR_ZONE,
+            "detect_width": config.ANPR_DETECT_WIDTH,
+            "detect_every": config.ANPR_DETECT_EVERY,
+            "motion_gate": config.ANPR_MOTION_GATE,
+            "ocr_height": config.ANPR_OCR_HEIGHT,
+            "ocr_batch_wait_ms": config.ANPR_OCR_BATCH_WAIT_MS,
+            "ocr_cache_size": config.ANPR_OCR_CACHE_SIZE,
+        },
+        "stages": {stage: latency_summary(latencies) for stage, latencies in timer.latencies.items()},
+        "ocr_cache": ANPR.ocr_cache.stats() if ANPR.ocr_cache is not None else None,
+    }
+
+
+# -------------------------
+# Ejecución como script
+# -------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline ANPR por etapas sobre un video grabado")
+    parser.add_argument("video", help="Video de prueba (fixture)")
+    parser.add_argument("--mode", choices=("direct", "stream"), default="direct",
+                        help="direct: pasos de detectar_placa; stream: procesador de generate_frames")
+    parser.add_argument("--max-frames", type=int, default=0, help="Cuadros medidos como máximo (0 = todo el video)")
+    parser.add_argument("--warmup", type=int, default=5, help="Cuadros iniciales que no se cuentan")
+    parser.add_argument("--model", default=ANPR.MODEL_PATH, help="Pesos YOLO a usar")
+    parser.add_argument("--detect-width", type=int, default=config.ANPR_DETECT_WIDTH)
+    parser.add_argument("--detect-every", default=config.ANPR_DETECT_EVERY)
+    parser.add_argument("--output", help="Guardar el resultado en un archivo JSON")
+    args = parser.parse_args()
+
+    ANPR.MODEL_PATH = args.model
+    config.ANPR_DETECT_WIDTH = args.detect_width
+    config.ANPR_DETECT_EVERY = str(args.detect_every).lower()
+    try:
+        result = run(args.video, args.mode, args.max_frames, args.warmup)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
@@ -0,0 +1,106 @@
+import argparse
+import glob
+import json
+import os
+import time
+
+import cv2
+
+from src import config
+from src.benchmarks.stats import latency_summary
+from src.plate_detection import detector
+from src.plate_detection.ANPR import MODEL_PATH
+from src.plate_detection.tracking import iou
+
+VARIANTS = ("torch", "onnx", "onnx-int8", "openvino", "openvino-int8")
+
+
+def _load_images(folder):
+    paths = sorted(p for ext in detector.IMAGE_EXTENSIONS for p in glob.glob(os.path.join(folder, f"*.{ext}")))
+    images = [cv2.imread(path) for path in paths]
+    return [image for image in images if image is not None]
+
+
+def _detect(model, image, imgsz):
+    results = model.predict(image, conf=0.25, imgsz=imgsz, verbose=False)
+    return [tuple(float(v) for v in box.xyxy[0]) for r in results for box in r.boxes]
+
+
+def _agreement(reference, boxes, min_iou=0.5):
+    """Precisión/recall de `boxes` tomando las cajas de PyTorch como verdad (asociación voraz por IoU)"""
+    matched, overlaps = 0, []
+    for ref_boxes, found in zip(reference, boxes):
+        unmatched = list(found)
+        for ref in ref_boxes:
+            best = max(unmatched, key=lambda box: iou(ref, box), default=None)
+            if best is not None and iou(ref, best) >= min_iou:
+                overlaps.append(iou(ref, best))
+                unmatched.remove(best)
+                matched += 1
+    expected, predicted = sum(map(len, reference)), sum(map(len, boxes))
+    return {
+        "precision": round(matched / predicted, 3) if predicted else None,
+        "recall": round(matched / expected, 3) if expected else None,
+        "mean_iou": round(sum(overlaps) / len(overlaps), 3) if overlaps else None,
+    }
+
+
+def run(images, variants, weights: str = MODEL_PATH, imgsz: int = 640, repeat: int = 3):
+    """Latencia, FPS y coincidencia con PyTorch de cada backend del detector sobre las mismas imágenes"""
+    results, reference = {}, None
+    for variant in ("torch",) + tuple(v for v in variants if v != "torch"):
+        backend, _, quantized = variant.partition("-")
+        try:
+            model = detector.load_detector(backend, weights, int8=quantized == "int8")
+        except (FileNotFoundError, ImportError) as e:
+            results[variant] = {"error": str(e)}
+            continue
+
+        _detect(model, images[0], imgsz)  # Calentamiento
+        latencies, boxes = [], []
+        for i in range(repeat):
+            for image in images:
+                start = time.perf_counter()
+                found = _detect(model, image, imgsz)
+                latencies.append(time.perf_counter() - start)
+                if i == 0:
+                    boxes.append(found)
+
+        summary = latency_summary(latencies)
+        results[variant] = {
+            "fps": round(1000 / summary["mean_ms"], 2) if summary["mean_ms"] else 0.0,
+            "latency": summary,
+            "detections": sum(map(len, boxes)),
+        }
+        if variant == "torch":
+            reference = boxes
+        elif reference is not None:
+            results[variant]["vs_torch"] = _agreement(reference, boxes)
+            if results["torch"]["latency"]["mean_ms"] and summary["mean_ms"]:
+                results[variant]["speedup"] = round(results["torch"]["latency"]["mean_ms"] / summary["mean_ms"], 2)
+
+    return {"images": len(images), "repeat": repeat, "imgsz": imgsz, "weights": weights, "backends": results}
+
+
+# -------------------------
+# Ejecución como script
+# -------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara los backends del detector (PyTorch, ONNX, OpenVINO) en CPU")
+    parser.add_argument("images", help="Carpeta con cuadros del carril (jpg/png)")
+    parser.add_argument("--backends", nargs="+", choices=VARIANTS, default=["onnx", "onnx-int8"],
+                        help="Backends a comparar contra PyTorch (deben estar exportados)")
+    parser.add_argument("--weights", default=MODEL_PATH)
+    parser.add_argument("--imgsz", type=int, default=config.ANPR_DETECTOR_IMGSZ)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Guardar el resultado en un archivo JSON")
+    args = parser.parse_args()
+
+    images = _load_images(args.images)
+    if not images:
+        raise SystemExit(f"No hay imágenes en {args.images}")
+    result = run(images, args.backends, args.weights, args.imgsz, args.repeat)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
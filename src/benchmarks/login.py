@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from src.benchmarks.stats import percentile
+
+
+def _summary(latencies, elapsed):
+    return {
+        "requests": len(latencies),
+        "per_second": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "max_ms": round(max(latencies, default=0.0) * 1000, 1),
+    }
+
+
+async def _login_worker(client, username, password, count, latencies, errors):
+    for _ in range(count):
+        start = time.perf_counter()
+        response = await client.post("/auth/login", json={"username": username, "password": password})
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+
+
+async def _probe(client, stop, latencies):
+    """Peticiones livianas en paralelo: si el login bloquea el event loop, su latencia se dispara"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.05)
+
+
+async def run(url: str, username: str, password: str, concurrency: int, logins: int):
+    """Lanza `concurrency` clientes haciendo `logins` inicios de sesión cada uno contra una API en ejecución"""
+    login_latencies, probe_latencies, errors = [], [], []
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_probe(client, stop, probe_latencies))
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            _login_worker(client, username, password, logins, login_latencies, errors)
+            for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await probe
+
+    return {
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 2),
+        "errors": len(errors),
+        "login": _summary(login_latencies, elapsed),
+        "probe_get_root": _summary(probe_latencies, elapsed),
+        "probe_mean_ms": round(statistics.fmean(probe_latencies) * 1000, 1) if probe_latencies else 0.0,
+    }
+
+
+async def run_hashing(concurrency: int, logins: int):
+    """Solo el pool de bcrypt, sin HTTP ni base de datos (mide el techo de logins/s del proceso)"""
+    from src.core.security import hash_password, verify_and_update_password_async
+
+    hashed = hash_password("benchmark")
+    latencies = []
+
+    async def worker():
+        for _ in range(logins):
+            start = time.perf_counter()
+            await verify_and_update_password_async("benchmark", hashed)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {"concurrency": concurrency, "elapsed_s": round(elapsed, 2), "verify": _summary(latencies, elapsed)}
+
+
+# -------------------------
+# Ejecución como script
+# -------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de throughput de inicio de sesión")
+    parser.add_argument("--url", default="http://localhost:8000", help="URL base de la API en ejecución")
+    parser.add_argument("--username", default="admin@admin.com")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--concurrency", type=int, default=20, help="Clientes simultáneos (ej. cambio de turno)")
+    parser.add_argument("--logins", type=int, default=5, help="Inicios de sesión por cliente")
+    parser.add_argument("--hash-only", action="store_true", help="Medir solo bcrypt en proceso, sin la API")
+    args = parser.parse_args()
+
+    if args.hash_only:
+        result = asyncio.run(run_hashing(args.concurrency, args.logins))
+    else:
+        result = asyncio.run(run(args.url, args.username, args.password, args.concurrency, args.logins))
+    print(result)
@@ -0,0 +1,81 @@
+import argparse
+import glob
+import json
+import os
+import time
+
+import cv2
+
+from src import config
+from src.benchmarks.stats import latency_summary
+from src.plate_detection import ocr
+from src.plate_detection.ANPR import load_models
+
+
+def _load_crops(folder):
+    paths = sorted(p for ext in ("jpg", "jpeg", "png") for p in glob.glob(os.path.join(folder, f"*.{ext}")))
+    crops = [cv2.imread(path) for path in paths]
+    return [crop for crop in crops if crop is not None]
+
+
+def run(crops, per_frame: int, repeat: int, height: int):
+    """Compara `readtext` recorte por recorte (detector + reconocedor) contra un lote de `recognize`"""
+    _, reader = load_models()
+    frames = [crops[i:i + per_frame] for i in range(0, len(crops), per_frame)]
+
+    # Calentamiento: la primera inferencia de torch incluye inicializaciones
+    reader.readtext(crops[0])
+    ocr.recognize_batch(reader, crops[:per_frame], height)
+
+    per_roi, batched = [], []
+    agree = total = 0
+    for _ in range(repeat):
+        for rois in frames:
+            start = time.perf_counter()
+            single = []
+            for roi in rois:
+                result = reader.readtext(roi)
+                single.append(ocr.clean_text(max(result, key=lambda x: x[2])[1]) if result else None)
+            per_roi.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            batch = ocr.recognize_batch(reader, rois, height)
+            batched.append(time.perf_counter() - start)
+
+            for a, b in zip(single, batch):
+                total += 1
+                agree += a == (b[0] if b else None)
+
+    per_roi_summary, batched_summary = latency_summary(per_roi), latency_summary(batched)
+    return {
+        "crops": len(crops),
+        "rois_per_frame": per_frame,
+        "repeat": repeat,
+        "ocr_height": height,
+        "per_roi_readtext": per_roi_summary,
+        "batched_recognize": batched_summary,
+        "speedup_p50": round(per_roi_summary["p50_ms"] / batched_summary["p50_ms"], 2) if batched_summary["p50_ms"] else None,
+        "text_agreement": round(agree / total, 3) if total else None,
+    }
+
+
+# -------------------------
+# Ejecución como script
+# -------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de OCR: lectura por recorte vs. lote")
+    parser.add_argument("crops", help="Carpeta con recortes de placas (jpg/png)")
+    parser.add_argument("--per-frame", type=int, default=2, help="Recortes por cuadro simulado")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--height", type=int, default=config.ANPR_OCR_HEIGHT)
+    parser.add_argument("--output", help="Guardar el resultado en un archivo JSON")
+    args = parser.parse_args()
+
+    crops = _load_crops(args.crops)
+    if not crops:
+        raise SystemExit(f"No hay imágenes en {args.crops}")
+    result = run(crops, args.per_frame, args.repeat, args.height)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
@@ -0,0 +1,72 @@
+import os
+
+# ---------------------------
+# Base de datos (MySQL)
+# ---------------------------
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = int(os.getenv("DB_PORT", "3306"))
+DB_USER = os.getenv("DB_USER", "root")
+DB_PASSWORD = os.getenv("DB_PASSWORD", "")
+DB_NAME = os.getenv("DB_NAME", "PARKING")
+
+# Pool de conexiones
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))  # Conexiones abiertas al iniciar
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))  # Máximo de conexiones simultáneas
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # Segundos de espera por una conexión libre
+DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "1800"))  # Segundos antes de reciclar una conexión
+DB_POOL_PING_INTERVAL = float(os.getenv("DB_POOL_PING_INTERVAL", "30"))  # Ping solo si la conexión estuvo inactiva más de esto
+
+# Capa de acceso a datos asíncrona (aiomysql) en lugar de los routers síncronos
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+
+# Conteo de totales en listados paginados
+COUNT_CACHE_TTL = float(os.getenv("COUNT_CACHE_TTL", "60"))  # Segundos que vive un total cacheado
+
+# Cache de tarifas en memoria (recarga periódica para despliegues con varios workers)
+RATE_CACHE_TTL = float(os.getenv("RATE_CACHE_TTL", "300"))
+
+# Índice de placas para búsqueda aproximada (/vehicles/match)
+PLATE_INDEX_TTL = float(os.getenv("PLATE_INDEX_TTL", "300"))  # Segundos antes de recargar (cambios de otros workers)
+PLATE_INDEX_MAX_DISTANCE = int(os.getenv("PLATE_INDEX_MAX_DISTANCE", "2"))  # Distancia de edición máxima buscable (más = más memoria)
+
+# ---------------------------
+# Autenticación
+# ---------------------------
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))  # Costo de bcrypt; los hashes con otro costo se regeneran al iniciar sesión
+AUTH_HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))  # Hilos dedicados a bcrypt
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "720"))  # Vigencia del JWT (0 = sin expiración)
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "1024"))  # Tokens validados guardados en memoria (LRU)
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", "300"))  # Segundos antes de volver a verificar la firma
+
+# ---------------------------
+# ANPR (detección de placas)
+# ---------------------------
+ANPR_WARMUP = os.getenv("ANPR_WARMUP", "false").lower() in ("1", "true", "yes")  # Cargar modelos en segundo plano al iniciar
+ANPR_WORKER_SOCKET = os.getenv("ANPR_WORKER_SOCKET", "")  # Socket Unix del worker ANPR; vacío = modelos en el proceso de la API
+ANPR_ZONE = os.getenv("ANPR_ZONE", "")  # Zona del carril, puntos normalizados "x,y;x,y;..." (vacío = cuadro completo)
+ANPR_MOTION_GATE = os.getenv("ANPR_MOTION_GATE", "true").lower() in ("1", "true", "yes")  # Detectar solo si hay movimiento en la zona
+ANPR_MOTION_THRESHOLD = float(os.getenv("ANPR_MOTION_THRESHOLD", "0.01"))  # Fracción de píxeles que deben cambiar
+ANPR_MOTION_HOLD = int(os.getenv("ANPR_MOTION_HOLD", "15"))  # Cuadros que se sigue detectando tras el último movimiento
+ANPR_DETECT_WIDTH = int(os.getenv("ANPR_DETECT_WIDTH", "0"))  # Ancho al que se reduce la zona antes de YOLO (0 = original)
+ANPR_DETECTOR_BACKEND = os.getenv("ANPR_DETECTOR_BACKEND", "torch").lower()  # torch | onnx | openvino (modelo exportado)
+ANPR_DETECTOR_INT8 = os.getenv("ANPR_DETECTOR_INT8", "false").lower() in ("1", "true", "yes")  # Usar el modelo exportado cuantizado a int8
+ANPR_DETECTOR_IMGSZ = int(os.getenv("ANPR_DETECTOR_IMGSZ", "640"))  # Tamaño de entrada de YOLO (debe coincidir con el de la exportación)
+ANPR_DETECT_EVERY = os.getenv("ANPR_DETECT_EVERY", "1").lower()  # YOLO cada N cuadros y seguimiento entre medias ("auto" = según latencia)
+ANPR_TARGET_FPS = float(os.getenv("ANPR_TARGET_FPS", "15"))  # Cuadros por segundo a sostener con ANPR_DETECT_EVERY=auto
+ANPR_VOTE_MIN_READS = int(os.getenv("ANPR_VOTE_MIN_READS", "3"))  # Lecturas OCR que deben coincidir antes de confirmar una placa
+ANPR_VOTE_MIN_CONFIDENCE = float(os.getenv("ANPR_VOTE_MIN_CONFIDENCE", "0.5"))  # Confianza mínima de la votación
+ANPR_EVENT_HISTORY = int(os.getenv("ANPR_EVENT_HISTORY", "100"))  # Eventos de placa guardados en memoria
+ANPR_EVENT_DEDUP_SECONDS = float(os.getenv("ANPR_EVENT_DEDUP_SECONDS", "30"))  # No repetir la misma placa por cámara en este lapso
+ANPR_EVENT_POLL_INTERVAL = float(os.getenv("ANPR_EVENT_POLL_INTERVAL", "0.2"))  # Segundos entre revisiones de eventos nuevos en /anpr/events
+ANPR_OCR_HEIGHT = int(os.getenv("ANPR_OCR_HEIGHT", "64"))  # Alto en píxeles al que se normalizan los recortes antes del OCR
+ANPR_OCR_PREPROCESS = os.getenv("ANPR_OCR_PREPROCESS", "true").lower() in ("1", "true", "yes")  # Enderezar y ecualizar contraste de los recortes antes del OCR
+ANPR_PLATE_FORMATS = os.getenv("ANPR_PLATE_FORMATS", "LLLDDD,LLLDDL")  # Formatos válidos (L letra, D dígito); vacío = aceptar cualquier lectura
+ANPR_OCR_BATCH_WAIT_MS = float(os.getenv("ANPR_OCR_BATCH_WAIT_MS", "0"))  # Espera para agrupar recortes de varias cámaras (0 = sin agrupar; solo útil en GPU)
+ANPR_OCR_CACHE_SIZE = int(os.getenv("ANPR_OCR_CACHE_SIZE", "256"))  # Lecturas OCR recordadas por huella del recorte (0 = sin caché)
+ANPR_OCR_CACHE_SIMILARITY = float(os.getenv("ANPR_OCR_CACHE_SIMILARITY", "0.94"))  # Similitud mínima (0-1) para reutilizar la lectura de un recorte
+ANPR_CAMERAS = os.getenv("ANPR_CAMERAS", "0=0")  # Cámaras por carril "id=fuente;id=fuente" (índice local, URL RTSP o archivo)
+ANPR_CAMERA_PROCESSES = os.getenv("ANPR_CAMERA_PROCESSES", "false").lower() in ("1", "true", "yes")  # Un proceso por cámara con detección continua
+ANPR_STREAM_QUALITY = int(os.getenv("ANPR_STREAM_QUALITY", "80"))  # Calidad JPEG del video (nivel más alto)
+ANPR_STREAM_ADAPTIVE = os.getenv("ANPR_STREAM_ADAPTIVE", "true").lower() in ("1", "true", "yes")  # Bajar calidad/resolución a clientes lentos
+ANPR_BATCH_WORKERS = int(os.getenv("ANPR_BATCH_WORKERS", "2"))  # Hilos del reconocimiento sobre archivos grabados
+ANPR_BATCH_SAMPLE_EVERY = int(os.getenv("ANPR_BATCH_SAMPLE_EVERY", "5"))  # En videos grabados, procesar uno de cada N cuadros
@@ -0,0 +1,88 @@
+import threading
+import time
+from src import config
+from src.db.async_database import fetch_one
+from src.models.paginate import EstrategiaConteo
+
+# Cache de totales: (tabla, búsqueda) -> (total, expira_en)
+_count_cache = {}
+_count_lock = threading.Lock()
+
+_TABLE_STATS_QUERY = """SELECT TABLE_ROWS AS total FROM information_schema.TABLES
+                        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s"""
+
+
+def get_cached_count(table: str, search: str | None):
+    """Devuelve el total cacheado si sigue vigente"""
+    with _count_lock:
+        hit = _count_cache.get((table, search or ""))
+        if hit and hit[1] > time.monotonic():
+            return hit[0]
+    return None
+
+
+def store_count(table: str, search: str | None, total: int):
+    """Guarda un total en la cache con el TTL configurado"""
+    with _count_lock:
+        _count_cache[(table, search or "")] = (total, time.monotonic() + config.COUNT_CACHE_TTL)
+
+
+def invalidate_counts(table: str):
+    """Descarta los totales cacheados de una tabla (llamar tras escribir en ella)"""
+    with _count_lock:
+        for key in [key for key in _count_cache if key[0] == table]:
+            del _count_cache[key]
+
+
+def _estimate_from_explain(row) -> int:
+    """Filas estimadas por el optimizador según EXPLAIN (rows * filtered%)"""
+    rows = row.get("rows") or 0
+    filtered = row.get("filtered")
+    return int(rows * float(filtered) / 100) if filtered is not None else int(rows)
+
+
+def count_rows(cursor, table: str, count_query: str, params: list, search: str | None, strategy: EstrategiaConteo):
+    """Calcula el total según la estrategia; devuelve (total, es_estimado)"""
+    if strategy == EstrategiaConteo.none:
+        return None, False
+
+    if strategy == EstrategiaConteo.approximate:
+        if search:
+            cursor.execute("EXPLAIN " + count_query, tuple(params))
+            return _estimate_from_explain(cursor.fetchone()), True
+        cursor.execute(_TABLE_STATS_QUERY, (table,))
+        row = cursor.fetchone()
+        return int(row["total"] or 0) if row else 0, True
+
+    if strategy == EstrategiaConteo.cached:
+        total = get_cached_count(table, search)
+        if total is not None:
+            return total, False
+
+    cursor.execute(count_query, tuple(params))
+    total = cursor.fetchone()["total"]
+    if strategy == EstrategiaConteo.cached:
+        store_count(table, search, total)
+    return total, False
+
+
+async def count_rows_async(conn, table: str, count_query: str, params: list, search: str | None, strategy: EstrategiaConteo):
+    """Versión asíncrona de `count_rows` para los routers con aiomysql"""
+    if strategy == EstrategiaConteo.none:
+        return None, False
+
+    if strategy == EstrategiaConteo.approximate:
+        if search:
+            return _estimate_from_explain(await fetch_one(conn, "EXPLAIN " + count_query, tuple(params))), True
+        row = await fetch_one(conn, _TABLE_STATS_QUERY, (table,))
+        return int(row["total"] or 0) if row else 0, True
+
+    if strategy == EstrategiaConteo.cached:
+        total = get_cached_count(table, search)
+        if total is not None:
+            return total, False
+
+    total = (await fetch_one(conn, count_query, tuple(params)))["total"]
+    if strategy == EstrategiaConteo.cached:
+        store_count(table, search, total)
+    return total, False
@@ -0,0 +1,116 @@
+import csv
+import io
+import json
+
+import aiomysql
+import pymysql.cursors
+from fastapi.responses import StreamingResponse
+
+from src.db.database import get_db_connection
+from src.db.async_database import init_async_pool
+from src.models.export import FormatoExportacion
+
+EXPORT_BATCH_SIZE = 500  # Filas leídas del cursor por iteración
+
+_MEDIA_TYPES = {
+    FormatoExportacion.ndjson: "application/x-ndjson",
+    FormatoExportacion.csv: "text/csv; charset=utf-8",
+}
+
+
+def _value(value):
+    """Convierte fechas y decimales a texto"""
+    return value if value is None or isinstance(value, (str, int, float)) else str(value)
+
+
+class _Encoder:
+    """Serializa lotes de filas a NDJSON o CSV (con encabezado tomado de las columnas del cursor)"""
+
+    def __init__(self, fmt: FormatoExportacion):
+        self.fmt = fmt
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def _flush(self) -> bytes:
+        chunk = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return chunk.encode()
+
+    def header(self, description) -> bytes:
+        """Encabezado CSV desde `cursor.description`: un export sin filas sigue siendo un CSV válido"""
+        if self.fmt != FormatoExportacion.csv:
+            return b""
+        self._writer.writerow(column[0] for column in description)
+        return self._flush()
+
+    def encode(self, rows) -> bytes:
+        if self.fmt == FormatoExportacion.ndjson:
+            return "".join(json.dumps(row, default=str, ensure_ascii=False) + "\n" for row in rows).encode()
+
+        self._writer.writerows([_value(value) for value in row.values()] for row in rows)
+        return self._flush()
+
+
+def stream_rows(sql: str, params: list, fmt: FormatoExportacion):
+    """Generador que lee con un cursor de servidor (sin buffer) y emite bytes por lotes"""
+    encoder = _Encoder(fmt)
+    # La conexión se toma dentro del generador: vive mientras dure el streaming
+    conn = get_db_connection()
+    cursor = conn.cursor(pymysql.cursors.SSDictCursor)
+    try:
+        cursor.execute(sql, tuple(params))
+        header = encoder.header(cursor.description)
+        if header:
+            yield header
+        while True:
+            rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+            if not rows:
+                break
+            yield encoder.encode(rows)
+        cursor.close()
+    except BaseException:
+        # Cliente desconectado (GeneratorExit) o error a mitad: cerrar el cursor leería y
+        # descartaría todas las filas pendientes, así que se cierra la conexión física
+        cursor.connection = None  # Tampoco al recolectarlo (`SSCursor.__del__` es `close`)
+        conn.discard()
+        raise
+    finally:
+        conn.close()
+
+
+async def stream_rows_async(sql: str, params: list, fmt: FormatoExportacion):
+    """Versión asíncrona de `stream_rows` sobre el pool de aiomysql"""
+    encoder = _Encoder(fmt)
+    pool = await init_async_pool()
+    conn = await pool.acquire()
+    try:
+        # Sin `async with`: su salida drenaría las filas sin leer antes de poder descartar la conexión
+        cursor = await conn.cursor(aiomysql.SSDictCursor)
+        await cursor.execute(sql, tuple(params))
+        header = encoder.header(cursor.description)
+        if header:
+            yield header
+        while True:
+            rows = await cursor.fetchmany(EXPORT_BATCH_SIZE)
+            if not rows:
+                break
+            yield encoder.encode(rows)
+        await cursor.close()
+        await conn.rollback()
+    except BaseException:
+        # Cliente desconectado o error a mitad: se cierra la conexión antes que el cursor,
+        # sin leer las filas pendientes (el pool la descarta al devolverla)
+        conn.close()
+        raise
+    finally:
+        pool.release(conn)
+
+
+def export_response(rows, fmt: FormatoExportacion, name: str) -> StreamingResponse:
+    """Respuesta de descarga para un generador de `stream_rows`/`stream_rows_async`"""
+    return StreamingResponse(
+        rows,
+        media_type=_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt.value}"'}
+    )
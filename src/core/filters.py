@@ -0,0 +1,57 @@
+from datetime import datetime
+
+
+def entry_filters(
+    status: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    vehicle_id: int | None = None,
+    parking_id: int | None = None,
+    user_id: int | None = None
+):
+    """Arma el WHERE de ENTRIES; el orden de las condiciones sigue los índices (status, entry_date)"""
+    conditions = []
+    params = []
+    if status:
+        conditions.append("status = %s")
+        params.append(status)
+    if date_from:
+        conditions.append("entry_date >= %s")
+        params.append(date_from)
+    if date_to:
+        conditions.append("entry_date < %s")
+        params.append(date_to)
+    if vehicle_id is not None:
+        conditions.append("vehicle_id = %s")
+        params.append(vehicle_id)
+    if parking_id is not None:
+        conditions.append("parking_id = %s")
+        params.append(parking_id)
+    if user_id is not None:
+        conditions.append("user_id = %s")
+        params.append(user_id)
+
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    return where, params
+
+
+def filters_key(where: str, params: list) -> str | None:
+    """Clave de cache para un conjunto de filtros (None si no hay filtros)"""
+    if not where:
+        return None
+    return where + "|" + "|".join(str(param) for param in params)
+
+
+def date_range(column: str, date_from: datetime | None = None, date_to: datetime | None = None):
+    """WHERE por rango de fechas sobre una columna: [date_from, date_to)"""
+    conditions = []
+    params = []
+    if date_from:
+        conditions.append(f"{column} >= %s")
+        params.append(date_from)
+    if date_to:
+        conditions.append(f"{column} < %s")
+        params.append(date_to)
+
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    return where, params
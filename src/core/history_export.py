@@ -0,0 +1,147 @@
+import argparse
+import io
+import os
+from datetime import datetime
+
+import polars as pl
+import pymysql.cursors
+
+from src.db.database import db_connection
+
+HISTORY_CHUNK_SIZE = 50_000  # Filas leídas de MySQL por lote
+
+# Historial de parqueo: ingreso + vehículo + tarifa + pago (si existe)
+HISTORY_QUERY = """
+    SELECT e.entry_id, e.entry_date, e.exit_date, e.total_time, e.total_amount, e.status,
+           e.parking_id, e.user_id,
+           e.vehicle_id, v.plate, v.brand, v.model, v.client_id,
+           e.rate_id, r.type AS rate_type, r.hourly_rate,
+           p.payment_id, p.payment_method, p.payment_status, p.payment_date
+    FROM ENTRIES e
+    JOIN VEHICLES v ON v.vehicle_id = e.vehicle_id
+    JOIN RATES r ON r.rate_id = e.rate_id
+    LEFT JOIN PAYMENTS p ON p.entry_id = e.entry_id
+"""
+
+HISTORY_SCHEMA = {
+    "entry_id": pl.Int64,
+    "entry_date": pl.Datetime("us"),
+    "exit_date": pl.Datetime("us"),
+    "total_time": pl.Int64,
+    "total_amount": pl.Float64,
+    "status": pl.Enum(["in_progress", "finished"]),
+    "parking_id": pl.Int64,
+    "user_id": pl.Int64,
+    "vehicle_id": pl.Int64,
+    "plate": pl.Utf8,
+    "brand": pl.Utf8,
+    "model": pl.Utf8,
+    "client_id": pl.Int64,
+    "rate_id": pl.Int64,
+    "rate_type": pl.Enum(["regular", "special"]),
+    "hourly_rate": pl.Float64,
+    "payment_id": pl.Int64,
+    "payment_method": pl.Enum(["cash", "transfer"]),
+    "payment_status": pl.Enum(["pending", "completed"]),
+    "payment_date": pl.Datetime("us"),
+}
+
+FORMATS = ("parquet", "ipc")
+MEDIA_TYPES = {"parquet": "application/vnd.apache.parquet", "ipc": "application/vnd.apache.arrow.file"}
+
+
+def _history_sql(date_from: datetime | None, date_to: datetime | None):
+    """Consulta del historial filtrada por fecha de ingreso y ordenada para particionar por mes"""
+    conditions = []
+    params = []
+    if date_from:
+        conditions.append("e.entry_date >= %s")
+        params.append(date_from)
+    if date_to:
+        conditions.append("e.entry_date < %s")
+        params.append(date_to)
+    sql = HISTORY_QUERY
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    return sql + " ORDER BY e.entry_date, e.entry_id", params
+
+
+def _month_bounds(month: str):
+    """'2026-01' -> (2026-01-01, 2026-02-01)"""
+    start = datetime.strptime(month, "%Y-%m")
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
+def iter_history_chunks(date_from: datetime | None = None, date_to: datetime | None = None, chunk_size: int = HISTORY_CHUNK_SIZE):
+    """Genera DataFrames de un solo mes, leídos por lotes con un cursor de servidor"""
+    sql, params = _history_sql(date_from, date_to)
+    with db_connection() as conn:
+        cursor = conn.cursor(pymysql.cursors.SSDictCursor)
+        try:
+            cursor.execute(sql, tuple(params))
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                frame = pl.from_dicts(rows, schema=HISTORY_SCHEMA, strict=False)
+                # Las filas vienen ordenadas por fecha: un lote abarca a lo sumo unos pocos meses
+                frame = frame.with_columns(pl.col("entry_date").dt.strftime("%Y-%m").alias("month"))
+                for (month,), part in frame.partition_by("month", as_dict=True, maintain_order=True).items():
+                    yield month, part.drop("month")
+        finally:
+            cursor.close()
+
+
+def _write(frame: pl.DataFrame, target, fmt: str):
+    if fmt == "parquet":
+        frame.write_parquet(target, compression="zstd", statistics=True)
+    else:
+        frame.write_ipc(target, compression="zstd")
+
+
+def write_history(out_dir: str, date_from: datetime | None = None, date_to: datetime | None = None,
+                  fmt: str = "parquet", chunk_size: int = HISTORY_CHUNK_SIZE) -> list[str]:
+    """Escribe el historial como dataset particionado por mes: out_dir/month=YYYY-MM/part-NNNNN.<fmt>"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato no soportado: {fmt}")
+
+    written = []
+    parts = {}  # mes -> número de archivos escritos
+    for month, frame in iter_history_chunks(date_from, date_to, chunk_size):
+        month_dir = os.path.join(out_dir, f"month={month}")
+        os.makedirs(month_dir, exist_ok=True)
+        index = parts.get(month, 0)
+        path = os.path.join(month_dir, f"part-{index:05d}.{fmt}")
+        _write(frame, path, fmt)
+        parts[month] = index + 1
+        written.append(path)
+    return written
+
+
+def history_month_bytes(month: str, fmt: str = "parquet") -> bytes:
+    """Historial de un mes ('YYYY-MM') serializado en un único archivo Parquet/IPC"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato no soportado: {fmt}")
+    start, end = _month_bounds(month)
+    frames = [frame for _, frame in iter_history_chunks(start, end)]
+    frame = pl.concat(frames) if frames else pl.DataFrame(schema=HISTORY_SCHEMA)
+    buffer = io.BytesIO()
+    _write(frame, buffer, fmt)
+    return buffer.getvalue()
+
+
+# -------------------------
+# Ejecución como script
+# -------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta el historial de parqueo a Parquet/Arrow IPC particionado por mes")
+    parser.add_argument("out_dir", help="Carpeta de salida del dataset")
+    parser.add_argument("--from", dest="date_from", type=datetime.fromisoformat, help="Fecha de ingreso desde (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", type=datetime.fromisoformat, help="Fecha de ingreso hasta, exclusiva (YYYY-MM-DD)")
+    parser.add_argument("--format", dest="fmt", choices=FORMATS, default="parquet")
+    parser.add_argument("--chunk-size", type=int, default=HISTORY_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    files = write_history(args.out_dir, args.date_from, args.date_to, args.fmt, args.chunk_size)
+    print(f"{len(files)} archivos escritos en {args.out_dir}")
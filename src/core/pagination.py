@@ -0,0 +1,36 @@
+import base64
+import json
+from fastapi import HTTPException
+
+
+def encode_cursor(last_id: int) -> str:
+    """Codifica el último id de la página en un cursor opaco"""
+    raw = json.dumps({"after": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decodifica un cursor opaco; lanza 400 si es inválido"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        after = json.loads(base64.urlsafe_b64decode(padded))["after"]
+        if not isinstance(after, int) or after < 0:
+            raise ValueError
+        return after
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def resolve_after(after: int | None, cursor: str | None) -> int | None:
+    """Devuelve el id desde el cual paginar por keyset, o None si se usa paginación por página"""
+    if cursor:
+        return decode_cursor(cursor)
+    return after
+
+
+def keyset_page(rows: list, limit: int, key: str):
+    """Recorta las `limit + 1` filas consultadas y calcula el cursor de la siguiente página"""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1][key])
+    return rows, None
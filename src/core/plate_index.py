@@ -0,0 +1,272 @@
+import asyncio
+import re
+import threading
+import time
+from collections import defaultdict
+from src import config
+from src.db.database import db_connection
+from src.db.async_database import async_db_connection, fetch_all
+
+_NON_ALNUM = re.compile(r'[^A-Z0-9]')
+
+_PLATES_QUERY = "SELECT vehicle_id, plate FROM VEHICLES"
+
+
+def normalize_plate(plate: str) -> str:
+    """Placa en mayúsculas sin espacios ni guiones (ABC-123 -> ABC123)"""
+    return _NON_ALNUM.sub('', (plate or '').upper())
+
+
+def edit_distance(a: str, b: str, bound: int | None = None) -> int:
+    """Distancia de Levenshtein (inserciones, borrados y sustituciones).
+
+    Con `bound` se corta en cuanto la distancia supera ese valor y devuelve `bound + 1`.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if bound is not None and len(a) - len(b) > bound:
+        return bound + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if bound is not None and min(current) > bound:
+            return bound + 1
+        previous = current
+    return previous[-1]
+
+
+def deletions(plate: str, depth: int) -> set:
+    """La placa y todas sus variantes con hasta `depth` caracteres borrados"""
+    variants, frontier = {plate}, {plate}
+    for _ in range(depth):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        variants |= frontier
+    return variants
+
+
+class PlateIndex:
+    """Índice de vecindad por borrados: placas a distancia de edición <= k sin recorrerlas todas.
+
+    Dos placas a distancia <= k comparten alguna variante con hasta k borrados en cada una, así
+    que se indexan las variantes de cada placa y una búsqueda solo calcula la distancia exacta
+    contra las placas que comparten variante con la consulta (unas pocas, no todo VEHICLES).
+    """
+
+    def __init__(self, max_distance: int = 2):
+        self.max_distance = max_distance
+        self.vehicles = {}  # placa -> ids de vehículos
+        self._variants = defaultdict(set)  # variante -> placas
+
+    def add(self, plate: str, vehicle_id: int):
+        if plate not in self.vehicles:
+            self.vehicles[plate] = set()
+            for variant in deletions(plate, self.max_distance):
+                self._variants[variant].add(plate)
+        self.vehicles[plate].add(vehicle_id)
+
+    def remove(self, plate: str, vehicle_id: int):
+        ids = self.vehicles.get(plate)
+        if ids is None:
+            return
+        ids.discard(vehicle_id)
+        if ids:
+            return
+        del self.vehicles[plate]
+        for variant in deletions(plate, self.max_distance):
+            plates = self._variants.get(variant)
+            if plates is not None:
+                plates.discard(plate)
+                if not plates:
+                    del self._variants[variant]
+
+    def search(self, query: str, max_distance: int):
+        """[(distancia, placa)] de las placas a distancia <= max_distance (acotada al máximo indexado)"""
+        max_distance = min(max_distance, self.max_distance)
+        candidates = set()
+        for variant in deletions(query, max_distance):
+            candidates |= self._variants.get(variant, set())
+        found = []
+        for plate in candidates:
+            distance = edit_distance(query, plate, max_distance)
+            if distance <= max_distance:
+                found.append((distance, plate))
+        return found
+
+
+# Índice de placas de VEHICLES en memoria: vehicle_id -> placa e índice de placas
+_index = PlateIndex(config.PLATE_INDEX_MAX_DISTANCE)
+_plate_by_vehicle = {}
+_expires_at = 0.0
+_loaded = False
+_refreshing = False
+_refresh_task = None  # Recarga en curso en modo asíncrono (referencia para que no se recolecte)
+_journal = []  # Cambios locales durante una recarga: se reaplican sobre el índice nuevo
+_lock = threading.Lock()
+
+# Si la recarga falla (BD caída) se reintenta tras este tiempo, no en cada búsqueda
+_RETRY_SECONDS = 30
+
+
+def _apply(index, plates, vehicle_id: int, plate: str | None, only_known: bool):
+    """Asigna la placa de un vehículo (None la quita) en un índice"""
+    if only_known and vehicle_id not in plates:
+        return
+    old = plates.pop(vehicle_id, None)
+    if old is not None:
+        index.remove(old, vehicle_id)
+    plate = normalize_plate(plate)
+    if plate:
+        plates[vehicle_id] = plate
+        index.add(plate, vehicle_id)
+
+
+def _build(rows):
+    """Índice nuevo con todas las placas (fuera del lock: puede tardar segundos)"""
+    index, plates = PlateIndex(config.PLATE_INDEX_MAX_DISTANCE), {}
+    for row in rows:
+        _apply(index, plates, row["vehicle_id"], row["plate"], False)
+    return index, plates
+
+
+def _swap(index, plates):
+    """Reemplaza el índice de una vez, con los cambios locales hechos mientras se construía"""
+    global _index, _plate_by_vehicle, _expires_at, _loaded
+    with _lock:
+        for change in _journal:
+            _apply(index, plates, *change)
+        _journal.clear()
+        _index, _plate_by_vehicle = index, plates
+        _expires_at = time.monotonic() + config.PLATE_INDEX_TTL
+        _loaded = True
+
+
+def _fresh():
+    return _loaded and time.monotonic() < _expires_at
+
+
+def _begin_refresh() -> bool:
+    """Marca una recarga en segundo plano; False si ya hay una en curso"""
+    global _refreshing
+    with _lock:
+        if _refreshing:
+            return False
+        _refreshing = True
+        _journal.clear()
+        return True
+
+
+def _end_refresh(ok: bool):
+    global _refreshing, _expires_at
+    with _lock:
+        _refreshing = False
+        _journal.clear()
+        if not ok:
+            _expires_at = time.monotonic() + min(config.PLATE_INDEX_TTL, _RETRY_SECONDS)
+
+
+def load_plates(cursor):
+    """Construye el índice con todas las placas (al iniciar la app)"""
+    cursor.execute(_PLATES_QUERY)
+    _swap(*_build(cursor.fetchall()))
+
+
+async def load_plates_async(conn):
+    """Versión asíncrona de `load_plates`"""
+    _swap(*_build(await fetch_all(conn, _PLATES_QUERY)))
+
+
+def _refresh():
+    ok = False
+    try:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_PLATES_QUERY)
+            rows = cursor.fetchall()
+            cursor.close()
+        _swap(*_build(rows))
+        ok = True
+    except Exception as e:
+        print(f"No se pudo recargar el índice de placas: {e}")
+    finally:
+        _end_refresh(ok)
+
+
+async def _refresh_async():
+    ok = False
+    try:
+        async with async_db_connection() as conn:
+            rows = await fetch_all(conn, _PLATES_QUERY)
+        # Construir el índice es CPU: en un hilo, para no detener el event loop
+        _swap(*await asyncio.to_thread(_build, rows))
+        ok = True
+    except Exception as e:
+        print(f"No se pudo recargar el índice de placas: {e}")
+    finally:
+        _end_refresh(ok)
+
+
+def _change(vehicle_id: int, plate: str | None, only_known: bool = False):
+    with _lock:
+        if not _loaded:
+            return  # Se cargará completo en la primera búsqueda
+        _apply(_index, _plate_by_vehicle, vehicle_id, plate, only_known)
+        if _refreshing:
+            _journal.append((vehicle_id, plate, only_known))
+
+
+def add_vehicle(vehicle_id: int, plate: str):
+    """Agrega la placa de un vehículo recién creado"""
+    _change(vehicle_id, plate)
+
+
+def update_vehicle(vehicle_id: int, plate: str):
+    """Cambia la placa de un vehículo ya indexado (los de otros workers llegan al recargar)"""
+    _change(vehicle_id, plate, only_known=True)
+
+
+def remove_vehicle(vehicle_id: int):
+    """Quita la placa de un vehículo eliminado"""
+    _change(vehicle_id, None)
+
+
+def _search(plate: str, max_distance: int, limit: int):
+    query = normalize_plate(plate)
+    start = time.perf_counter()
+    with _lock:
+        found = _index.search(query, max_distance)
+        matches = sorted(
+            ({"plate": plate, "distance": distance, "vehicle_ids": sorted(_index.vehicles[plate])} for distance, plate in found),
+            key=lambda match: (match["distance"], match["plate"])
+        )[:limit]
+    took_us = round((time.perf_counter() - start) * 1_000_000, 1)
+    return {"query": query, "matches": matches, "took_us": took_us}
+
+
+def search_plates(plate: str, max_distance: int = 2, limit: int = 5):
+    """Placas registradas más cercanas a una lectura.
+
+    No toma conexión de la BD: el índice ya está en memoria (precargado en el lifespan). Solo si
+    no se precargó, la primera búsqueda lo carga antes de responder; al expirar se recarga en
+    un hilo y mientras tanto se responde con el índice actual.
+    """
+    if not _loaded:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            load_plates(cursor)
+            cursor.close()
+    elif not _fresh() and _begin_refresh():
+        threading.Thread(target=_refresh, name="plate-index-refresh", daemon=True).start()
+    return _search(plate, max_distance, limit)
+
+
+async def search_plates_async(plate: str, max_distance: int = 2, limit: int = 5):
+    """Versión asíncrona de `search_plates` (la recarga corre como tarea en segundo plano)"""
+    global _refresh_task
+    if not _loaded:
+        async with async_db_connection() as conn:
+            await load_plates_async(conn)
+    elif not _fresh() and _begin_refresh():
+        _refresh_task = asyncio.get_running_loop().create_task(_refresh_async())
+    return _search(plate, max_distance, limit)
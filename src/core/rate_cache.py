@@ -0,0 +1,65 @@
+import threading
+import time
+from src import config
+from src.db.async_database import fetch_all
+
+# rate_id -> tarifa por hora; la tabla RATES tiene pocas filas y casi no cambia
+_rates = {}
+_expires_at = 0.0
+_lock = threading.Lock()
+
+_RATES_QUERY = "SELECT rate_id, hourly_rate FROM RATES"
+
+
+def _store(rows):
+    global _rates, _expires_at
+    with _lock:
+        _rates = {row["rate_id"]: float(row["hourly_rate"]) for row in rows}
+        _expires_at = time.monotonic() + config.RATE_CACHE_TTL
+
+
+def _lookup(rate_id: int):
+    """Devuelve (vigente, tarifa) sin tocar la base de datos"""
+    with _lock:
+        return time.monotonic() < _expires_at, _rates.get(rate_id)
+
+
+def load_rates(cursor):
+    """Carga todas las tarifas en memoria (al iniciar la app o al expirar)"""
+    cursor.execute(_RATES_QUERY)
+    _store(cursor.fetchall())
+
+
+async def load_rates_async(conn):
+    """Versión asíncrona de `load_rates`"""
+    _store(await fetch_all(conn, _RATES_QUERY))
+
+
+def invalidate_rates():
+    """Fuerza la recarga en la próxima consulta (llamar tras crear, editar o eliminar tarifas)"""
+    global _expires_at
+    with _lock:
+        _expires_at = 0.0
+
+
+def get_hourly_rate(cursor, rate_id: int) -> float | None:
+    """Tarifa por hora desde la cache; recarga si expiró o si el id no está (creado por otro worker)"""
+    fresh, rate = _lookup(rate_id)
+    if fresh and rate is not None:
+        return rate
+    load_rates(cursor)
+    return _lookup(rate_id)[1]
+
+
+async def get_hourly_rate_async(conn, rate_id: int) -> float | None:
+    """Versión asíncrona de `get_hourly_rate`"""
+    fresh, rate = _lookup(rate_id)
+    if fresh and rate is not None:
+        return rate
+    await load_rates_async(conn)
+    return _lookup(rate_id)[1]
+
+
+def calculate_fee(total_time: int, hourly_rate: float) -> float:
+    """Monto a pagar por `total_time` minutos"""
+    return (total_time / 60) * hourly_rate
@@ -1,11 +1,21 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 from jose import jwt, JWTError
 from fastapi import HTTPException, Depends
 from fastapi.security import OAuth2PasswordBearer
-from src.db.database import get_db_connection
+from src import config
+from src.db.database import db_connection
 
 # Configuración para encriptar contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=config.BCRYPT_ROUNDS)
+
+# bcrypt consume CPU (decenas de ms por hash): se ejecuta en un pool acotado, fuera del event loop,
+# para que un pico de inicios de sesión no bloquee el resto de peticiones ni el threadpool de FastAPI
+_hash_executor = ThreadPoolExecutor(max_workers=config.AUTH_HASH_WORKERS, thread_name_prefix="bcrypt")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
@@ -21,45 +31,133 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica si la contraseña coincide con la almacenada."""
     return pwd_context.verify(plain_password, hashed_password)
 
-def create_access_token(data: dict) -> str:
-    """Crea un token JWT sin expiración."""
-    return jwt.encode(data, SECRET_KEY, algorithm=ALGORITHM)
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verifica la contraseña y, si el hash usa un costo distinto al configurado, devuelve uno nuevo"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    """Valida el JWT y extrae el usuario"""
+async def hash_password_async(password: str) -> str:
+    """`hash_password` en el pool de bcrypt"""
+    return await asyncio.get_running_loop().run_in_executor(_hash_executor, hash_password, password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """`verify_and_update_password` en el pool de bcrypt"""
+    return await asyncio.get_running_loop().run_in_executor(
+        _hash_executor, verify_and_update_password, plain_password, hashed_password
+    )
+
+def create_access_token(data: dict, expires_minutes: int | None = None) -> str:
+    """Crea un token JWT; expira a los ACCESS_TOKEN_EXPIRE_MINUTES (0 = sin expiración)"""
+    claims = dict(data)
+    minutes = config.ACCESS_TOKEN_EXPIRE_MINUTES if expires_minutes is None else expires_minutes
+    if minutes > 0:
+        claims["exp"] = int(time.time()) + minutes * 60
+    return jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+
+# -------------------------
+# Cache de tokens validados
+# -------------------------
+# token -> (claims, válido_hasta); evita verificar la firma del JWT en cada petición
+_token_cache = OrderedDict()
+# token revocado -> exp (se descarta cuando el token ya habría expirado)
+_revoked = {}
+_token_lock = threading.Lock()
+
+def _cached_claims(token: str):
+    now = time.time()
+    with _token_lock:
+        if token in _revoked:
+            raise HTTPException(status_code=401, detail="Token revocado")
+        entry = _token_cache.get(token)
+        if entry is None:
+            return None
+        claims, valid_until = entry
+        if now >= valid_until:
+            del _token_cache[token]
+            return None
+        _token_cache.move_to_end(token)
+        return claims
+
+def _cache_claims(token: str, claims: dict):
+    valid_until = time.time() + config.TOKEN_CACHE_TTL
+    if "exp" in claims:
+        valid_until = min(valid_until, claims["exp"])
+    with _token_lock:
+        if token in _revoked:
+            return
+        _token_cache[token] = (claims, valid_until)
+        _token_cache.move_to_end(token)
+        while len(_token_cache) > config.TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+
+def decode_token(token: str) -> dict:
+    """Valida el JWT (firma y expiración) y devuelve sus claims: sub, user_id, is_superuser"""
+    claims = _cached_claims(token)
+    if claims is not None:
+        return claims
+    # Con expiración activa se rechazan los tokens sin `exp` (emitidos antes o fuera de esta API)
+    options = {"require_exp": config.ACCESS_TOKEN_EXPIRE_MINUTES > 0}
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise HTTPException(status_code=401, detail="Token inválido")
-        return email
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options=options)
     except JWTError:
         raise HTTPException(status_code=401, detail="Token inválido")
-    
+    if claims.get("sub") is None:
+        raise HTTPException(status_code=401, detail="Token inválido")
+    _cache_claims(token, claims)
+    return claims
+
+def revoke_token(token: str):
+    """Invalida un token antes de su expiración (cierre de sesión)"""
+    claims = decode_token(token)
+    now = time.time()
+    with _token_lock:
+        # Los revocados sin exp se conservan hasta reiniciar el proceso
+        for revoked, exp in list(_revoked.items()):
+            if exp is not None and exp <= now:
+                del _revoked[revoked]
+        _revoked[token] = claims.get("exp")
+        _token_cache.pop(token, None)
+
+def get_current_claims(token: str = Depends(oauth2_scheme)) -> dict:
+    """Dependencia: claims del usuario autenticado"""
+    return decode_token(token)
+
+def get_current_user(token: str = Depends(oauth2_scheme)):
+    """Valida el JWT y extrae el usuario"""
+    return decode_token(token)["sub"]
+
+# Validar un token no bloquea (caché en memoria o verificación HMAC de microsegundos): en los
+# routers asíncronos las dependencias son `async def` para no ocupar un hilo del threadpool
+async def get_current_claims_async(token: str = Depends(oauth2_scheme)) -> dict:
+    """Dependencia: claims del usuario autenticado (routers asíncronos)"""
+    return decode_token(token)
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme)):
+    """Valida el JWT y extrae el usuario (routers asíncronos)"""
+    return decode_token(token)["sub"]
+
 def create_super_user():
     """Crea un superusuario si no existe uno en la base de datos"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # Verificar si ya existe un superusuario
-    cursor.execute("SELECT COUNT(*) as count FROM USERS WHERE is_superuser = TRUE")
-    result = cursor.fetchone()
-
-    if result is None:
-        print("Error: No se pudo obtener el resultado de la consulta.")
-        return
-    
-    print(result)
-    # Si no se encuentra ningún superusuario, result será {'count': 0}
-    if result['count'] == 0:
-        # Crear un superusuario
-        hashed_password = hash_password("admin123")  # Cambiar esta contraseña por una segura en producción
-        cursor.execute("INSERT INTO USERS (name, email, phone, password, is_superuser) VALUES (%s, %s, %s, %s, %s)",
-                       ("admin", "admin@admin.com", "1234567890", hashed_password, True))  # Se crea el superusuario
-        conn.commit()
-        print("Superusuario creado exitosamente.")
-    else:
-        print("Ya existe un superusuario.")
-
-    cursor.close()
-    conn.close()
\ No newline at end of file
+    with db_connection() as conn:
+        cursor = conn.cursor()
+
+        # Verificar si ya existe un superusuario
+        cursor.execute("SELECT COUNT(*) as count FROM USERS WHERE is_superuser = TRUE")
+        result = cursor.fetchone()
+
+        if result is None:
+            print("Error: No se pudo obtener el resultado de la consulta.")
+            return
+
+        print(result)
+        # Si no se encuentra ningún superusuario, result será {'count': 0}
+        if result['count'] == 0:
+            # Crear un superusuario
+            hashed_password = hash_password("admin123")  # Cambiar esta contraseña por una segura en producción
+            cursor.execute("INSERT INTO USERS (name, email, phone, password, is_superuser) VALUES (%s, %s, %s, %s, %s)",
+                           ("admin", "admin@admin.com", "1234567890", hashed_password, True))  # Se crea el superusuario
+            conn.commit()
+            print("Superusuario creado exitosamente.")
+        else:
+            print("Ya existe un superusuario.")
+
+        cursor.close()
\ No newline at end of file
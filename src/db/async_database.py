@@ -0,0 +1,102 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import aiomysql
+from fastapi import HTTPException
+
+from src import config
+
+_pool = None
+
+
+async def init_async_pool():
+    """Crea el pool asíncrono (se llama desde el lifespan de la app)"""
+    global _pool
+    if _pool is None:
+        _pool = await aiomysql.create_pool(
+            host=config.DB_HOST,
+            port=config.DB_PORT,
+            user=config.DB_USER,
+            password=config.DB_PASSWORD,
+            db=config.DB_NAME,
+            minsize=config.DB_POOL_MIN_SIZE,
+            maxsize=config.DB_POOL_MAX_SIZE,
+            pool_recycle=int(config.DB_POOL_MAX_LIFETIME) or -1,
+            cursorclass=aiomysql.DictCursor,
+            autocommit=False
+        )
+    return _pool
+
+
+async def close_async_pool():
+    """Cierra el pool asíncrono al apagar la aplicación"""
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+        _pool = None
+
+
+def async_pool_stats():
+    """Métricas del pool asíncrono para monitoreo"""
+    if _pool is None:
+        return None
+    return {
+        "size": _pool.size,
+        "min_size": _pool.minsize,
+        "max_size": _pool.maxsize,
+        "in_use": _pool.size - _pool.freesize,
+        "idle": _pool.freesize,
+    }
+
+
+@asynccontextmanager
+async def async_db_connection():
+    """Context manager que entrega una conexión asíncrona y la devuelve al pool (503 si está agotado)"""
+    pool = await init_async_pool()
+    try:
+        conn = await asyncio.wait_for(pool.acquire(), timeout=config.DB_POOL_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="Base de datos ocupada, intente de nuevo")
+    try:
+        yield conn
+    finally:
+        # Descartar la transacción pendiente antes de reutilizar la conexión
+        try:
+            await conn.rollback()
+        except Exception:
+            conn.close()
+        pool.release(conn)
+
+
+async def get_async_db():
+    """Dependencia de FastAPI: entrega una conexión asíncrona y la devuelve al pool al terminar"""
+    async with async_db_connection() as conn:
+        yield conn
+
+
+# ---------------------------
+# Acceso a datos
+# ---------------------------
+async def fetch_one(conn, sql, params=()):
+    """Ejecuta una consulta y devuelve la primera fila (o None)"""
+    async with conn.cursor() as cursor:
+        await cursor.execute(sql, params)
+        return await cursor.fetchone()
+
+
+async def fetch_all(conn, sql, params=()):
+    """Ejecuta una consulta y devuelve todas las filas"""
+    async with conn.cursor() as cursor:
+        await cursor.execute(sql, params)
+        return await cursor.fetchall()
+
+
+async def execute(conn, sql, params=(), commit=True):
+    """Ejecuta una sentencia de escritura y devuelve el id insertado"""
+    async with conn.cursor() as cursor:
+        await cursor.execute(sql, params)
+        lastrowid = cursor.lastrowid
+    if commit:
+        await conn.commit()
+    return lastrowid
@@ -1,11 +1,303 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
 import pymysql
 import pymysql.cursors
+from pymysql.constants import SERVER_STATUS
+from fastapi import HTTPException
 
-def get_db_connection():
+from src import config
+
+
+class PoolTimeoutError(Exception):
+    """No se obtuvo una conexión libre dentro del tiempo de espera del pool"""
+
+
+def _connect():
+    """Abre una conexión nueva contra MySQL"""
     return pymysql.connect(
-        host="localhost",
-        user="root",
-        password="",
-        database="PARKING",
+        host=config.DB_HOST,
+        port=config.DB_PORT,
+        user=config.DB_USER,
+        password=config.DB_PASSWORD,
+        database=config.DB_NAME,
         cursorclass=pymysql.cursors.DictCursor
     )
+
+
+def _in_transaction(raw) -> bool:
+    """Si el servidor reporta una transacción abierta (o no se sabe) en la conexión.
+
+    Tras un commit, o si no se ejecutó nada, no la hay y se evita el ROLLBACK. Con autocommit
+    desactivado un SELECT sí abre una: sin rollback la siguiente petición vería esa instantánea.
+    """
+    status = getattr(raw, "server_status", None)
+    return status is None or bool(status & SERVER_STATUS.SERVER_STATUS_IN_TRANS)
+
+
+class _PoolEntry:
+    """Conexión física junto con sus marcas de tiempo"""
+
+    __slots__ = ("raw", "created_at", "last_used")
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class PooledConnection:
+    """Envoltura de una conexión del pool: `close()` la devuelve al pool en lugar de cerrarla"""
+
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+
+    def __getattr__(self, name):
+        if self._entry is None:
+            raise pymysql.err.InterfaceError("La conexión ya fue devuelta al pool")
+        return getattr(self._entry.raw, name)
+
+    def close(self):
+        """Devuelve la conexión al pool (idempotente)"""
+        if self._entry is not None:
+            entry, self._entry = self._entry, None
+            self._pool.release(entry)
+
+    def discard(self):
+        """Cierra la conexión física en lugar de devolverla (p. ej. con un resultado a medio leer)"""
+        if self._entry is not None:
+            entry, self._entry = self._entry, None
+            self._pool.discard(entry)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConnectionPool:
+    """Pool de conexiones pymysql acotado y seguro entre hilos"""
+
+    def __init__(self, connect=_connect, min_size=1, max_size=10, timeout=10.0,
+                 max_lifetime=1800.0, ping_interval=30.0):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("Tamaños de pool inválidos")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.ping_interval = ping_interval
+
+        self._lock = threading.Condition()
+        self._idle = deque()
+        self._size = 0  # Conexiones abiertas (libres + en uso)
+        self._in_use = 0
+        self._closed = False
+
+        # Métricas
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._timeouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._discarded = 0
+
+        for _ in range(min_size):
+            self._idle.append(self._open())
+            self._size += 1
+
+    def _open(self):
+        entry = _PoolEntry(self._connect())
+        with self._lock:
+            self._created += 1
+        return entry
+
+    def _close_raw(self, entry):
+        try:
+            entry.raw.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, entry, now):
+        """Valida la conexión antes de entregarla: tiempo de vida y ping"""
+        if self.max_lifetime and now - entry.created_at > self.max_lifetime:
+            with self._lock:
+                self._recycled += 1
+            return False
+        if now - entry.last_used >= self.ping_interval:
+            try:
+                entry.raw.ping(reconnect=False)
+            except Exception:
+                with self._lock:
+                    self._discarded += 1
+                return False
+        return True
+
+    def acquire(self, timeout=None):
+        """Obtiene una conexión del pool, esperando como máximo `timeout` segundos"""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        waited = False
+
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise PoolTimeoutError("El pool de conexiones está cerrado")
+                if self._idle:
+                    entry = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    entry = None
+                    self._size += 1
+                    break
+                remaining = timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError("No hay conexiones disponibles en el pool")
+                waited = True
+                self._lock.wait(remaining)
+
+            self._in_use += 1
+            self._checkouts += 1
+            if waited:
+                elapsed = time.monotonic() - start
+                self._waits += 1
+                self._wait_time_total += elapsed
+                self._wait_time_max = max(self._wait_time_max, elapsed)
+
+        # El ping y la conexión se hacen fuera del lock para no bloquear a otros hilos
+        try:
+            if entry is not None and not self._is_healthy(entry, time.monotonic()):
+                self._close_raw(entry)
+                entry = None
+            if entry is None:
+                entry = self._open()
+        except Exception:
+            with self._lock:
+                self._size -= 1
+                self._in_use -= 1
+                self._lock.notify()
+            raise
+
+        return PooledConnection(self, entry)
+
+    def release(self, entry):
+        """Devuelve una conexión al pool descartando la transacción pendiente"""
+        try:
+            if _in_transaction(entry.raw):
+                entry.raw.rollback()
+            healthy = entry.raw.open
+        except Exception:
+            healthy = False
+
+        with self._lock:
+            self._in_use -= 1
+            if healthy and not self._closed:
+                entry.last_used = time.monotonic()
+                self._idle.append(entry)
+            else:
+                self._size -= 1
+                self._discarded += 1
+                self._close_raw(entry)
+            self._lock.notify()
+
+    def discard(self, entry):
+        """Cierra una conexión en uso sin rollback ni lectura pendiente y libera su lugar en el pool"""
+        with self._lock:
+            self._in_use -= 1
+            self._size -= 1
+            self._discarded += 1
+            self._lock.notify()
+        self._close_raw(entry)
+
+    def close(self):
+        """Cierra todas las conexiones libres; las que están en uso se cierran al devolverse"""
+        with self._lock:
+            self._closed = True
+            while self._idle:
+                self._close_raw(self._idle.pop())
+                self._size -= 1
+            self._lock.notify_all()
+
+    def stats(self):
+        """Métricas del pool para monitoreo"""
+        with self._lock:
+            return {
+                "size": self._size,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "wait_time_total": round(self._wait_time_total, 6),
+                "wait_time_avg": round(self._wait_time_total / self._waits, 6) if self._waits else 0.0,
+                "wait_time_max": round(self._wait_time_max, 6),
+                "timeouts": self._timeouts,
+                "created": self._created,
+                "recycled": self._recycled,
+                "discarded": self._discarded,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Devuelve el pool global, creándolo en el primer uso"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    min_size=config.DB_POOL_MIN_SIZE,
+                    max_size=config.DB_POOL_MAX_SIZE,
+                    timeout=config.DB_POOL_TIMEOUT,
+                    max_lifetime=config.DB_POOL_MAX_LIFETIME,
+                    ping_interval=config.DB_POOL_PING_INTERVAL,
+                )
+    return _pool
+
+
+def close_pool():
+    """Cierra el pool global (al apagar la aplicación)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def get_db_connection():
+    """Obtiene una conexión del pool; `conn.close()` la devuelve al pool"""
+    return get_pool().acquire()
+
+
+@contextmanager
+def db_connection():
+    """Context manager que garantiza devolver la conexión al pool, incluso ante excepciones"""
+    conn = get_db_connection()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def get_db():
+    """Dependencia de FastAPI: entrega una conexión del pool y la devuelve al terminar la petición"""
+    try:
+        conn = get_db_connection()
+    except PoolTimeoutError:
+        raise HTTPException(status_code=503, detail="Base de datos ocupada, intente de nuevo")
+    try:
+        yield conn
+    finally:
+        conn.close()
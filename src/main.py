@@ -1,9 +1,51 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from src.api.routes import auth, anpr, clients, entries, invoices, parkings, payments, rates, users, vehicles
 from fastapi.middleware.cors import CORSMiddleware
+from src import config
+from src.api.routes import anpr
 from src.core.security import create_super_user # Importamos la función que crea el superusuario
+from src.core.rate_cache import load_rates, load_rates_async
+from src.core.plate_index import load_plates, load_plates_async
+from src.db.database import close_pool, get_pool, db_connection
+from src.db.async_database import init_async_pool, close_async_pool, async_pool_stats
+from src.plate_detection.ANPR import warm_up_models, start_camera_processes, stop_camera_processes, deactivate_camera
 
-app = FastAPI()
+# Routers síncronos (pymysql en el threadpool) o asíncronos (aiomysql) según configuración
+if config.DB_ASYNC:
+    from src.api.routes_async import auth, clients, entries, invoices, parkings, payments, rates, users, vehicles
+else:
+    from src.api.routes import auth, clients, entries, invoices, parkings, payments, rates, users, vehicles
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Precargar la cache de tarifas (el primer checkout no consulta RATES) y el índice de placas
+    if config.DB_ASYNC:
+        pool = await init_async_pool()
+        async with pool.acquire() as conn:
+            await load_rates_async(conn)
+            await load_plates_async(conn)
+            await conn.rollback()
+    else:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            load_rates(cursor)
+            load_plates(cursor)
+            cursor.close()
+    # Modelos ANPR en segundo plano: la API atiende peticiones mientras cargan
+    if config.ANPR_CAMERA_PROCESSES and not config.ANPR_WORKER_SOCKET:
+        start_camera_processes()
+    elif config.ANPR_WARMUP and not config.ANPR_WORKER_SOCKET:
+        warm_up_models()
+    yield
+    # Detener las capturas compartidas (liberan las cámaras) y los procesos por cámara
+    deactivate_camera()
+    stop_camera_processes()
+    # Cerrar las conexiones del pool al apagar la app
+    if config.DB_ASYNC:
+        await close_async_pool()
+    close_pool()
+
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware to allow OPTIONS method
 app.add_middleware(
@@ -31,3 +73,10 @@ app.include_router(invoices.router, prefix="/invoices", tags=["Invoices"])
 @app.get("/")
 def home():
     return {"message": "Parking API is running"}
+
+@app.get("/health/db")
+def db_pool_stats():
+    """Métricas del pool de conexiones (en uso, libres, tiempos de espera)"""
+    if config.DB_ASYNC:
+        return async_pool_stats()
+    return get_pool().stats()
@@ -11,6 +11,7 @@ class RegistroIngreso(BaseModel):
     entry_id: Optional[int] = None  # Opcional en la creación
     vehicle_id: int  # FK - Vehículo que ingresa
     user_id: int  # FK - Usuario que registra la entrada
+    parking_id: int  # FK - Parqueadero donde ingresa
     rate_id: int  # FK - Tarifa aplicada
     entry_date: datetime
     exit_date: Optional[datetime] = None
@@ -0,0 +1,5 @@
+from enum import Enum
+
+class FormatoExportacion(str, Enum):
+    ndjson = "ndjson"  # Un objeto JSON por línea
+    csv = "csv"
@@ -1,13 +1,27 @@
-from typing import Generic, TypeVar, List
+from typing import Generic, TypeVar, List, Optional
+from enum import Enum
 from pydantic import BaseModel
 
 # Tipo genérico T (puede ser Usuario, Cliente, etc.)
 T = TypeVar("T")
 
+class EstrategiaConteo(str, Enum):
+    exact = "exact"  # COUNT(*) en cada petición
+    cached = "cached"  # COUNT(*) cacheado por búsqueda, invalidado al escribir en la tabla
+    approximate = "approximate"  # Estimación a partir de las estadísticas de la tabla
+    none = "none"  # Sin total (scroll infinito)
+
 # 🔹 Modelo de paginación genérico
 class PaginatedResponse(BaseModel, Generic[T]):
-    total: int
+    total: Optional[int] = None  # None si se pidió count=none
     page: int
     limit: int
-    total_pages: int
-    data: List[T]
\ No newline at end of file
+    total_pages: Optional[int] = None
+    total_estimated: bool = False  # True si el total es aproximado
+    data: List[T]
+
+# 🔹 Variante por cursor (keyset): cada página es un seek por índice, sin OFFSET ni COUNT
+class CursorPaginatedResponse(BaseModel, Generic[T]):
+    limit: int
+    next_cursor: Optional[str] = None  # None cuando no hay más resultados
+    data: List[T]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 class Vehiculo(BaseModel):
     vehicle_id: Optional[int] = None  # Opcional en la creación
@@ -7,4 +7,14 @@ class Vehiculo(BaseModel):
     plate: str
     brand: str
     model: str
-    created_at: Optional[str] = None  # Se asigna automáticamente en la BD
\ No newline at end of file
+    created_at: Optional[str] = None  # Se asigna automáticamente en la BD
+
+class CoincidenciaPlaca(BaseModel):
+    plate: str
+    distance: int  # Distancia de edición a la placa buscada
+    vehicle_ids: List[int]
+
+class BusquedaPlaca(BaseModel):
+    query: str  # Placa buscada normalizada
+    matches: List[CoincidenciaPlaca]
+    took_us: float  # Microsegundos de búsqueda en el índice
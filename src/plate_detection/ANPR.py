@@ -56,11 +56,12 @@
 #     return last_plate
 
 
-from ultralytics import YOLO
-import easyocr
 import cv2
-import re
 import os
+import threading
+
+from src import config
+from src.plate_detection import camera, detector, events, gating, multicam, ocr, registry, tracking
 
 # ---------------------------
 # Configuración de rutas
@@ -68,82 +69,246 @@ import os
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # carpeta de este script
 MODEL_PATH = os.path.join(BASE_DIR, "best.pt")
 
-# Inicialización de modelo YOLO entrenado
-model = YOLO(MODEL_PATH)
-# Inicializar EasyOCR (inglés, números y letras latinas)
-reader = easyocr.Reader(['en'])
+# ---------------------------
+# Modelos (carga diferida)
+# ---------------------------
+# YOLO y EasyOCR importan torch y ocupan cientos de MB: se cargan en el primer uso
+# o en segundo plano desde el lifespan, nunca al importar el módulo
+model = None
+reader = None
+_models_lock = threading.Lock()
+# Los predictores de ultralytics no son thread-safe: una sola inferencia YOLO a la vez por proceso
+# (hilos de cámara, reconocimiento por lotes y peticiones simultáneas a /anpr/recognize)
+_predict_lock = threading.Lock()
+_models_state = {"ready": False, "loading": False, "error": None}
+
+
+def load_models():
+    """Carga YOLO y EasyOCR una sola vez (seguro entre hilos)"""
+    global model, reader
+    if _models_state["ready"]:
+        return model, reader
+    with _models_lock:
+        if not _models_state["ready"]:
+            _models_state["loading"] = True
+            try:
+                import easyocr
+
+                # Inicialización de modelo YOLO entrenado (PyTorch o exportado a ONNX/OpenVINO)
+                model = detector.load_detector(config.ANPR_DETECTOR_BACKEND, MODEL_PATH, config.ANPR_DETECTOR_INT8)
+                # Inicializar EasyOCR (inglés, números y letras latinas)
+                reader = easyocr.Reader(['en'])
+                _models_state["ready"] = True
+                _models_state["error"] = None
+            except Exception as e:
+                _models_state["error"] = str(e)
+                raise
+            finally:
+                _models_state["loading"] = False
+    return model, reader
+
+
+def warm_up_models():
+    """Inicia la carga de los modelos en un hilo de fondo (no bloquea el arranque de la API)"""
+    def _load():
+        try:
+            load_models()
+        except Exception as e:
+            print(f"Error al cargar los modelos ANPR: {e}")
+
+    thread = threading.Thread(target=_load, name="anpr-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def models_status():
+    """Estado de carga de los modelos: ready, loading, error"""
+    if camera_pool is not None:
+        # Los modelos viven en los procesos de cada cámara
+        cameras = camera_pool.status()
+        return {"ready": all(cameras.values()), "loading": False, "error": None, "cameras": cameras}
+    status = dict(_models_state)
+    if ocr_cache is not None:
+        status["ocr_cache"] = ocr_cache.stats()
+    return status
 
 # Variable global para almacenar la última placa
 last_plate = None
+last_plates = {}  # id de cámara -> última placa confirmada
 camera_service = False
+camera_pool = None  # Procesos por cámara (ANPR_CAMERA_PROCESSES)
+
+# Zona del carril donde se buscan placas (None = cuadro completo)
+zone = gating.Zone.parse(config.ANPR_ZONE)
+
+# Placas confirmadas por votación, para /anpr/events
+plate_events = events.PlateEventBus(config.ANPR_EVENT_HISTORY, config.ANPR_EVENT_DEDUP_SECONDS)
 
 # ---------------------------
 # Funciones principales
 # ---------------------------
-def detectar_placa(frame):
-    #Detecta placa en un frame y devuelve el texto reconocido (si lo hay)
-    global last_plate
+def detect_boxes(frame):
+    """Cajas (x1, y1, x2, y2) de placas en el cuadro, detectadas con YOLO"""
+    model, _ = load_models()
+
+    # Solo sobre la zona y opcionalmente a menor resolución
+    image, offset, scale = gating.detection_input(frame, zone, config.ANPR_DETECT_WIDTH)
+    with _predict_lock:
+        results = model.predict(image, conf=0.25, imgsz=config.ANPR_DETECTOR_IMGSZ, verbose=False)
+        return [gating.to_frame_coords(box.xyxy[0], offset, scale) for r in results for box in r.boxes]
+
+
+# Solo se aceptan lecturas con formato de placa (corrigiendo confusiones como 0/O, 1/I, 8/B)
+plate_formats = tuple(pattern.strip().upper() for pattern in config.ANPR_PLATE_FORMATS.split(",") if pattern.strip())
+
+
+def _decode(text):
+    return ocr.decode_plate(text, plate_formats)
+
+
+def _recognize(rois):
+    _, reader = load_models()
+    return ocr.recognize_batch(
+        reader, rois, config.ANPR_OCR_HEIGHT,
+        decode=_decode if plate_formats else None,
+        allowlist=ocr.PLATE_ALLOWLIST,
+        preprocess=config.ANPR_OCR_PREPROCESS,
+    )
+
+
+# Lecturas de todas las cámaras de este proceso agrupadas en lotes (ANPR_OCR_BATCH_WAIT_MS > 0, en GPU)
+ocr_batcher = ocr.OCRBatcher(_recognize, wait=config.ANPR_OCR_BATCH_WAIT_MS / 1000)
+
 
-    # Detección de placa con YOLO
-    results = model.predict(frame, conf=0.25, verbose=False)
+def _read_uncached(rois):
+    if config.ANPR_OCR_BATCH_WAIT_MS > 0:
+        return ocr_batcher.read(rois)
+    return _recognize(rois)
 
-    for r in results:
-        for box in r.boxes:
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-            roi = frame[y1:y2, x1:x2]  # Recortar ROI (placa detectada)
 
-            if roi.size > 0:
-                ocr_result = reader.readtext(roi)
+# Recortes casi idénticos (auto detenido en la barrera) no vuelven a pasar por EasyOCR
+ocr_cache = ocr.OCRCache(config.ANPR_OCR_CACHE_SIZE, config.ANPR_OCR_CACHE_SIMILARITY) if config.ANPR_OCR_CACHE_SIZE > 0 else None
 
-                plate_text = ""
-                if ocr_result:
-                    # Elegir el texto con mayor score (más confiable)
-                    best_match = max(ocr_result, key=lambda x: x[2])
-                    plate_text = re.sub(r'[^A-Z0-9]', '', best_match[1].upper())
 
-                if plate_text:
-                    last_plate = plate_text.strip()
-                    # Mostrar texto reconocido en la imagen
-                    cv2.putText(frame, last_plate, (x1, y1 - 10),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 0, 255), 2)
+def read_plates(rois):
+    """(texto, confianza) o None por cada recorte, reconocidos en un solo lote"""
+    if ocr_cache is not None:
+        return ocr_cache.read(rois, _read_uncached)
+    return _read_uncached(rois)
+
+
+def read_plate(roi):
+    """(texto, confianza) de la placa en un recorte, o None si EasyOCR no lee nada"""
+    return read_plates([roi])[0]
+
+
+def detectar_placa(frame):
+    #Detecta placa en un frame y devuelve el texto reconocido (si lo hay)
+    global last_plate
+
+    boxes = detect_boxes(frame)
+    rois = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in boxes]  # Recortar ROI (placas detectadas)
+
+    for (x1, y1, x2, y2), read in zip(boxes, read_plates(rois)):
+        if read:
+            last_plate = read[0]
+            # Mostrar texto reconocido en la imagen
+            cv2.putText(frame, last_plate, (x1, y1 - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 0, 255), 2)
     return frame, last_plate
 
 
-def get_last_plate():
-    """Devuelve la última placa detectada"""
+def get_last_plate(camera_id=None):
+    """Devuelve la última placa detectada (de una cámara o de cualquiera)"""
     global last_plate
+    if camera_id is not None:
+        return last_plates.get(registry.resolve(camera_id))
     return last_plate
 
+def list_cameras():
+    """Ids de las cámaras registradas"""
+    return list(registry.CAMERAS)
+
 def activate_camera():
     """Activa el servicio de cámara"""
     global camera_service
     camera_service = True
 
 def deactivate_camera():
-    """Desactiva el servicio de cámara"""
+    """Desactiva el servicio de cámara y detiene las capturas activas"""
     global camera_service
     camera_service = False
+    camera.stop_all()
 
-def generate_frames(camera_index=0):
-    """Generador de frames para streaming tipo MJPEG (API)"""
-    global last_plate
-    global camera_service
-    cam = cv2.VideoCapture(camera_index)
+def get_events(after: int = 0, limit: int | None = None):
+    """Eventos de placa estables posteriores a `after`"""
+    return plate_events.since(after, limit)
 
-    while camera_service:
-        ret, frame = cam.read()
-        if not ret:
-            break
-
-        frame, _ = detectar_placa(frame)
-
-        # Codificar frame para streaming
-        _, buffer = cv2.imencode('.jpg', frame)
-        frame_bytes = buffer.tobytes()
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-
-    cam.release()
+def publish_plate(camera_id, plate, confidence):
+    """Registra una placa confirmada por votación: última placa (global y por cámara) y evento"""
+    global last_plate
+    last_plate = plate
+    last_plates[camera_id] = plate
+    plate_events.publish(plate, confidence, camera_id)
+
+def _frame_processor(camera_id, publish=publish_plate):
+    """Procesador de cuadros de una cámara: compuerta de movimiento y seguimiento con estado por cámara"""
+    gate = gating.MotionGate(config.ANPR_MOTION_THRESHOLD, config.ANPR_MOTION_HOLD) if config.ANPR_MOTION_GATE else None
+    every = None if config.ANPR_DETECT_EVERY == "auto" else int(config.ANPR_DETECT_EVERY)
+
+    def on_plate(track, plate, confidence):
+        # Solo las placas ya votadas actualizan la última placa y generan evento
+        publish(camera_id, plate, confidence)
+
+    # Los votos son siempre lecturas reales (`_read_uncached`); la caché guarda solo placas ya
+    # votadas, para no volver a leer un auto detenido cuando el tracker lo pierde y lo retoma
+    tracker = tracking.PlateTracker(
+        detect_boxes, _read_uncached, every=every, target_fps=config.ANPR_TARGET_FPS,
+        min_votes=config.ANPR_VOTE_MIN_READS, min_confidence=config.ANPR_VOTE_MIN_CONFIDENCE,
+        on_plate=on_plate,
+        known=ocr_cache.lookup if ocr_cache is not None else None,
+        remember=ocr_cache.store if ocr_cache is not None else None,
+    )
+
+    def process(frame):
+        # Sin movimiento en la zona no se ejecuta YOLO ni OCR
+        if gate is not None and not gate.active(zone.crop(frame)[0] if zone else frame):
+            return tracker.annotate(frame)
+        return tracker.process(frame)
+
+    return process
+
+def start_camera_processes():
+    """Arranca un proceso de captura y detección por cámara del registro"""
+    global camera_pool
+    if camera_pool is None:
+        camera_pool = multicam.CameraPool(registry.CAMERAS, publish_plate)
+        camera_pool.start()
+    return camera_pool
+
+def stop_camera_processes():
+    global camera_pool
+    if camera_pool is not None:
+        camera_pool.stop()
+        camera_pool = None
+
+def generate_frames(camera_index=None, quality=None, width=None):
+    """Generador de frames para streaming tipo MJPEG (API).
+
+    Todos los clientes de una misma cámara comparten una única captura e inferencia,
+    en un hilo de este proceso o en el proceso dedicado de la cámara (ANPR_CAMERA_PROCESSES).
+    Sin `quality`/`width` la calidad se adapta a la velocidad de cada cliente.
+    """
+    if not camera_service:
+        return
+    camera_id = registry.resolve(camera_index)
+    if camera_pool is not None:
+        stream = camera_pool.stream(camera_id)
+    else:
+        stream = camera.get_stream(
+            camera_id, lambda: camera.CameraStream(registry.CAMERAS[camera_id], _frame_processor(camera_id))
+        )
+    yield from stream.frames(quality, width)
 
 # -------------------------
 # Ejecución como script
@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from src import config
+from src.plate_detection import ANPR
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff"}
+
+
+def iter_frames(path: str, every: int = 1):
+    """(índice, segundo, cuadro) de una imagen, o de uno de cada `every` cuadros de un video"""
+    if os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS:
+        frame = cv2.imread(path)
+        if frame is None:
+            raise ValueError("No se pudo leer la imagen")
+        yield 0, 0.0, frame
+        return
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError("No se pudo abrir el video")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+    try:
+        index = 0
+        while True:
+            # Los cuadros que no se muestrean solo se extraen (grab), sin decodificarlos
+            if index % every:
+                if not cap.grab():
+                    break
+                index += 1
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield index, round(index / fps, 3) if fps else None, frame
+            index += 1
+    finally:
+        cap.release()
+
+
+def recognize_frame(frame):
+    """Placas de un cuadro: [{"box", "plate", "confidence"}] (sin tocar la última placa ni los eventos)"""
+    boxes = ANPR.detect_boxes(frame)
+    rois = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in boxes]
+    return [
+        {"box": list(box), "plate": read[0], "confidence": round(read[1], 3)}
+        for box, read in zip(boxes, ANPR.read_plates(rois)) if read
+    ]
+
+
+def recognize_file(path: str, every: int | None = None, workers: int | None = None):
+    """Genera el resultado de cada cuadro muestreado de una imagen o video, en orden.
+
+    Los cuadros se reparten entre `workers` hilos que comparten los modelos: la detección YOLO
+    se serializa (ver `ANPR.detect_boxes`), así que los hilos solapan la lectura del video, los
+    recortes y el OCR de un cuadro con la detección del siguiente. Solo se mantienen en memoria unos pocos cuadros
+    por hilo, así que sirve para videos largos.
+    """
+    every = max(1, every or config.ANPR_BATCH_SAMPLE_EVERY)
+    workers = max(1, workers or config.ANPR_BATCH_WORKERS)
+    ANPR.load_models()  # Falla antes de empezar a decodificar si los modelos no cargan
+
+    with ThreadPoolExecutor(workers, thread_name_prefix="anpr-batch") as pool:
+        pending = deque()
+        for index, second, frame in iter_frames(path, every):
+            pending.append((index, second, pool.submit(recognize_frame, frame)))
+            if len(pending) >= workers * 2:
+                index, second, future = pending.popleft()
+                yield {"frame": index, "time": second, "plates": future.result()}
+        while pending:
+            index, second, future = pending.popleft()
+            yield {"frame": index, "time": second, "plates": future.result()}
+
+
+def summarize(frames):
+    """Placas distintas de un archivo: cuadros en que aparece, mejor confianza y primer cuadro"""
+    plates = {}
+    for frame in frames:
+        for read in frame["plates"]:
+            summary = plates.setdefault(read["plate"], {"plate": read["plate"], "frames": 0, "confidence": 0.0,
+                                                        "first_frame": frame["frame"], "first_time": frame["time"]})
+            summary["frames"] += 1
+            summary["confidence"] = max(summary["confidence"], read["confidence"])
+    return sorted(plates.values(), key=lambda plate: plate["frames"], reverse=True)
+
+
+# -------------------------
+# Ejecución como script
+# -------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconocimiento de placas sobre imágenes o videos grabados")
+    parser.add_argument("files", nargs="+", help="Imágenes o videos")
+    parser.add_argument("--every", type=int, default=config.ANPR_BATCH_SAMPLE_EVERY, help="Procesar uno de cada N cuadros del video")
+    parser.add_argument("--workers", type=int, default=config.ANPR_BATCH_WORKERS, help="Hilos de detección/OCR")
+    parser.add_argument("--output", help="Guardar el resultado completo en un archivo JSON (si no, una línea JSON por cuadro)")
+    args = parser.parse_args()
+
+    results = []
+    for path in args.files:
+        frames = []
+        try:
+            for frame in recognize_file(path, args.every, args.workers):
+                frames.append(frame)
+                if not args.output:
+                    print(json.dumps({"file": path, **frame}))
+        except ValueError as e:
+            raise SystemExit(f"{path}: {e}")
+        results.append({"file": path, "frames": frames, "plates": summarize(frames)})
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"results": results}, f, indent=2)
+        for result in results:
+            print(result["file"], [plate["plate"] for plate in result["plates"]])
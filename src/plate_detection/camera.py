@@ -0,0 +1,304 @@
+import threading
+import time
+from collections import Counter
+from typing import NamedTuple
+
+import cv2
+import numpy as np
+
+from src import config
+
+# Segundos que un cliente espera un frame nuevo antes de volver a comprobar el estado
+FRAME_WAIT_TIMEOUT = 5.0
+
+
+class StreamProfile(NamedTuple):
+    """Calidad JPEG y ancho máximo (0 = original) con que se codifica un stream"""
+    quality: int
+    width: int = 0
+
+
+def adaptive_levels(quality: int):
+    """Perfiles por los que baja un cliente lento: primero calidad, luego resolución"""
+    return [
+        StreamProfile(quality),
+        StreamProfile(max(30, quality - 20)),
+        StreamProfile(max(30, quality - 30), 960),
+        StreamProfile(max(30, quality - 40), 640),
+    ]
+
+
+LEVELS = adaptive_levels(config.ANPR_STREAM_QUALITY)
+
+
+def mjpeg_parts(jpeg):
+    """Parte multipart/x-mixed-replace de un frame JPEG en tres trozos, sin copiar el JPEG
+    (cabecera, vista del buffer, cierre)"""
+    header = b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n' % len(jpeg)
+    return header, memoryview(jpeg), b'\r\n'
+
+
+class _Encoder:
+    """Codificación JPEG de un perfil, con buffer de redimensionado reutilizado entre cuadros"""
+
+    def __init__(self, profile: StreamProfile):
+        self.profile = profile
+        self._params = [cv2.IMWRITE_JPEG_QUALITY, profile.quality]
+        self._resized = None
+
+    def encode(self, frame):
+        width = self.profile.width
+        if width and frame.shape[1] > width:
+            size = (width, round(frame.shape[0] * width / frame.shape[1]))
+            if self._resized is None or self._resized.shape[1::-1] != size or self._resized.shape[2:] != frame.shape[2:]:
+                self._resized = np.empty((size[1], size[0]) + frame.shape[2:], dtype=frame.dtype)
+            frame = cv2.resize(frame, size, dst=self._resized, interpolation=cv2.INTER_AREA)
+        ok, buffer = cv2.imencode('.jpg', frame, self._params)
+        return buffer.reshape(-1) if ok else None
+
+
+class _RateController:
+    """Baja o sube el perfil de un cliente según cuánto tarda en recibir cada cuadro.
+
+    Si enviar un cuadro tarda más que el intervalo entre cuadros, el cliente va atrasado
+    (ya está perdiendo cuadros): se baja un nivel. Tras un rato holgado se vuelve a subir.
+    """
+
+    def __init__(self, levels, recover_frames: int = 30):
+        self.levels = levels
+        self.level = 0
+        self.recover_frames = recover_frames
+        self._load = None  # Promedio móvil de tiempo de envío / intervalo entre cuadros
+        self._idle = 0
+
+    @property
+    def profile(self):
+        return self.levels[self.level]
+
+    def update(self, send_time: float, interval: float) -> bool:
+        """Registra un envío; True si cambió el perfil"""
+        load = send_time / max(interval, 1e-3)
+        self._load = load if self._load is None else 0.7 * self._load + 0.3 * load
+        if self._load > 1.0 and self.level < len(self.levels) - 1:
+            self.level += 1
+        elif self._load < 0.5 and self.level > 0:
+            self._idle += 1
+            if self._idle < self.recover_frames:
+                return False
+            self.level -= 1
+        else:
+            self._idle = 0
+            return False
+        self._load, self._idle = None, 0
+        return True
+
+
+class CameraStream:
+    """Una captura + inferencia por cámara, compartida por todos los clientes MJPEG.
+
+    El hilo de captura arranca con el primer suscriptor y se detiene (liberando la cámara)
+    cuando se va el último; solo publica el cuadro anotado. La codificación JPEG corre en un
+    hilo por perfil (calidad/ancho) con clientes, siempre sobre el cuadro más reciente, así
+    que un cliente lento se salta cuadros en vez de acumularlos y no frena la inferencia.
+    """
+
+    def __init__(self, source, process):
+        self.source = source
+        self._process = process  # frame -> frame anotado
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._subscribers = 0
+        self._seq = 0
+        self._frame = None  # Último cuadro anotado
+        self._interval = 0.0  # Promedio móvil de segundos entre cuadros
+        self._viewers = Counter()  # perfil -> clientes
+        self._encoders = {}  # perfil -> hilo de codificación
+        self._encoded = {}  # perfil -> (seq, JPEG)
+
+    @property
+    def subscribers(self):
+        return self._subscribers
+
+    def _start(self):
+        """Arranca el hilo de captura si no está corriendo (llamar con el lock tomado)"""
+        if self._running:
+            return
+        previous = self._thread
+        self._running = True
+        self._thread = threading.Thread(target=self._run, args=(previous,), name=f"camera-{self.source}", daemon=True)
+        self._thread.start()
+
+    def _produce(self):
+        """Cada cuadro procesado (las subclases pueden obtenerlos de otro proceso)"""
+        cam = cv2.VideoCapture(self.source)
+        try:
+            while True:
+                ret, frame = cam.read()
+                if not ret:
+                    break
+                yield self._process(frame)
+        finally:
+            cam.release()
+
+    def _encode(self, encoder: _Encoder, frame):
+        """JPEG (buffer numpy) de un cuadro publicado"""
+        return encoder.encode(frame)
+
+    def _run(self, previous):
+        # Esperar a que la captura anterior suelte la cámara antes de abrirla de nuevo
+        if previous is not None:
+            previous.join()
+        frames = self._produce()
+        last = None
+        try:
+            while True:
+                with self._cond:
+                    if self._thread is not threading.current_thread():
+                        break
+                    if self._subscribers == 0:
+                        self._running = False  # El próximo suscriptor arranca una captura nueva
+                    if not self._running:
+                        break
+                frame = next(frames, None)
+                if frame is None:
+                    break
+
+                now = time.perf_counter()
+                with self._cond:
+                    # Se publica la referencia: ni copia ni codificación en este hilo
+                    self._frame = frame
+                    self._seq += 1
+                    if last is not None:
+                        self._interval = 0.9 * self._interval + 0.1 * (now - last) if self._interval else now - last
+                    self._cond.notify_all()
+                last = now
+        finally:
+            frames.close()  # Libera la cámara
+            with self._cond:
+                # Un suscriptor nuevo pudo haber arrancado otra captura mientras esta terminaba
+                if self._thread is threading.current_thread():
+                    self._running = False
+                self._cond.notify_all()
+
+    def _ensure_encoder(self, profile):
+        """Arranca el hilo de codificación del perfil si no existe (llamar con el lock tomado)"""
+        if profile not in self._encoders:
+            thread = threading.Thread(target=self._encode_loop, args=(profile,),
+                                      name=f"camera-{self.source}-jpeg-{profile.quality}-{profile.width}", daemon=True)
+            self._encoders[profile] = thread
+            thread.start()
+
+    def _encode_loop(self, profile):
+        encoder = _Encoder(profile)
+        seq = 0
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(
+                        lambda: self._seq != seq or not self._running or not self._viewers[profile],
+                        timeout=FRAME_WAIT_TIMEOUT
+                    )
+                    if not self._viewers[profile] or not self._running:
+                        break
+                    if self._seq == seq:
+                        continue
+                    seq, frame = self._seq, self._frame
+
+                jpeg = self._encode(encoder, frame)
+                if jpeg is None:
+                    continue
+                with self._cond:
+                    self._encoded[profile] = (seq, jpeg)
+                    self._cond.notify_all()
+        finally:
+            with self._cond:
+                if self._encoders.get(profile) is threading.current_thread():
+                    del self._encoders[profile]
+                    self._encoded.pop(profile, None)
+                    # Una captura nueva pudo arrancar mientras este hilo terminaba
+                    if self._running and self._viewers[profile]:
+                        self._ensure_encoder(profile)
+                self._cond.notify_all()
+
+    def stop(self):
+        """Detiene la captura; los clientes conectados terminan su stream"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def frames(self, quality: int | None = None, width: int | None = None):
+        """Generador de chunks MJPEG para un cliente.
+
+        Con `quality`/`width` el perfil es fijo; sin ellos se adapta a la velocidad del cliente.
+        Cada cuadro se entrega en tres chunks (cabecera, JPEG sin copiar, cierre).
+        """
+        rate = None
+        if quality or width:
+            profile = StreamProfile(quality or LEVELS[0].quality, width or 0)
+        elif config.ANPR_STREAM_ADAPTIVE:
+            rate = _RateController(LEVELS)
+            profile = rate.profile
+        else:
+            profile = LEVELS[0]
+
+        with self._cond:
+            self._subscribers += 1
+            self._viewers[profile] += 1
+            self._start()
+            self._ensure_encoder(profile)
+            seq = self._seq
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(
+                        lambda: self._encoded.get(profile, (seq,))[0] > seq or not self._running,
+                        timeout=FRAME_WAIT_TIMEOUT
+                    )
+                    current = self._encoded.get(profile)
+                    if current is None or current[0] <= seq:
+                        if not self._running:
+                            break
+                        self._ensure_encoder(profile)
+                        continue
+                    seq, jpeg = current
+                    interval = self._interval
+
+                start = time.perf_counter()
+                yield from mjpeg_parts(jpeg)
+                if rate is not None and rate.update(time.perf_counter() - start, interval):
+                    with self._cond:
+                        self._viewers[profile] -= 1
+                        profile = rate.profile
+                        self._viewers[profile] += 1
+                        self._ensure_encoder(profile)
+                        self._cond.notify_all()
+        finally:
+            with self._cond:
+                self._subscribers -= 1
+                self._viewers[profile] -= 1
+                self._cond.notify_all()
+
+
+# ---------------------------
+# Registro de cámaras
+# ---------------------------
+_streams = {}
+_streams_lock = threading.Lock()
+
+
+def get_stream(key, factory) -> CameraStream:
+    """Stream compartido de una cámara; `factory()` lo crea la primera vez"""
+    with _streams_lock:
+        stream = _streams.get(key)
+        if stream is None:
+            stream = _streams[key] = factory()
+        return stream
+
+
+def stop_all():
+    """Detiene todas las capturas activas"""
+    with _streams_lock:
+        streams = list(_streams.values())
+    for stream in streams:
+        stream.stop()
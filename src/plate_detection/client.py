@@ -0,0 +1,109 @@
+import json
+import socket
+
+from src import config
+from src.plate_detection.registry import CameraNotFoundError
+from src.plate_detection.worker import send_json, recv_json, recv_message
+
+
+class WorkerUnavailableError(Exception):
+    """No se pudo contactar al worker ANPR"""
+
+
+def _connect(timeout: float | None = 5.0) -> socket.socket:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(config.ANPR_WORKER_SOCKET)
+    except OSError as e:
+        sock.close()
+        raise WorkerUnavailableError(str(e)) from e
+    return sock
+
+
+def _request(cmd: str, **params) -> dict:
+    sock = _connect()
+    try:
+        send_json(sock, {"cmd": cmd, **params})
+        response = recv_json(sock)
+    except OSError as e:
+        raise WorkerUnavailableError(str(e)) from e
+    finally:
+        sock.close()
+    # Solo los errores del worker traen `code`; "error" también es un campo de `status`
+    code = response.get("code")
+    if code == "camera_not_found":
+        raise CameraNotFoundError(response["error"])
+    if code:
+        raise WorkerUnavailableError(response["error"])
+    return response
+
+
+def get_last_plate(camera_id=None):
+    """Última placa detectada por el worker (de una cámara o de cualquiera)"""
+    return _request("last_plate", camera=camera_id)["plate"]
+
+
+def list_cameras():
+    """Ids de las cámaras registradas en el worker"""
+    return _request("cameras")["cameras"]
+
+
+def models_status():
+    """Estado de carga de los modelos en el worker"""
+    return _request("status")
+
+
+def get_events(after: int = 0, limit: int | None = None):
+    """Eventos de placa del worker posteriores a `after`"""
+    return _request("events", after=after, limit=limit)["events"]
+
+
+def generate_frames(camera_index=None, quality=None, width=None):
+    """Chunks MJPEG producidos por el worker (mismo formato que `ANPR.generate_frames`)"""
+    # Conectar antes de devolver el generador para fallar rápido si el worker no está
+    sock = _connect()
+    send_json(sock, {"cmd": "video", "camera": camera_index, "quality": quality, "width": width})
+    sock.settimeout(None)  # El primer frame puede tardar mientras cargan los modelos
+
+    def _frames():
+        try:
+            while True:
+                chunk = recv_message(sock)
+                if not chunk:
+                    break
+                yield chunk
+        except ConnectionError:
+            pass
+        finally:
+            sock.close()
+
+    return _frames()
+
+
+def recognize_file(path: str, every: int | None = None, workers: int | None = None):
+    """Resultados por cuadro de una imagen o video leídos por el worker (misma máquina, misma ruta)"""
+    sock = _connect()
+    send_json(sock, {"cmd": "recognize", "path": path, "every": every, "workers": workers})
+    sock.settimeout(None)
+
+    def _frames():
+        try:
+            while True:
+                message = recv_message(sock)
+                if not message:
+                    break
+                frame = json.loads(message)
+                if "error" in frame:
+                    raise ValueError(frame["error"])
+                yield frame
+        except ConnectionError as e:
+            raise WorkerUnavailableError(str(e)) from e
+        finally:
+            sock.close()
+
+    return _frames()
+
+
+def activate_camera():
+    """El worker activa la cámara al abrir cada stream; se mantiene por compatibilidad con ANPR"""
@@ -0,0 +1,138 @@
+import argparse
+import glob
+import os
+
+import cv2
+import numpy as np
+
+# ---------------------------
+# Backends del detector de placas
+# ---------------------------
+# "torch" es el `best.pt` original. "onnx" (ONNX Runtime) y "openvino" son el mismo modelo
+# exportado, mucho más rápidos en CPU; ultralytics los carga con la misma interfaz `predict`.
+BACKENDS = ("torch", "onnx", "openvino")
+IMAGE_EXTENSIONS = ("jpg", "jpeg", "png")
+
+
+def model_path(backend: str, weights: str, int8: bool = False) -> str:
+    """Ruta del modelo exportado para `backend`, junto a los pesos `.pt`"""
+    base = os.path.splitext(weights)[0]
+    if backend == "torch":
+        return weights
+    if backend == "onnx":
+        return f"{base}-int8.onnx" if int8 else f"{base}.onnx"
+    if backend == "openvino":
+        return f"{base}_int8_openvino_model" if int8 else f"{base}_openvino_model"
+    raise ValueError(f"Backend de detector desconocido: {backend} (opciones: {', '.join(BACKENDS)})")
+
+
+def load_detector(backend: str, weights: str, int8: bool = False):
+    """Modelo YOLO del backend pedido (el modelo exportado debe existir, ver `export`)"""
+    from ultralytics import YOLO
+
+    path = model_path(backend, weights, int8)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No existe {path}: expórtalo con python -m src.plate_detection.detector {backend}")
+    return YOLO(path, task="detect")
+
+
+# ---------------------------
+# Exportación
+# ---------------------------
+def _calibration_images(folder: str):
+    paths = sorted(p for ext in IMAGE_EXTENSIONS for p in glob.glob(os.path.join(folder, f"*.{ext}")))
+    if not paths:
+        raise ValueError(f"No hay imágenes de calibración en {folder}")
+    return paths
+
+
+def letterbox(image, size: int):
+    """Imagen BGR -> tensor NCHW float32 en [0, 1], escalado con bordes como lo hace YOLO"""
+    h, w = image.shape[:2]
+    scale = min(size / h, size / w)
+    resized = cv2.resize(image, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_LINEAR)
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    top, left = (size - resized.shape[0]) // 2, (size - resized.shape[1]) // 2
+    canvas[top:top + resized.shape[0], left:left + resized.shape[1]] = resized
+    return np.ascontiguousarray(canvas[:, :, ::-1].transpose(2, 0, 1)[None], dtype=np.float32) / 255.0
+
+
+def _quantize_onnx(fp32_path: str, int8_path: str, calibration: str, imgsz: int):
+    """Cuantización estática int8 (pesos por canal, activaciones calibradas con imágenes del carril)"""
+    import onnx
+    import onnxruntime
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+    input_name = onnxruntime.InferenceSession(fp32_path, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+
+    class _Reader(CalibrationDataReader):
+        def __init__(self, paths):
+            self._paths = iter(paths)
+
+        def get_next(self):
+            for path in self._paths:
+                image = cv2.imread(path)
+                if image is not None:
+                    return {input_name: letterbox(image, imgsz)}
+            return None
+
+    quantize_static(fp32_path, int8_path, _Reader(_calibration_images(calibration)),
+                    quant_format=QuantFormat.QDQ, per_channel=True,
+                    activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+
+    # ultralytics lee nombres de clases, tarea e imgsz de los metadatos del ONNX
+    source, quantized = onnx.load(fp32_path), onnx.load(int8_path)
+    del quantized.metadata_props[:]
+    quantized.metadata_props.extend(source.metadata_props)
+    onnx.save(quantized, int8_path)
+
+
+def export(backend: str, weights: str, imgsz: int = 640, int8: bool = False,
+           calibration: str | None = None, data: str | None = None) -> str:
+    """Exporta `weights` al formato del backend y devuelve la ruta del modelo resultante.
+
+    int8 en ONNX se calibra con una carpeta de imágenes del carril (`calibration`); en OpenVINO,
+    ultralytics usa el YAML de dataset `data` (NNCF).
+    """
+    from ultralytics import YOLO
+
+    if backend == "torch":
+        return weights
+    model = YOLO(weights)
+    if backend == "onnx":
+        exported = model.export(format="onnx", imgsz=imgsz, dynamic=False, simplify=True)
+        if not int8:
+            return exported
+        if not calibration:
+            raise ValueError("int8 en ONNX requiere una carpeta de imágenes de calibración")
+        target = model_path("onnx", weights, int8=True)
+        _quantize_onnx(exported, target, calibration, imgsz)
+        return target
+    if backend == "openvino":
+        if int8 and not data:
+            raise ValueError("int8 en OpenVINO requiere el YAML de dataset para calibrar")
+        return model.export(format="openvino", imgsz=imgsz, int8=int8, data=data)
+    raise ValueError(f"Backend de detector desconocido: {backend} (opciones: {', '.join(BACKENDS)})")
+
+
+# -------------------------
+# Ejecución como script
+# -------------------------
+if __name__ == "__main__":
+    from src import config
+    from src.plate_detection.ANPR import MODEL_PATH
+
+    parser = argparse.ArgumentParser(description="Exporta el detector de placas a ONNX u OpenVINO")
+    parser.add_argument("backend", choices=BACKENDS[1:])
+    parser.add_argument("--weights", default=MODEL_PATH, help="Pesos PyTorch de origen")
+    parser.add_argument("--imgsz", type=int, default=config.ANPR_DETECTOR_IMGSZ)
+    parser.add_argument("--int8", action="store_true", help="Cuantizar a int8")
+    parser.add_argument("--calibration", help="Carpeta de imágenes del carril para calibrar int8 (ONNX)")
+    parser.add_argument("--data", help="YAML de dataset para calibrar int8 (OpenVINO)")
+    args = parser.parse_args()
+
+    try:
+        path = export(args.backend, args.weights, args.imgsz, args.int8, args.calibration, args.data)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    print(f"Modelo exportado: {path}")
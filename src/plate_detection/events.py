@@ -0,0 +1,48 @@
+import itertools
+import threading
+import time
+from collections import deque
+
+
+class PlateEventBus:
+    """Eventos de placa estables (tras la votación) con historial acotado en memoria.
+
+    Los clientes leen con `since(last_id)`; los ids son crecientes, así un cliente que se
+    reconecta (SSE Last-Event-ID) recibe lo que se perdió mientras siga en el historial.
+    Los ids parten del instante de arranque en milisegundos: siguen creciendo tras reiniciar
+    el proceso, y un cliente que vuelve con un id de antes no se salta los eventos nuevos.
+    """
+
+    def __init__(self, history: int = 100, dedup_seconds: float = 30.0):
+        self._events = deque(maxlen=history)
+        self._ids = itertools.count(int(time.time() * 1000))
+        self._lock = threading.Lock()
+        self.dedup_seconds = dedup_seconds
+        self._last_seen = {}  # (cámara, placa) -> timestamp del último evento
+
+    def publish(self, plate: str, confidence: float, camera) -> dict | None:
+        """Registra un evento; None si la misma placa ya se emitió en esa cámara hace poco"""
+        now = time.time()
+        with self._lock:
+            key = (camera, plate)
+            previous = self._last_seen.get(key)
+            self._last_seen[key] = now
+            if previous is not None and now - previous < self.dedup_seconds:
+                return None
+            if len(self._last_seen) > 4 * (self._events.maxlen or 100):
+                self._last_seen = {k: t for k, t in self._last_seen.items() if now - t < self.dedup_seconds}
+            event = {
+                "id": next(self._ids),
+                "plate": plate,
+                "confidence": round(confidence, 3),
+                "timestamp": now,
+                "camera": camera,
+            }
+            self._events.append(event)
+            return event
+
+    def since(self, last_id: int = 0, limit: int | None = None) -> list[dict]:
+        """Eventos con id mayor a `last_id`, del más antiguo al más reciente"""
+        with self._lock:
+            events = [event for event in self._events if event["id"] > last_id]
+        return events[-limit:] if limit else events
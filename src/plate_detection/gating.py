@@ -0,0 +1,113 @@
+import cv2
+import numpy as np
+
+
+class Zone:
+    """Zona de la portería (carril) donde se buscan placas.
+
+    Se define como polígono en coordenadas normalizadas (0-1), p. ej. "0.2,0.4;0.9,0.4;0.9,1;0.2,1".
+    La detección solo mira el rectángulo que contiene al polígono, con el exterior en negro.
+    """
+
+    def __init__(self, points):
+        self.points = np.array(points, dtype=np.float32)
+        self._cache = {}  # (alto, ancho) -> (x1, y1, x2, y2, máscara o None)
+
+    def _is_rectangle(self):
+        return len(self.points) == 4 and len(set(self.points[:, 0])) == 2 and len(set(self.points[:, 1])) == 2
+
+    @classmethod
+    def parse(cls, spec: str):
+        """Zona desde texto; None si está vacío (cuadro completo)"""
+        if not spec or not spec.strip():
+            return None
+        points = [tuple(float(v) for v in pair.split(",")) for pair in spec.split(";") if pair.strip()]
+        if len(points) == 2:  # Rectángulo dado por dos esquinas
+            (x1, y1), (x2, y2) = points
+            points = [(x1, y1), (x2, y1), (x2, y2), (x1, y2)]
+        if len(points) < 3:
+            raise ValueError(f"Zona inválida: {spec}")
+        return cls(points)
+
+    def _geometry(self, shape):
+        key = shape[:2]
+        if key not in self._cache:
+            height, width = key
+            pixels = np.round(self.points * [width, height]).astype(np.int32)
+            x, y, w, h = cv2.boundingRect(pixels)
+            x1, y1 = max(x, 0), max(y, 0)
+            x2, y2 = min(x + w, width), min(y + h, height)
+            mask = None
+            if not self._is_rectangle():
+                mask = np.zeros((y2 - y1, x2 - x1), dtype=np.uint8)
+                cv2.fillPoly(mask, [pixels - [x1, y1]], 255)
+            self._cache[key] = (x1, y1, x2, y2, mask)
+        return self._cache[key]
+
+    def crop(self, frame):
+        """Recorte de la zona y su desplazamiento (x, y) dentro del cuadro"""
+        x1, y1, x2, y2, mask = self._geometry(frame.shape)
+        region = frame[y1:y2, x1:x2]
+        if mask is not None:
+            region = cv2.bitwise_and(region, region, mask=mask)
+        return region, (x1, y1)
+
+
+class MotionGate:
+    """Compuerta de movimiento por diferencia de cuadros (barata: escala de grises a baja resolución).
+
+    Deja pasar la detección mientras hay movimiento y durante `hold` cuadros después,
+    para leer la placa de un vehículo que se detiene frente a la barrera.
+    """
+
+    def __init__(self, threshold: float = 0.01, hold: int = 15, width: int = 160):
+        self.threshold = threshold  # Fracción de píxeles que deben cambiar
+        self.hold = hold
+        self.width = width
+        self._previous = None
+        self._remaining = 0
+
+    def _prepare(self, frame):
+        height, width = frame.shape[:2]
+        small = cv2.resize(frame, (self.width, max(1, height * self.width // width)), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def active(self, frame) -> bool:
+        """True si hay que correr la detección en este cuadro"""
+        current = self._prepare(frame)
+        previous, self._previous = self._previous, current
+        if previous is None or previous.shape != current.shape:
+            self._remaining = self.hold
+            return True
+
+        diff = cv2.absdiff(previous, current)
+        _, changed = cv2.threshold(diff, 25, 255, cv2.THRESH_BINARY)
+        if cv2.countNonZero(changed) >= self.threshold * changed.size:
+            self._remaining = self.hold
+            return True
+        if self._remaining > 0:
+            self._remaining -= 1
+            return True
+        return False
+
+
+def detection_input(frame, zone: Zone | None, detect_width: int = 0):
+    """Imagen para el detector: zona recortada y, si se pide, reducida a `detect_width` de ancho.
+
+    Devuelve (imagen, desplazamiento, escala) para llevar las cajas de vuelta al cuadro original.
+    """
+    region, offset = zone.crop(frame) if zone else (frame, (0, 0))
+    scale = 1.0
+    width = region.shape[1]
+    if detect_width and 0 < detect_width < width:
+        scale = detect_width / width
+        region = cv2.resize(region, (detect_width, max(1, round(region.shape[0] * scale))), interpolation=cv2.INTER_AREA)
+    return region, offset, scale
+
+
+def to_frame_coords(xyxy, offset, scale):
+    """Caja del detector -> coordenadas enteras del cuadro original"""
+    ox, oy = offset
+    x1, y1, x2, y2 = (float(v) / scale for v in xyxy)
+    return int(x1) + ox, int(y1) + oy, int(x2) + ox, int(y2) + oy
@@ -0,0 +1,171 @@
+import multiprocessing as mp
+import queue
+import threading
+
+import cv2
+
+from src.plate_detection import camera
+
+# Segundos antes de reabrir una cámara que dejó de entregar cuadros (p. ej. RTSP caído)
+RECONNECT_DELAY = 2.0
+
+# "spawn": cada proceso carga sus propios modelos sin heredar hilos ni locks del padre
+_ctx = mp.get_context("spawn")
+
+
+def _offer(frames, jpeg):
+    """Entrega el JPEG más reciente descartando el más viejo si el padre va atrasado"""
+    try:
+        frames.put_nowait(jpeg)
+    except queue.Full:
+        try:
+            frames.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            frames.put_nowait(jpeg)
+        except queue.Full:
+            pass
+
+
+class _JpegSender:
+    """Hilo del proceso de cámara que codifica y envía el último cuadro anotado, sin frenar la inferencia"""
+
+    def __init__(self, frames):
+        self._frames = frames
+        self._encoder = camera._Encoder(camera.LEVELS[0])
+        self._cond = threading.Condition()
+        self._frame = None
+        threading.Thread(target=self._run, name="anpr-jpeg", daemon=True).start()
+
+    def offer(self, frame):
+        with self._cond:
+            self._frame = frame  # Si el anterior no alcanzó a codificarse, se descarta
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._frame is not None)
+                frame, self._frame = self._frame, None
+            jpeg = self._encoder.encode(frame)
+            if jpeg is not None:
+                _offer(self._frames, jpeg)
+
+
+def _camera_main(camera_id, source, frames, plates, streaming, stop):
+    """Proceso de una cámara: captura y detección continuas; los JPEG solo se envían si hay espectadores"""
+    from src.plate_detection import ANPR
+
+    def publish(camera_id, plate, confidence):
+        plates.put((camera_id, plate, confidence))
+
+    process = ANPR._frame_processor(camera_id, publish)
+    sender = _JpegSender(frames)
+    cam = None
+    try:
+        while not stop.is_set():
+            if cam is None:
+                cam = cv2.VideoCapture(source)
+            ret, frame = cam.read()
+            if not ret:
+                cam.release()
+                cam = None
+                stop.wait(RECONNECT_DELAY)
+                continue
+
+            frame = process(frame)
+            if streaming.is_set():
+                sender.offer(frame)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if cam is not None:
+            cam.release()
+
+
+class ProcessCameraStream(camera.CameraStream):
+    """Stream MJPEG de una cámara cuya captura e inferencia corren en su propio proceso.
+
+    La detección no se detiene sin espectadores (las placas siguen generando eventos);
+    solo se deja de codificar y enviar los cuadros. El proceso envía JPEG del perfil más alto:
+    se reenvían tal cual y solo se recodifican para clientes en un perfil más bajo.
+    """
+
+    def __init__(self, camera_id, source):
+        super().__init__(source, process=None)
+        self.camera_id = camera_id
+        self._frames = _ctx.Queue(maxsize=2)
+        self._streaming = _ctx.Event()
+        self._stop = _ctx.Event()
+        self.process = None
+
+    def start_process(self, plates):
+        self.process = _ctx.Process(
+            target=_camera_main,
+            args=(self.camera_id, self.source, self._frames, plates, self._streaming, self._stop),
+            name=f"anpr-camera-{self.camera_id}",
+            daemon=True,
+        )
+        self.process.start()
+
+    def _produce(self):
+        self._streaming.set()
+        try:
+            while True:
+                try:
+                    yield self._frames.get(timeout=camera.FRAME_WAIT_TIMEOUT)
+                except queue.Empty:
+                    if self.process is None or not self.process.is_alive():
+                        return
+        finally:
+            self._streaming.clear()
+
+    def _encode(self, encoder, jpeg):
+        if encoder.profile == camera.LEVELS[0]:
+            return jpeg
+        frame = cv2.imdecode(jpeg, cv2.IMREAD_COLOR)
+        return encoder.encode(frame) if frame is not None else None
+
+    def shutdown(self, timeout: float = 5.0):
+        self.stop()
+        self._stop.set()
+        if self.process is not None:
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+
+
+class CameraPool:
+    """Un proceso por cámara del registro; las placas confirmadas vuelven al proceso principal"""
+
+    def __init__(self, cameras: dict, on_plate):
+        self._on_plate = on_plate  # (camera_id, placa, confianza)
+        self._plates = _ctx.Queue()
+        self.streams = {camera_id: ProcessCameraStream(camera_id, source) for camera_id, source in cameras.items()}
+        self._collector = None
+
+    def start(self):
+        for stream in self.streams.values():
+            stream.start_process(self._plates)
+        self._collector = threading.Thread(target=self._collect, name="anpr-plates", daemon=True)
+        self._collector.start()
+
+    def _collect(self):
+        while True:
+            item = self._plates.get()
+            if item is None:
+                break
+            self._on_plate(*item)
+
+    def stream(self, camera_id) -> ProcessCameraStream:
+        return self.streams[camera_id]
+
+    def stop(self):
+        for stream in self.streams.values():
+            stream.shutdown()
+        self._plates.put(None)
+
+    def status(self):
+        """Proceso vivo por cámara"""
+        return {camera_id: bool(stream.process and stream.process.is_alive()) for camera_id, stream in self.streams.items()}
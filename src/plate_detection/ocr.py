@@ -0,0 +1,368 @@
+import math
+import re
+import threading
+from concurrent.futures import Future
+from typing import NamedTuple
+
+import cv2
+import numpy as np
+
+_NON_ALNUM = re.compile(r'[^A-Z0-9]')
+_GAP = 8  # Píxeles entre recortes apilados
+
+
+def clean_text(text: str) -> str:
+    """Solo letras mayúsculas y dígitos"""
+    return _NON_ALNUM.sub('', text.upper())
+
+
+def skew_angle(gray, max_angle: float = 15.0) -> float:
+    """Inclinación en grados de los bordes horizontales de la placa (0 si no se distinguen)"""
+    width = gray.shape[1]
+    edges = cv2.Canny(gray, 50, 150)
+    lines = cv2.HoughLinesP(edges, 1, np.pi / 180, threshold=max(10, width // 4),
+                            minLineLength=width // 2, maxLineGap=5)
+    if lines is None:
+        return 0.0
+    angles = [math.degrees(math.atan2(y2 - y1, x2 - x1)) for x1, y1, x2, y2 in lines.reshape(-1, 4)]
+    angles = [angle for angle in angles if abs(angle) <= max_angle]
+    return float(np.median(angles)) if angles else 0.0
+
+
+def deskew(gray):
+    """Endereza una placa inclinada (cámara de lado o vehículo girado)"""
+    angle = skew_angle(gray)
+    if abs(angle) < 1.0:
+        return gray
+    h, w = gray.shape[:2]
+    matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    return cv2.warpAffine(gray, matrix, (w, h), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+
+def normalize_roi(roi, height: int = 64, preprocess: bool = True):
+    """Recorte de placa en escala de grises y alto fijo (conserva la proporción).
+
+    Con `preprocess` además se endereza y se ecualiza el contraste (CLAHE), que ayuda con
+    placas a contraluz o de noche.
+    """
+    gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY) if roi.ndim == 3 else roi
+    h, w = gray.shape[:2]
+    if h != height:
+        gray = cv2.resize(gray, (max(1, round(w * height / h)), height),
+                          interpolation=cv2.INTER_AREA if h > height else cv2.INTER_CUBIC)
+    if preprocess:
+        gray = deskew(gray)
+        gray = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(4, 4)).apply(gray)
+    return gray
+
+
+# ---------------------------
+# Formatos de placa colombianos
+# ---------------------------
+# L = letra, D = dígito: particulares/públicos ABC123, motos ABC12D
+PLATE_FORMATS = ("LLLDDD", "LLLDDL")
+PLATE_ALLOWLIST = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+CORRECTION_PENALTY = 0.9  # Factor de confianza por cada carácter corregido
+
+# Confusiones típicas del OCR según lo que exige la posición
+_TO_LETTER = {"0": "O", "1": "I", "8": "B", "5": "S", "2": "Z", "6": "G"}
+_TO_DIGIT = {"O": "0", "Q": "0", "D": "0", "I": "1", "L": "1", "B": "8", "S": "5", "Z": "2", "G": "6"}
+
+
+def _fit(text: str, pattern: str):
+    """(texto corregido, correcciones) si `text` encaja en el patrón, o None"""
+    chars, fixes = [], 0
+    for char, kind in zip(text, pattern):
+        if (kind == "L" and char.isalpha()) or (kind == "D" and char.isdigit()):
+            chars.append(char)
+            continue
+        fixed = (_TO_LETTER if kind == "L" else _TO_DIGIT).get(char)
+        if fixed is None:
+            return None
+        chars.append(fixed)
+        fixes += 1
+    return "".join(chars), fixes
+
+
+def decode_plate(text: str, formats=PLATE_FORMATS):
+    """Placa válida más probable para una lectura del OCR.
+
+    Prueba cada formato (y cada ventana, si el OCR leyó caracteres de más, p. ej. parte del
+    municipio) y devuelve (placa, correcciones) con la menor cantidad de correcciones, o None
+    si la lectura no encaja en ningún formato.
+    """
+    text = clean_text(text)
+    best = None
+    for pattern in formats:
+        for start in range(len(text) - len(pattern) + 1):
+            fitted = _fit(text[start:start + len(pattern)], pattern)
+            if fitted and (best is None or fitted[1] < best[1]):
+                best = fitted
+    return best
+
+
+def stack_rois(rois, height: int = 64, preprocess: bool = True):
+    """Apila los recortes normalizados en un solo lienzo.
+
+    Devuelve el lienzo y la caja [x_min, x_max, y_min, y_max] de cada recorte, en el formato
+    `horizontal_list` de EasyOCR.
+    """
+    crops = [normalize_roi(roi, height, preprocess) for roi in rois]
+    width = max(crop.shape[1] for crop in crops)
+    canvas = np.zeros((len(crops) * (height + _GAP), width), dtype=np.uint8)
+    boxes = []
+    for i, crop in enumerate(crops):
+        y = i * (height + _GAP)
+        canvas[y:y + height, :crop.shape[1]] = crop
+        boxes.append([0, crop.shape[1], y, y + height])
+    return canvas, boxes
+
+
+def recognize_batch(reader, rois, height: int = 64, decode=None, allowlist=None, preprocess: bool = True):
+    """Lee todas las placas en una sola llamada de reconocimiento de EasyOCR.
+
+    Los recortes ya vienen de YOLO, así que se omite el detector de texto de EasyOCR
+    (`readtext`) y se pasa cada recorte como una caja de `recognize`; esa es la ganancia
+    en CPU, donde EasyOCR reconoce las cajas una por una aunque vayan en la misma llamada
+    (solo en GPU se procesan en lote de verdad). Con `decode` (p. ej.
+    `decode_plate`) las lecturas que no son una placa válida se descartan. Devuelve, por
+    recorte, (texto, confianza) o None.
+    """
+    rois = list(rois)
+    results = [None] * len(rois)
+    valid = [i for i, roi in enumerate(rois) if roi is not None and roi.size > 0]
+    if not valid:
+        return results
+
+    canvas, boxes = stack_rois([rois[i] for i in valid], height, preprocess)
+    recognized = reader.recognize(canvas, horizontal_list=boxes, free_list=[], batch_size=len(boxes),
+                                  allowlist=allowlist, detail=1)
+
+    # Cada resultado trae su caja: se asocia al recorte por su posición vertical
+    best = {}
+    for box, text, confidence in recognized:
+        slot = int(min(point[1] for point in box) // (height + _GAP))
+        if decode is None:
+            text = clean_text(text)
+        else:
+            decoded = decode(text)
+            if decoded is None:
+                continue
+            text, fixes = decoded
+            confidence *= CORRECTION_PENALTY ** fixes
+        if text and 0 <= slot < len(valid) and confidence > best.get(slot, ("", -1.0))[1]:
+            best[slot] = (text, float(confidence))
+    for slot, read in best.items():
+        results[valid[slot]] = read
+    return results
+
+
+class OCRBatcher:
+    """Agrupa las lecturas pedidas por varios hilos de cámara en una sola llamada.
+
+    Cada cámara envía los recortes de su cuadro con `submit`; un hilo junta lo que llegue
+    durante `wait` segundos y lo reconoce en un único lote. Solo conviene en GPU: en CPU
+    EasyOCR reconoce las cajas de a una, y agrupar solo suma la espera y serializa las cámaras.
+    """
+
+    def __init__(self, recognize, wait: float = 0.005, max_batch: int = 32):
+        self._recognize = recognize  # rois -> [(texto, confianza) | None]
+        self.wait = wait
+        self.max_batch = max_batch
+        self._pending = []  # (rois, future)
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def submit(self, rois) -> Future:
+        future = Future()
+        with self._cond:
+            self._pending.append((list(rois), future))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="ocr-batcher", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return future
+
+    def read(self, rois):
+        """Lectura bloqueante de los recortes de un cuadro"""
+        if not rois:
+            return []
+        return self.submit(rois).result()
+
+    def _take_batch(self):
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending)
+            # Dar tiempo a que otras cámaras sumen sus recortes al lote
+            self._cond.wait_for(lambda: sum(len(rois) for rois, _ in self._pending) >= self.max_batch, timeout=self.wait)
+            batch, self._pending = self._pending, []
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            rois = [roi for request, _ in batch for roi in request]
+            try:
+                results = self._recognize(rois)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            start = 0
+            for request, future in batch:
+                future.set_result(results[start:start + len(request)])
+                start += len(request)
+
+
+
+# Huella de un recorte para la caché de OCR: miniatura en gris de tamaño fijo, suavizada
+# para tolerar ruido de cámara y desplazamientos de un par de píxeles
+_THUMB_SIZE = (144, 48)
+_THUMB_BLUR = 1.2
+_ALIGN_MARGIN = 4  # Desplazamiento máximo (en píxeles de la miniatura) al alinear dos huellas
+_STRIPS = 12  # Franjas verticales comparadas por separado (~2 por carácter)
+
+
+class Fingerprint(NamedTuple):
+    thumb: np.ndarray  # Miniatura float32
+    vector: np.ndarray  # Miniatura centrada y de norma 1, para el prefiltro por coseno
+    aspect: float  # Proporción ancho/alto del recorte original
+
+
+def fingerprint(roi):
+    """Huella perceptual de un recorte de placa, o None si está vacío"""
+    if roi is None or roi.size == 0:
+        return None
+    gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY) if roi.ndim == 3 else roi
+    thumb = cv2.resize(gray, _THUMB_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32)
+    thumb = cv2.GaussianBlur(thumb, (0, 0), _THUMB_BLUR)
+    vector = thumb.ravel() - thumb.mean()
+    norm = np.linalg.norm(vector)
+    return Fingerprint(thumb, vector / norm if norm else vector, roi.shape[1] / roi.shape[0])
+
+
+def _strip_similarity(a, b):
+    """Correlación mínima entre franjas verticales: un solo carácter distinto la hunde"""
+    worst = 1.0
+    for strip_a, strip_b in zip(np.array_split(a, _STRIPS, axis=1), np.array_split(b, _STRIPS, axis=1)):
+        strip_a, strip_b = strip_a - strip_a.mean(), strip_b - strip_b.mean()
+        norm = np.linalg.norm(strip_a) * np.linalg.norm(strip_b)
+        if norm > 1e-6:
+            worst = min(worst, float((strip_a * strip_b).sum() / norm))
+    return worst
+
+
+def similarity(cached: Fingerprint, new: Fingerprint) -> float:
+    """Similitud (-1 a 1) de dos huellas tras alinearlas con un desplazamiento de hasta `_ALIGN_MARGIN` px"""
+    m = _ALIGN_MARGIN
+    template = cached.thumb[m:-m, m:-m]
+    scores = cv2.matchTemplate(new.thumb, template, cv2.TM_CCOEFF_NORMED)
+    _, _, _, (x, y) = cv2.minMaxLoc(scores)
+    return _strip_similarity(template, new.thumb[y:y + template.shape[0], x:x + template.shape[1]])
+
+
+class OCRCache:
+    """Caché LRU de lecturas por huella perceptual del recorte.
+
+    Un auto detenido en la barrera entrega casi el mismo recorte durante cientos de cuadros:
+    si la huella de un recorte nuevo se parece a una guardada con similitud `min_similarity`
+    o más, se devuelve la lectura guardada sin pasar por EasyOCR. La similitud se mide por
+    franjas, así que una placa que difiere en un carácter (otro auto) no cuenta como acierto.
+    Los recortes que EasyOCR no pudo leer no se guardan: se vuelven a intentar.
+    """
+
+    def __init__(self, size: int = 256, min_similarity: float = 0.94, candidates: int = 3):
+        self.size = size
+        self.min_similarity = min_similarity
+        self.candidates = candidates  # Huellas verificadas por búsqueda tras el prefiltro
+        self._fingerprints = [None] * size
+        self._reads = [None] * size  # (texto, confianza)
+        self._vectors = np.zeros((size, _THUMB_SIZE[0] * _THUMB_SIZE[1]), dtype=np.float32)
+        self._aspects = np.zeros(size, dtype=np.float32)
+        self._used = np.zeros(size, dtype=bool)
+        self._last_use = np.zeros(size, dtype=np.int64)
+        self._clock = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, fp: Fingerprint):
+        """Posición de una huella parecida, o None (llamar con el lock tomado)"""
+        if not self._used.any():
+            return None
+        # Prefiltro vectorizado: coseno de las miniaturas y proporción parecida
+        scores = self._vectors @ fp.vector
+        ratio = self._aspects / fp.aspect
+        scores[~self._used | (ratio < 0.85) | (ratio > 1.15)] = -1.0
+        for slot in np.argsort(scores)[::-1][:self.candidates]:
+            if scores[slot] < self.min_similarity - 0.1:
+                break
+            if similarity(self._fingerprints[slot], fp) >= self.min_similarity:
+                return slot
+        return None
+
+    def _store(self, fp: Fingerprint, read):
+        free = np.flatnonzero(~self._used)
+        slot = free[0] if free.size else int(np.argmin(self._last_use))  # La menos usada recientemente
+        self._fingerprints[slot] = fp
+        self._reads[slot] = read
+        self._vectors[slot] = fp.vector
+        self._aspects[slot] = fp.aspect
+        self._used[slot] = True
+        self._touch(slot)
+
+    def _touch(self, slot):
+        self._clock += 1
+        self._last_use[slot] = self._clock
+
+    def _cached(self, fingerprints):
+        """Lectura guardada por huella, o None (cuenta aciertos y fallos)"""
+        results = []
+        with self._lock:
+            for fp in fingerprints:
+                slot = self._lookup(fp) if fp is not None else None
+                if slot is None:
+                    self.misses += 1
+                    results.append(None)
+                    continue
+                self.hits += 1
+                self._touch(slot)
+                results.append(self._reads[slot])
+        return results
+
+    def lookup(self, rois):
+        """Lecturas guardadas de los recortes (None donde no hay), sin llamar a EasyOCR"""
+        return self._cached([fingerprint(roi) for roi in rois])
+
+    def store(self, roi, read):
+        """Guarda la lectura de un recorte (p. ej. la placa decidida por votación)"""
+        fp = fingerprint(roi)
+        if read is not None and fp is not None:
+            with self._lock:
+                self._store(fp, read)
+
+    def read(self, rois, recognize):
+        """Lecturas de los recortes: las conocidas salen de la caché y el resto va en un lote a `recognize`"""
+        rois = list(rois)
+        fingerprints = [fingerprint(roi) for roi in rois]
+        results = self._cached(fingerprints)
+        missing = [i for i, read in enumerate(results) if read is None]
+
+        if missing:
+            reads = recognize([rois[i] for i in missing])
+            with self._lock:
+                for i, read in zip(missing, reads):
+                    results[i] = read
+                    if read is not None and fingerprints[i] is not None:
+                        self._store(fingerprints[i], read)
+        return results
+
+    def stats(self):
+        """Aciertos, fallos y tasa de aciertos desde el arranque"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": int(self._used.sum()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else None,
+            }
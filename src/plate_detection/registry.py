@@ -0,0 +1,36 @@
+from src import config
+
+
+class CameraNotFoundError(LookupError):
+    """La cámara pedida no está en ANPR_CAMERAS"""
+
+
+def parse_cameras(spec: str) -> dict:
+    """Cámaras por carril: "entrada=0;salida=rtsp://host/stream" -> {"entrada": 0, "salida": "rtsp://..."}.
+
+    Un valor numérico es el índice de una cámara local; cualquier otro, una URL o un archivo de video.
+    Una entrada sin nombre usa su posición como id.
+    """
+    cameras = {}
+    for position, item in enumerate(part.strip() for part in spec.split(";")):
+        if not item:
+            continue
+        camera_id, sep, source = item.partition("=")
+        if not sep:
+            camera_id, source = str(position), item
+        source = source.strip()
+        cameras[camera_id.strip()] = int(source) if source.isdigit() else source
+    return cameras
+
+
+CAMERAS = parse_cameras(config.ANPR_CAMERAS)
+
+
+def resolve(camera_id=None) -> str:
+    """Id de cámara registrado; sin id, la primera del registro"""
+    if camera_id is None:
+        return next(iter(CAMERAS))
+    camera_id = str(camera_id)
+    if camera_id not in CAMERAS:
+        raise CameraNotFoundError(camera_id)
+    return camera_id
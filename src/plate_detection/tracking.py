@@ -0,0 +1,227 @@
+import itertools
+import math
+import time
+from collections import Counter, defaultdict
+
+import cv2
+
+
+def iou(a, b):
+    """Intersección sobre unión de dos cajas (x1, y1, x2, y2)"""
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, ix2 - ix1) * max(0, iy2 - iy1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _clip(box, shape):
+    height, width = shape[:2]
+    x1, y1, x2, y2 = box
+    return max(0, x1), max(0, y1), min(width, x2), min(height, y2)
+
+
+class PlateVote:
+    """Votación de varias lecturas OCR de una misma placa.
+
+    Se toma la longitud más votada y, posición por posición, el carácter con más peso
+    (suma de confianzas OCR), así una lectura parcial o con un carácter errado no gana.
+    """
+
+    def __init__(self):
+        self.reads = []  # (texto, confianza)
+
+    def add(self, text, confidence):
+        self.reads.append((text, confidence))
+
+    def result(self):
+        """(placa, confianza 0-1) según las lecturas acumuladas, o (None, 0.0)"""
+        if not self.reads:
+            return None, 0.0
+        lengths = Counter()
+        for text, confidence in self.reads:
+            lengths[len(text)] += confidence
+        length = lengths.most_common(1)[0][0]
+        same_length = [(text, confidence) for text, confidence in self.reads if len(text) == length]
+
+        plate, agreement = [], 0.0
+        for i in range(length):
+            weights = defaultdict(float)
+            for text, confidence in same_length:
+                weights[text[i]] += confidence
+            char, weight = max(weights.items(), key=lambda item: item[1])
+            plate.append(char)
+            agreement += weight / (sum(weights.values()) or 1.0)
+
+        mean_confidence = sum(confidence for _, confidence in same_length) / len(same_length)
+        support = len(same_length) / len(self.reads)
+        return "".join(plate), (agreement / length) * mean_confidence * support
+
+
+class Track:
+    """Placa seguida entre cuadros"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, box):
+        self.id = next(self._ids)
+        self.box = box
+        self.plate = None  # Placa definitiva (tras la votación)
+        self.vote = PlateVote()
+        self.misses = 0  # Detecciones consecutivas en las que no apareció
+        self.template = None  # Recorte en gris para seguirla entre detecciones
+
+
+class PlateTracker:
+    """Corre el detector cada N cuadros y sigue las cajas en los cuadros intermedios.
+
+    Entre detecciones cada placa se desplaza buscando su último recorte (template matching)
+    en una ventana alrededor de su posición. Cada placa seguida se lee en los cuadros con detección
+    hasta que la votación se estabiliza (`min_votes` lecturas con `min_confidence`) o se llega a
+    `max_reads`; entonces se emite una sola vez por `on_plate` y se deja de hacer OCR sobre ella.
+    Con `known`/`remember` (caché de OCR) la placa decidida se guarda por su recorte, y una placa
+    seguida nueva cuyo recorte ya tiene placa decidida (auto detenido cuya caja se perdió y
+    reapareció) la adopta sin OCR ni votación; las lecturas de la caché nunca suman votos.
+    Con `every=None` el intervalo se ajusta a la latencia medida del detector para sostener `target_fps`.
+    """
+
+    def __init__(self, detect, read, every=None, target_fps=15.0, max_every=30,
+                 match_iou=0.3, max_misses=2, min_similarity=0.5,
+                 min_votes=3, min_confidence=0.5, max_reads=10, on_plate=None, known=None, remember=None):
+        self._detect = detect  # frame -> [(x1, y1, x2, y2)]
+        self._read = read  # [roi] -> [(texto, confianza) o None], todas las placas del cuadro en un lote
+        self._known = known  # [roi] -> [(placa, confianza) decidida antes o None]
+        self._remember = remember  # (recorte, (placa, confianza)) al decidir una votación
+        self.every = every
+        self.target_fps = target_fps
+        self.max_every = max_every
+        self.match_iou = match_iou
+        self.max_misses = max_misses
+        self.min_similarity = min_similarity
+        self.min_votes = min_votes
+        self.min_confidence = min_confidence
+        self.max_reads = max_reads
+        self._on_plate = on_plate  # Se llama con (track, placa, confianza) al decidir una placa
+        self.tracks = []
+        self._frame_index = 0
+        self._detect_latency = None  # Promedio móvil en segundos
+
+    def interval(self):
+        """Cuadros entre detecciones"""
+        if self.every:
+            return self.every
+        if self._detect_latency is None:
+            return 1
+        return max(1, min(self.max_every, math.ceil(self._detect_latency * self.target_fps)))
+
+    def process(self, frame):
+        """Actualiza las placas seguidas con un cuadro nuevo y lo devuelve anotado"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self._frame_index % self.interval() == 0:
+            self._update_with_detections(frame, gray)
+        else:
+            self._propagate(gray)
+        self._frame_index += 1
+        return self.annotate(frame)
+
+    def _update_with_detections(self, frame, gray):
+        start = time.perf_counter()
+        boxes = [_clip(box, frame.shape) for box in self._detect(frame)]
+        elapsed = time.perf_counter() - start
+        self._detect_latency = elapsed if self._detect_latency is None else 0.8 * self._detect_latency + 0.2 * elapsed
+
+        # Asociación voraz por IoU entre placas seguidas y detecciones nuevas
+        unmatched = list(range(len(boxes)))
+        for track in self.tracks:
+            best, best_iou = None, self.match_iou
+            for i in unmatched:
+                overlap = iou(track.box, boxes[i])
+                if overlap >= best_iou:
+                    best, best_iou = i, overlap
+            if best is None:
+                track.misses += 1
+                continue
+            unmatched.remove(best)
+            track.box = boxes[best]
+            track.misses = 0
+        lost = [track for track in self.tracks if track.misses > self.max_misses]
+        for track in lost:
+            # La placa salió de cuadro: se emite lo votado si es suficientemente confiable
+            if track.plate is None:
+                self._decide(track, final=True)
+        self.tracks = [track for track in self.tracks if track.misses <= self.max_misses]
+        self.tracks.extend(Track(boxes[i]) for i in unmatched)
+
+        pending = []  # Placas aún sin votación decidida: se leen todas juntas
+        for track in self.tracks:
+            if track.misses:
+                continue
+            x1, y1, x2, y2 = track.box
+            if x2 <= x1 or y2 <= y1:
+                continue
+            track.template = gray[y1:y2, x1:x2].copy()
+            if track.plate is None:
+                pending.append((track, frame[y1:y2, x1:x2]))
+        if pending:
+            self._read_plates(pending)
+
+    def _read_plates(self, pending):
+        if self._known is not None:
+            unknown = []
+            for (track, roi), known in zip(pending, self._known([roi for _, roi in pending])):
+                if known:
+                    self._accept(track, *known)
+                else:
+                    unknown.append((track, roi))
+            pending = unknown
+            if not pending:
+                return
+        reads = self._read([roi for _, roi in pending])
+        for (track, _), read in zip(pending, reads):
+            if read:
+                track.vote.add(*read)
+            self._decide(track)
+
+    def _decide(self, track, final=False):
+        plate, confidence = track.vote.result()
+        if plate is None:
+            return
+        reads = len(track.vote.reads)
+        stable = reads >= self.min_votes and confidence >= self.min_confidence
+        if stable or reads >= self.max_reads or (final and confidence >= self.min_confidence):
+            if self._remember is not None and track.template is not None:
+                self._remember(track.template, (plate, confidence))
+            self._accept(track, plate, confidence)
+
+    def _accept(self, track, plate, confidence):
+        track.plate = plate
+        if self._on_plate:
+            self._on_plate(track, plate, confidence)
+
+    def _propagate(self, gray):
+        height, width = gray.shape[:2]
+        for track in self.tracks:
+            if track.template is None:
+                continue
+            x1, y1, x2, y2 = track.box
+            w, h = x2 - x1, y2 - y1
+            # Ventana de búsqueda: la caja ampliada media caja por lado
+            sx1, sy1 = max(0, x1 - w // 2), max(0, y1 - h // 2)
+            sx2, sy2 = min(width, x2 + w // 2), min(height, y2 + h // 2)
+            window = gray[sy1:sy2, sx1:sx2]
+            th, tw = track.template.shape[:2]
+            if window.shape[0] < th or window.shape[1] < tw:
+                continue
+            scores = cv2.matchTemplate(window, track.template, cv2.TM_CCOEFF_NORMED)
+            _, similarity, _, (mx, my) = cv2.minMaxLoc(scores)
+            if similarity >= self.min_similarity:
+                track.box = (sx1 + mx, sy1 + my, sx1 + mx + tw, sy1 + my + th)
+
+    def annotate(self, frame):
+        """Dibuja el texto de cada placa leída sobre su caja"""
+        for track in self.tracks:
+            if track.plate and not track.misses:
+                x1, y1 = track.box[:2]
+                cv2.putText(frame, track.plate, (x1, y1 - 10),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 0, 255), 2)
+        return frame
@@ -0,0 +1,138 @@
+import argparse
+import json
+import os
+import socket
+import socketserver
+import struct
+
+from src.plate_detection import ANPR, batch, registry
+
+# ---------------------------
+# Protocolo (socket Unix)
+# ---------------------------
+# Cada mensaje va precedido de su longitud (4 bytes, big-endian). El cliente envía un JSON
+# {"cmd": ...}; la respuesta es un JSON o, para "video", una secuencia de chunks MJPEG
+# terminada en un mensaje vacío (para "recognize", un JSON por cuadro y el mensaje vacío).
+_HEADER = struct.Struct("!I")
+
+
+def send_message(sock: socket.socket, payload: bytes):
+    # Dos envíos en vez de concatenar: el payload (p. ej. un JPEG) no se copia
+    sock.sendall(_HEADER.pack(len(payload)))
+    if payload:
+        sock.sendall(payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Conexión cerrada por el otro extremo")
+        data += chunk
+    return bytes(data)
+
+
+def recv_message(sock: socket.socket) -> bytes:
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return _recv_exact(sock, size) if size else b""
+
+
+def send_json(sock: socket.socket, data: dict):
+    send_message(sock, json.dumps(data).encode())
+
+
+def recv_json(sock: socket.socket) -> dict:
+    return json.loads(recv_message(sock))
+
+
+# ---------------------------
+# Servidor
+# ---------------------------
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        try:
+            request = recv_json(self.request)
+        except (ConnectionError, ValueError):
+            return
+
+        cmd = request.get("cmd")
+        try:
+            if cmd == "last_plate":
+                send_json(self.request, {"plate": ANPR.get_last_plate(request.get("camera"))})
+            elif cmd == "status":
+                send_json(self.request, ANPR.models_status())
+            elif cmd == "cameras":
+                send_json(self.request, {"cameras": ANPR.list_cameras()})
+            elif cmd == "events":
+                send_json(self.request, {"events": ANPR.get_events(request.get("after", 0), request.get("limit"))})
+            elif cmd == "video":
+                self._stream(request.get("camera"), request.get("quality"), request.get("width"))
+            elif cmd == "recognize":
+                self._recognize(request["path"], request.get("every"), request.get("workers"))
+            else:
+                send_json(self.request, {"error": f"Comando desconocido: {cmd}", "code": "unknown_command"})
+        except registry.CameraNotFoundError as e:
+            send_json(self.request, {"error": f"Cámara no registrada: {e}", "code": "camera_not_found"})
+        except (BrokenPipeError, ConnectionError):
+            pass  # El cliente (API) se desconectó
+
+    def _stream(self, camera_index, quality, width):
+        ANPR.activate_camera()
+        frames = ANPR.generate_frames(camera_index, quality, width)
+        try:
+            for chunk in frames:
+                send_message(self.request, chunk)
+            send_message(self.request, b"")
+        finally:
+            frames.close()  # Libera la cámara aunque el cliente se haya ido
+
+
+    def _recognize(self, path, every, workers):
+        frames = batch.recognize_file(path, every, workers)
+        try:
+            for frame in frames:
+                send_json(self.request, frame)
+        except ValueError as e:
+            send_json(self.request, {"error": str(e)})
+        finally:
+            frames.close()
+        send_message(self.request, b"")
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def serve(socket_path: str, warmup: bool = True, processes: bool = False):
+    """Atiende a la API por un socket Unix; los modelos viven solo en este proceso"""
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    if processes:
+        ANPR.start_camera_processes()
+    elif warmup:
+        ANPR.warm_up_models()
+    with _Server(socket_path, _Handler) as server:
+        print(f"Worker ANPR escuchando en {socket_path}")
+        try:
+            server.serve_forever()
+        finally:
+            ANPR.deactivate_camera()
+            ANPR.stop_camera_processes()
+            os.unlink(socket_path)
+
+
+# -------------------------
+# Ejecución como script
+# -------------------------
+if __name__ == "__main__":
+    from src import config
+
+    parser = argparse.ArgumentParser(description="Proceso dedicado de detección de placas (ANPR)")
+    parser.add_argument("--socket", default=config.ANPR_WORKER_SOCKET or "/tmp/anpr.sock", help="Ruta del socket Unix")
+    parser.add_argument("--no-warmup", action="store_true", help="Cargar los modelos en el primer uso")
+    parser.add_argument("--camera-processes", action="store_true", default=config.ANPR_CAMERA_PROCESSES,
+                        help="Un proceso por cámara de ANPR_CAMERAS, con detección continua")
+    args = parser.parse_args()
+
+    serve(args.socket, warmup=not args.no_warmup, processes=args.camera_processes)
@@ -0,0 +1,82 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.plate_detection.ocr import OCRCache, decode_plate, fingerprint, similarity
+
+
+def plate_image(text, shift=0, noise=0, seed=0):
+    """Recorte sintético de una placa con el texto dibujado"""
+    image = np.full((60, 200, 3), 230, np.uint8)
+    cv2.putText(image, text, (10 + shift, 45), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (20, 20, 20), 3)
+    if noise:
+        jitter = np.random.default_rng(seed).integers(-noise, noise + 1, image.shape)
+        image = np.clip(image.astype(int) + jitter, 0, 255).astype(np.uint8)
+    return image
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("ABC123", ("ABC123", 0)),
+    ("abc-123", ("ABC123", 0)),
+    ("A8C123", ("ABC123", 1)),
+    ("ABCI23", ("ABC123", 1)),
+    ("0BC1Z3", ("OBC123", 2)),
+    ("ABC12D", ("ABC12D", 0)),
+    ("BOGOTA ABC123", ("ABC123", 0)),
+])
+def test_decode_plate(text, expected):
+    assert decode_plate(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "ABC12", "123456", "AB#"])
+def test_decode_plate_rejects(text):
+    assert decode_plate(text) is None
+
+
+def test_decode_plate_custom_formats():
+    assert decode_plate("123ABC", formats=("DDDLLL",)) == ("123ABC", 0)
+    assert decode_plate("123ABC") is None
+
+
+def test_similarity_same_plate_vs_other_plate():
+    base = fingerprint(plate_image("ABC123"))
+    assert similarity(base, fingerprint(plate_image("ABC123", shift=2, noise=10, seed=1))) >= 0.94
+    assert similarity(base, fingerprint(plate_image("ABC128"))) < 0.94
+    assert similarity(base, fingerprint(plate_image("XBC123"))) < 0.94
+
+
+def test_cache_hits_same_plate_only():
+    cache = OCRCache(size=4)
+    calls = []
+
+    def recognize(rois):
+        calls.append(len(rois))
+        return [("ABC123", 0.9) for _ in rois]
+
+    assert cache.read([plate_image("ABC123")], recognize) == [("ABC123", 0.9)]
+    assert cache.read([plate_image("ABC123", shift=1, noise=5)], recognize) == [("ABC123", 0.9)]
+    assert calls == [1]
+    cache.read([plate_image("ABC128")], recognize)
+    assert calls == [1, 1]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_failed_reads_are_not_cached():
+    cache = OCRCache(size=4)
+    cache.read([plate_image("ABC123")], lambda rois: [None for _ in rois])
+    assert cache.lookup([plate_image("ABC123")]) == [None]
+
+
+def test_store_and_lookup():
+    cache = OCRCache(size=4)
+    cache.store(plate_image("ABC123"), ("ABC123", 0.8))
+    assert cache.lookup([plate_image("ABC123", noise=5), plate_image("XBC123")]) == [("ABC123", 0.8), None]
+
+
+def test_least_recently_used_is_evicted():
+    cache = OCRCache(size=2)
+    cache.store(plate_image("ABC123"), ("ABC123", 0.9))
+    cache.store(plate_image("XYZ789"), ("XYZ789", 0.9))
+    cache.lookup([plate_image("ABC123")])  # XYZ789 queda como la menos usada
+    cache.store(plate_image("KLM456"), ("KLM456", 0.9))
+    assert cache.lookup([plate_image("ABC123"), plate_image("XYZ789")]) == [("ABC123", 0.9), None]
@@ -0,0 +1,43 @@
+import base64
+
+import pytest
+from fastapi import HTTPException
+
+from src.core.pagination import decode_cursor, encode_cursor, keyset_page, resolve_after
+
+
+@pytest.mark.parametrize("last_id", [0, 1, 42, 10**12])
+def test_cursor_round_trip(last_id):
+    cursor = encode_cursor(last_id)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == last_id
+
+
+@pytest.mark.parametrize("cursor", [
+    "no-es-base64!",
+    base64.urlsafe_b64encode(b'{"otro":1}').decode(),
+    base64.urlsafe_b64encode(b'{"after":"1"}').decode(),
+    base64.urlsafe_b64encode(b'{"after":-1}').decode(),
+    base64.urlsafe_b64encode(b'[1]').decode(),
+])
+def test_invalid_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+def test_resolve_after_prefers_cursor():
+    assert resolve_after(5, encode_cursor(9)) == 9
+    assert resolve_after(5, None) == 5
+    assert resolve_after(None, None) is None
+
+
+def test_keyset_page():
+    rows = [{"id": i} for i in range(1, 5)]
+    page, cursor = keyset_page(rows, 3, "id")
+    assert page == rows[:3]
+    assert decode_cursor(cursor) == 3
+
+    page, cursor = keyset_page(rows[:3], 3, "id")
+    assert page == rows[:3]
+    assert cursor is None
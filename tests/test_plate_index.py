@@ -0,0 +1,106 @@
+import random
+import string
+
+import pytest
+
+from src.core import plate_index
+from src.core.plate_index import PlateIndex, deletions, edit_distance, normalize_plate
+
+
+def random_plate(rng):
+    return "".join(rng.choices(string.ascii_uppercase, k=3) + rng.choices(string.digits, k=3))
+
+
+@pytest.fixture
+def loaded(monkeypatch):
+    """Índice del módulo vacío y marcado como cargado, sin BD"""
+    monkeypatch.setattr(plate_index, "_journal", [])
+    monkeypatch.setattr(plate_index, "_refreshing", False)
+    plate_index._swap(PlateIndex(2), {})
+    yield
+    monkeypatch.setattr(plate_index, "_loaded", False)
+
+
+def test_normalize_plate():
+    assert normalize_plate(" abc-123 ") == "ABC123"
+    assert normalize_plate(None) == ""
+
+
+@pytest.mark.parametrize("a, b, distance", [
+    ("ABC123", "ABC123", 0),
+    ("ABC123", "ABC128", 1),
+    ("ABC123", "BC123", 1),
+    ("ABC123", "ACB123", 2),
+    ("ABC123", "XYZ789", 6),
+])
+def test_edit_distance(a, b, distance):
+    assert edit_distance(a, b) == distance
+    assert edit_distance(b, a) == distance
+
+
+def test_edit_distance_bound():
+    assert edit_distance("ABC123", "XYZ789", bound=2) == 3
+    assert edit_distance("ABC123", "A", bound=2) == 3
+
+
+def test_deletions():
+    assert deletions("ABC", 1) == {"ABC", "BC", "AC", "AB"}
+    assert "" in deletions("AB", 2)
+
+
+def test_search_matches_brute_force():
+    rng = random.Random(7)
+    plates = {random_plate(rng) for _ in range(500)}
+    index = PlateIndex(2)
+    for vehicle_id, plate in enumerate(plates):
+        index.add(plate, vehicle_id)
+
+    queries = [random_plate(rng) for _ in range(50)]
+    queries += [plate[:2] + "Z" + plate[3:] for plate in list(plates)[:50]]
+    for query in queries:
+        for k in (1, 2):
+            expected = {(edit_distance(query, plate), plate) for plate in plates if edit_distance(query, plate) <= k}
+            assert set(index.search(query, k)) == expected
+
+
+def test_remove_keeps_other_vehicles():
+    index = PlateIndex(1)
+    index.add("ABC123", 1)
+    index.add("ABC123", 2)
+    index.remove("ABC123", 1)
+    assert index.search("ABC123", 1) == [(0, "ABC123")]
+    index.remove("ABC123", 2)
+    assert index.search("ABC123", 1) == []
+    assert not index._variants
+
+
+def test_add_update_remove_vehicle(loaded):
+    plate_index.add_vehicle(1, "abc-123")
+    assert plate_index._search("ABC128", 1, 5)["matches"] == [{"plate": "ABC123", "distance": 1, "vehicle_ids": [1]}]
+
+    plate_index.update_vehicle(1, "XYZ789")
+    assert plate_index._search("ABC123", 2, 5)["matches"] == []
+    plate_index.update_vehicle(2, "ABC123")  # De otro worker: llega al recargar
+    assert plate_index._search("ABC123", 2, 5)["matches"] == []
+
+    plate_index.remove_vehicle(1)
+    assert plate_index._search("XYZ789", 2, 5)["matches"] == []
+
+
+def test_changes_during_refresh_survive_swap(loaded):
+    plate_index.add_vehicle(1, "ABC123")
+    assert plate_index._begin_refresh()
+    assert not plate_index._begin_refresh()
+
+    # Filas leídas antes de los cambios locales
+    stale = plate_index._build([{"vehicle_id": 1, "plate": "ABC123"}, {"vehicle_id": 2, "plate": "KLM456"}])
+    plate_index.add_vehicle(3, "XYZ789")
+    plate_index.update_vehicle(1, "ABD123")
+    plate_index.remove_vehicle(2)
+    plate_index._swap(*stale)
+    plate_index._end_refresh(True)
+
+    assert plate_index._plate_by_vehicle == {1: "ABD123", 3: "XYZ789"}
+    assert set(plate_index._index.vehicles) == {"ABD123", "XYZ789"}
+    assert plate_index._journal == []
+    assert plate_index._begin_refresh()
@@ -0,0 +1,127 @@
+import threading
+import time
+
+import pytest
+from pymysql.constants import SERVER_STATUS
+
+from src.db.database import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    """Conexión pymysql de mentira: cuenta pings y rollbacks"""
+
+    def __init__(self):
+        self.open = True
+        self.alive = True
+        self.server_status = SERVER_STATUS.SERVER_STATUS_AUTOCOMMIT
+        self.pings = 0
+        self.rollbacks = 0
+
+    def ping(self, reconnect=True):
+        self.pings += 1
+        if not self.alive:
+            raise ConnectionError("MySQL server has gone away")
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.server_status &= ~SERVER_STATUS.SERVER_STATUS_IN_TRANS
+
+    def close(self):
+        self.open = False
+
+
+def make_pool(**kwargs):
+    opened = []
+
+    def connect():
+        opened.append(FakeConnection())
+        return opened[-1]
+
+    kwargs.setdefault("min_size", 0)
+    return ConnectionPool(connect=connect, **kwargs), opened
+
+
+def test_reuses_idle_connection():
+    pool, opened = make_pool(max_size=2)
+    pool.acquire().close()
+    pool.acquire().close()
+    assert len(opened) == 1
+    assert pool.stats()["checkouts"] == 2
+
+
+def test_timeout_when_pool_is_exhausted():
+    pool, _ = make_pool(max_size=1)
+    conn = pool.acquire()
+    start = time.monotonic()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire(timeout=0.05)
+    assert time.monotonic() - start >= 0.05
+    assert pool.stats()["timeouts"] == 1
+    conn.close()
+
+
+def test_waiter_gets_released_connection():
+    pool, opened = make_pool(max_size=1)
+    conn = pool.acquire()
+    threading.Timer(0.05, conn.close).start()
+    pool.acquire(timeout=2).close()
+    stats = pool.stats()
+    assert stats["waits"] == 1 and stats["timeouts"] == 0
+    assert len(opened) == 1
+
+
+def test_ping_failure_replaces_connection():
+    pool, opened = make_pool(max_size=1, ping_interval=0)
+    pool.acquire().close()
+    opened[0].alive = False
+    pool.acquire().close()
+    assert len(opened) == 2
+    assert not opened[0].open
+    assert pool.stats()["discarded"] == 1
+
+
+def test_no_ping_before_interval():
+    pool, opened = make_pool(max_size=1, ping_interval=60)
+    pool.acquire().close()
+    pool.acquire().close()
+    assert opened[0].pings == 0
+
+
+def test_recycles_past_max_lifetime():
+    pool, opened = make_pool(max_size=1, max_lifetime=0.01)
+    pool.acquire().close()
+    time.sleep(0.02)
+    pool.acquire().close()
+    assert len(opened) == 2
+    assert pool.stats()["recycled"] == 1
+
+
+def test_rollback_only_with_open_transaction():
+    pool, opened = make_pool(max_size=1)
+    pool.acquire().close()
+    assert opened[0].rollbacks == 0
+
+    conn = pool.acquire()
+    opened[0].server_status |= SERVER_STATUS.SERVER_STATUS_IN_TRANS
+    conn.close()
+    assert opened[0].rollbacks == 1
+
+
+def test_discard_frees_slot():
+    pool, opened = make_pool(max_size=1)
+    pool.acquire().discard()
+    assert not opened[0].open
+    stats = pool.stats()
+    assert stats["size"] == 0 and stats["in_use"] == 0
+    pool.acquire(timeout=0.05).close()
+    assert len(opened) == 2
+
+
+def test_closed_connection_is_not_returned():
+    pool, opened = make_pool(max_size=1)
+    conn = pool.acquire()
+    opened[0].open = False
+    conn.close()
+    assert pool.stats()["idle"] == 0
+    pool.acquire().close()
+    assert len(opened) == 2
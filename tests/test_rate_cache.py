@@ -0,0 +1,62 @@
+import pytest
+
+from src import config
+from src.core import rate_cache
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+
+    def execute(self, query):
+        self.queries += 1
+
+    def fetchall(self):
+        return list(self.rows)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(config, "RATE_CACHE_TTL", 60)
+    monkeypatch.setattr(rate_cache, "_rates", {})
+    rate_cache.invalidate_rates()
+
+
+def test_calculate_fee():
+    assert rate_cache.calculate_fee(60, 3000) == 3000
+    assert rate_cache.calculate_fee(90, 3000) == 4500
+    assert rate_cache.calculate_fee(0, 3000) == 0
+
+
+def test_rates_are_cached_until_ttl():
+    cursor = FakeCursor([{"rate_id": 1, "hourly_rate": "2500.00"}])
+    assert rate_cache.get_hourly_rate(cursor, 1) == 2500.0
+    assert rate_cache.get_hourly_rate(cursor, 1) == 2500.0
+    assert cursor.queries == 1
+
+
+def test_expired_rates_are_reloaded(monkeypatch):
+    monkeypatch.setattr(config, "RATE_CACHE_TTL", -1)
+    cursor = FakeCursor([{"rate_id": 1, "hourly_rate": 2500}])
+    rate_cache.get_hourly_rate(cursor, 1)
+    cursor.rows = [{"rate_id": 1, "hourly_rate": 3000}]
+    assert rate_cache.get_hourly_rate(cursor, 1) == 3000.0
+    assert cursor.queries == 2
+
+
+def test_invalidate_forces_reload():
+    cursor = FakeCursor([{"rate_id": 1, "hourly_rate": 2500}])
+    rate_cache.get_hourly_rate(cursor, 1)
+    cursor.rows = [{"rate_id": 1, "hourly_rate": 3000}]
+    rate_cache.invalidate_rates()
+    assert rate_cache.get_hourly_rate(cursor, 1) == 3000.0
+
+
+def test_unknown_rate_reloads_once():
+    cursor = FakeCursor([{"rate_id": 1, "hourly_rate": 2500}])
+    rate_cache.get_hourly_rate(cursor, 1)
+    cursor.rows.append({"rate_id": 2, "hourly_rate": 4000})
+    assert rate_cache.get_hourly_rate(cursor, 2) == 4000.0
+    assert rate_cache.get_hourly_rate(cursor, 9) is None
+    assert cursor.queries == 3
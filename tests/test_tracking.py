@@ -0,0 +1,82 @@
+import numpy as np
+
+from src.plate_detection.tracking import PlateTracker, PlateVote
+
+BOX = (40, 40, 140, 80)
+
+
+def test_vote_without_reads():
+    assert PlateVote().result() == (None, 0.0)
+
+
+def test_vote_majority_per_position():
+    vote = PlateVote()
+    vote.add("ABC123", 0.9)
+    vote.add("A8C123", 0.6)
+    vote.add("ABC128", 0.7)
+    plate, confidence = vote.result()
+    assert plate == "ABC123"
+    assert 0 < confidence < 0.9
+
+
+def test_vote_ignores_partial_reads():
+    vote = PlateVote()
+    vote.add("ABC123", 0.8)
+    vote.add("ABC123", 0.8)
+    vote.add("BC123", 0.9)
+    plate, confidence = vote.result()
+    assert plate == "ABC123"
+    assert confidence < 0.8  # Una de tres lecturas no coincide en longitud
+
+
+def make_frame():
+    frame = np.full((120, 200, 3), 200, np.uint8)
+    frame[BOX[1]:BOX[3], BOX[0]:BOX[2]] = 255
+    return frame
+
+
+def make_tracker(reads, **kwargs):
+    decided, calls = [], []
+
+    def read(rois):
+        calls.append(len(rois))
+        return [reads.pop(0) for _ in rois]
+
+    tracker = PlateTracker(lambda frame: [BOX], read, every=1,
+                           on_plate=lambda track, plate, confidence: decided.append(plate), **kwargs)
+    return tracker, decided, calls
+
+
+def test_tracker_decides_after_min_votes():
+    tracker, decided, calls = make_tracker([("ABC123", 0.9)] * 5, min_votes=3)
+    for _ in range(5):
+        tracker.process(make_frame())
+    assert decided == ["ABC123"]
+    assert len(calls) == 3  # Decidida la placa no se vuelve a leer
+
+
+def test_tracker_waits_for_confidence():
+    tracker, decided, _ = make_tracker([("ABC123", 0.3)] * 4, min_votes=3, max_reads=4)
+    for _ in range(3):
+        tracker.process(make_frame())
+    assert decided == []
+    tracker.process(make_frame())
+    assert decided == ["ABC123"]  # Al llegar a max_reads se emite lo votado
+
+
+def test_tracker_adopts_known_plate_without_reading():
+    remembered = []
+    tracker, decided, calls = make_tracker(
+        [("ABC123", 0.9)] * 3,
+        known=lambda rois: [remembered[0][1] if remembered else None for _ in rois],
+        remember=lambda roi, read: remembered.append((roi, read)),
+    )
+    for _ in range(3):
+        tracker.process(make_frame())
+    assert decided == ["ABC123"] and len(calls) == 3
+
+    tracker.tracks.clear()  # La caja se perdió y la placa reaparece como un seguimiento nuevo
+    tracker.process(make_frame())
+    assert decided == ["ABC123", "ABC123"]
+    assert len(calls) == 3
+    assert len(tracker.tracks[0].vote.reads) == 0  # La caché no suma votos